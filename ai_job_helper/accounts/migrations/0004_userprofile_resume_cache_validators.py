@@ -0,0 +1,37 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:45
+
+import hashlib
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_resume_validators(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    now = timezone.now()
+    for profile in UserProfile.objects.exclude(resume_text__isnull=True).exclude(resume_text='').iterator():
+        UserProfile.objects.filter(pk=profile.pk).update(
+            resume_text_hash=hashlib.sha1(profile.resume_text.encode('utf-8')).hexdigest(),
+            resume_updated_at=now,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_auto_20250910_1837'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='resume_text_hash',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='resume_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_resume_validators, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
+import hashlib
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -15,10 +18,23 @@ class UserProfile(models.Model):
     # Legacy fields kept for backward compatibility
     profile_picture_url = models.URLField(blank=True, null=True)
     resume_text = models.TextField(blank=True, null=True)
+    # Validators for the cached resume-text endpoint, maintained by save()
+    resume_text_hash = models.CharField(max_length=40, blank=True, default='')
+    resume_updated_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return self.user.username
 
+    def save(self, *args, **kwargs):
+        text_hash = hashlib.sha1((self.resume_text or '').encode('utf-8')).hexdigest() if self.resume_text else ''
+        if text_hash != self.resume_text_hash:
+            self.resume_text_hash = text_hash
+            self.resume_updated_at = timezone.now()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'resume_text_hash', 'resume_updated_at'}
+        super().save(*args, **kwargs)
+
 
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+
+class ResumeTextEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pw')
+        profile = self.user.userprofile
+        profile.resume_text = 'Python developer'
+        profile.save()
+        self.client.login(username='reader', password='pw')
+        self.url = reverse('resume_text')
+
+    def test_serves_text_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['resume_text'], 'Python developer')
+        self.assertTrue(response['ETag'])
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_unchanged_resume_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        profile = self.user.userprofile
+        profile.resume_text = 'Python and Go developer'
+        profile.save(update_fields=['resume_text'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['resume_text'], 'Python and Go developer')
@@ -10,5 +10,6 @@ urlpatterns = [
     path('login/', views.CustomLoginView.as_view(), name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
     path('profile/', views.profile, name='profile'),
+    path('profile/resume-text/', views.resume_text, name='resume_text'),
     path('forgot-password/', views.forgot_password, name='forgot_password'),
 ]
@@ -5,6 +5,10 @@ from django.contrib.auth.views import LoginView
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.contrib import messages
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
 from .forms import SignUpForm, UserProfileForm, ForgotPasswordForm
 from .models import UserProfile
 
@@ -105,9 +109,9 @@ def home(request):
 
     # ATS score
     try:
-        latest_ats = ATSResult.objects.filter(user=user).order_by('-created_at').first()
-        if latest_ats and latest_ats.final_score is not None:
-            stats["ats_score"] = f"{latest_ats.final_score:.1f}%"
+        latest_ats = ATSResult.objects.filter(user=user).order_by('-created_at').values_list('final_score', flat=True).first()
+        if latest_ats is not None:
+            stats["ats_score"] = f"{latest_ats:.1f}%"
     except Exception as e:
         print("Error fetching ATS score:", e)
 
@@ -164,12 +168,48 @@ def profile(request):
                 profile.extracted_text = extracted
                 profile.resume_text = extracted
                 profile.save(update_fields=['extracted_text', 'resume_text'])
+            # Keep the recruiter index in sync (no-op when the text is unchanged)
+            try:
+                from ats.recruiter import index_resume
+                index_resume(request.user, profile.resume_text)
+            except Exception as e:
+                print('Resume index error:', e)
             return redirect('profile')
     else:
         form = UserProfileForm(instance=profile)
     return render(request, 'accounts/profile.html', {'form': form})
 
 
+@login_required
+@require_GET
+def resume_text(request):
+    """
+    Profile resume text for client-side flows (Puter.js scoring, previews).
+
+    Pages fetch this instead of inlining the text, and browsers revalidate
+    it with If-None-Match / If-Modified-Since: an unchanged resume costs a
+    304 and one indexed read of the validators, never the text itself.
+    """
+    profile = UserProfile.objects.only('resume_text_hash', 'resume_updated_at').get(user=request.user)
+    etag = quote_etag(profile.resume_text_hash or 'empty')
+    last_modified = int(profile.resume_updated_at.timestamp()) if profile.resume_updated_at else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        text = UserProfile.objects.filter(pk=profile.pk).values_list('resume_text', flat=True).first() or ''
+        response = JsonResponse({
+            "ok": True,
+            "resume_text": text,
+            "updated_at": profile.resume_updated_at.isoformat() if profile.resume_updated_at else None,
+        })
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Per-user content: browsers may keep it but must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 def forgot_password(request):
     """Handle forgot password functionality"""
     if request.method == 'POST':
@@ -1,12 +1,171 @@
 import os
-import json
-from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from itertools import chain, zip_longest
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .json_stream import iter_array_objects, salvage_array
+from .resilience import CircuitOpenError, call_with_resilience, get_breaker, is_retryable
+from .response_cache import cache_key, get_response_cache
+from .router import get_router, reset_router
+
+
+class GeminiClient(NamedTuple):
+    client: Any          # google.genai Client, or None
+    legacy: Any          # configured google.generativeai module, or None
+    model_name: str
+    pid: int
+
+
+# Process-wide client: building one re-reads the environment, imports the SDK
+# and opens a fresh HTTP connection pool, so it is done once per process and
+# shared by every request thread. The pid guards against reusing sockets
+# inherited from a parent through fork (e.g. gunicorn --preload).
+_gemini: Optional[GeminiClient] = None
+_gemini_lock = threading.Lock()
+
+
+def _http_client_args() -> Dict[str, Any]:
+    """httpx arguments for a keep-alive pool sized for concurrent request threads."""
+    try:
+        import httpx
+    except ImportError:
+        return {}
+    pool_size = int(os.environ.get("GEMINI_POOL_SIZE", "20"))
+    return {
+        "limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=float(os.environ.get("GEMINI_KEEPALIVE_SECONDS", "120")),
+        ),
+    }
+
+
+def _build_gemini() -> GeminiClient:
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("Missing GEMINI_API_KEY environment variable")
+    model_name = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+    # Another endpoint, e.g. the local stand-in of ai_agents.fake_gemini for load tests
+    base_url = os.environ.get("GEMINI_BASE_URL") or None
+
+    # Prefer the new google.genai client when available
+    try:
+        from google import genai as genai_client  # type: ignore
+        from google.genai import types as genai_types  # type: ignore
+        client = genai_client.Client(
+            api_key=api_key,
+            http_options=genai_types.HttpOptions(base_url=base_url,
+                                                 # Bounds attempts that resilience.call_with_resilience gave up on
+                                                 timeout=int(float(os.environ.get("GEMINI_REQUEST_TIMEOUT", "60")) * 1000),
+                                                 client_args=_http_client_args(),
+                                                 async_client_args=_http_client_args()),
+        )
+        return GeminiClient(client, None, model_name, os.getpid())
+    except Exception:
+        pass
+
+    try:
+        import google.generativeai as genai_legacy  # type: ignore
+        if base_url:
+            genai_legacy.configure(api_key=api_key, transport="rest",
+                                   client_options={"api_endpoint": base_url})
+        else:
+            genai_legacy.configure(api_key=api_key)
+        return GeminiClient(None, genai_legacy, model_name, os.getpid())
+    except Exception as exc:
+        raise RuntimeError("No Gemini client available (google.genai / google-generativeai)") from exc
+
+
+def get_gemini() -> GeminiClient:
+    """The shared Gemini client of this process, created on first use."""
+    global _gemini
+    gemini = _gemini
+    if gemini is not None and gemini.pid == os.getpid():
+        return gemini
+    with _gemini_lock:
+        if _gemini is None or _gemini.pid != os.getpid():
+            _gemini = _build_gemini()
+        return _gemini
+
+
+def reset_gemini() -> None:
+    """Drop the shared client (after changing credentials, or in tests)."""
+    global _gemini
+    with _gemini_lock:
+        _gemini = None
+    reset_router()
+
+
+# One event loop per process, in a daemon thread, for the async client: its
+# connection pool is bound to the loop that first used it, so every call must
+# run on the same loop instead of a fresh asyncio.run() loop per request.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid = 0
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_pid
+    with _loop_lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="gemini-async", daemon=True).start()
+        return _loop
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """Run a coroutine on the process-wide loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
+
+
+def warmup(background: bool = False) -> None:
+    """
+    Build the shared client and open its connection ahead of the first request.
+
+    Call it when a worker starts (wsgi.py runs it when GEMINI_WARMUP is set, or
+    call it from a gunicorn post_fork hook) so the SDK import and the TLS
+    handshake are off the critical path of the first exam generation. Failures
+    are logged and ignored: the request path retries on demand.
+    """
+    if background:
+        threading.Thread(target=warmup, name="gemini-warmup", daemon=True).start()
+        return
+    try:
+        gemini = get_gemini()
+        # A metadata read is the cheapest authenticated round trip
+        if gemini.client is not None:
+            gemini.client.models.get(model=gemini.model_name)
+        else:
+            gemini.legacy.get_model(f"models/{gemini.model_name}")
+    except Exception as exc:
+        logging.warning(f"Gemini warmup failed: {exc}")
+
+
+_GENERATION_CONFIG = {"response_mime_type": "application/json", "temperature": 0.7, "max_output_tokens": 16000}
+
+# Sub-topics a sharded exam is split across, each shard scoped to one of them
+EXAM_FACETS = (
+    "core concepts and fundamentals",
+    "tools, languages and technologies",
+    "practical scenarios and troubleshooting",
+    "best practices, quality and security",
+    "architecture, design and trade-offs",
+    "collaboration, process and soft skills",
+)
 
 
 class AIService:
     """
     Gemini-backed AI service for generating exam questions.
 
+    Instances are cheap: they share the process-wide client from get_gemini().
+
     Method: generate_exam_questions_for_user returns:
     {
       "questions": [
@@ -17,33 +176,220 @@ class AIService:
           "explanation": Optional[str],
           "topic": Optional[str]
         }, ...
-      ]
+      ],
+      "complete": bool,   # False when the response was truncated or malformed and had to be salvaged
+      "recovered": int,   # question objects recovered from the response, before dedup
+      "degraded": bool    # only present (True) when the provider's circuit was open and nothing was cached
     }
     """
 
     def __init__(self) -> None:
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("Missing GEMINI_API_KEY environment variable")
+        gemini = get_gemini()
+        self._client = gemini.client
+        self._legacy_model = gemini.legacy
+        self._model_name = gemini.model_name
 
-        self._client = None
-        self._legacy_model = None
-        self._model_name = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+    def _exam_prompt(self, avoidance_list: Optional[List[str]], job_role: str, num_questions: int,
+                     difficulty: str = "medium") -> str:
+        # Build compact avoidance hint (only first 5 for speed)
+        avoid_hint = ""
+        if avoidance_list and len(avoidance_list) > 0:
+            avoid_hint = f" Avoid: {', '.join([q[:30] for q in avoidance_list[:5]])}..."
 
-        # Prefer the new google.genai client when available
-        try:
-            from google import genai as genai_client  # type: ignore
-            self._client = genai_client.Client(api_key=api_key)
-        except Exception:
-            self._client = None
+        # Ultra-compact prompt for speed
+        return (
+            f'{num_questions} unique {difficulty}-difficulty {job_role} interview questions.{avoid_hint}\n'
+            f'JSON: {{"questions":[{{"question":str,"options":[4 strings],"correct_answer":"A-D","explanation":str,"topic":str}}]}}'
+        )
+
+    def _choose_model(self, num_questions: int, latency_target: Optional[float] = None) -> str:
+        """The model for one request, from observed latency and reliability (see router)."""
+        return get_router(self._model_name).choose(num_questions, latency_target)
+
+    @staticmethod
+    def _output_tokens(response, text: str) -> int:
+        usage = getattr(response, "usage_metadata", None)
+        tokens = getattr(usage, "candidates_token_count", None)
+        # About four characters per token when the SDK does not report usage
+        return tokens if isinstance(tokens, int) else len(text or "") // 4
+
+    def _record(self, model: str, started: float, error: Optional[BaseException] = None,
+                output_tokens: int = 0) -> None:
+        # Bad requests say nothing about the model's health; failures that would be retried do
+        if error is None or is_retryable(error):
+            get_router(self._model_name).record(model, time.monotonic() - started, error is None, output_tokens)
+
+    @staticmethod
+    def _normalize_question(q: Dict[str, Any], job_role: str) -> Optional[Dict[str, Any]]:
+        """A generated question in the documented shape, or None if it is unusable."""
+        if not isinstance(q, dict):
+            return None
+        qtext = str(q.get("question", "")).strip()
+        if not qtext or len(qtext) < 10:
+            return None
+
+        # Ensure 4 options
+        options = q.get("options", [])
+        if not isinstance(options, list):
+            options = []
+        while len(options) < 4:
+            options.append(f"Option {len(options) + 1}")
+        options = [str(opt).strip() for opt in options[:4]]
 
-        if self._client is None:
+        # Normalize correct answer
+        correct = q.get("correct_answer", "A")
+        if isinstance(correct, int) and 0 <= correct < 4:
+            correct = ['A', 'B', 'C', 'D'][correct]
+        else:
+            correct = str(correct)[0].upper() if correct else 'A'
+            if correct not in ['A', 'B', 'C', 'D']:
+                correct = 'A'
+
+        # Ensure explanation exists
+        explanation = str(q.get("explanation", "")).strip()
+        if not explanation or len(explanation) < 5:
+            explanation = f"The correct answer is {correct} because it is the most appropriate option for this {job_role} question."
+
+        return {
+            "question": qtext,
+            "options": options,
+            "correct_answer": correct,
+            "explanation": explanation,
+            "topic": str(q.get("topic", job_role)).strip()
+        }
+
+    @staticmethod
+    def _cache_keys(prompt: str, model: str) -> List[str]:
+        """
+        Keys of the prompt's cache slots (GEMINI_CACHE_VARIANTS). Each call
+        reads and fills one slot at random, so candidates sending the same
+        prompt are answered from several different responses.
+        """
+        variants = max(1, int(os.environ.get("GEMINI_CACHE_VARIANTS", "4")))
+        return [cache_key(model, prompt, dict(_GENERATION_CONFIG, variant=i)) for i in range(variants)]
+
+    @staticmethod
+    def _cached(key: str, fresh: bool) -> Optional[str]:
+        """The cached response text, unless the caller asked for a fresh one."""
+        cache = get_response_cache()
+        return None if fresh or cache is None else cache.get(key)
+
+    def _cached_any(self, keys: List[str]) -> Optional[str]:
+        """Any cached response for the prompt (while the provider is down)."""
+        for key in random.sample(keys, len(keys)):
+            text = self._cached(key, False)
+            if text is not None:
+                return text
+        return None
+
+    @staticmethod
+    def _shuffled(text: str) -> List[Dict[str, Any]]:
+        """The raw questions of a cached response, in random order."""
+        raw_questions = salvage_array(text, "questions")[0]
+        random.shuffle(raw_questions)
+        return raw_questions
+
+    def _from_cache(self, text: str, avoidance_list: Optional[List[str]], job_role: str,
+                    num_questions: int) -> Dict[str, Any]:
+        """A cached response as this candidate's result: shuffled, without the questions they avoid."""
+        raw_questions = self._shuffled(text)
+        questions = list(self._unique_questions(raw_questions, avoidance_list, job_role, num_questions))
+        return {"questions": questions, "complete": True, "recovered": len(raw_questions)}
+
+    @staticmethod
+    def _remember(key: str, text: str) -> None:
+        cache = get_response_cache()
+        if cache is not None:
+            cache.put(key, text)
+
+    def _generate_text(self, prompt: str, model: str) -> str:
+        """One response, within the deadline budget, with retries and hedging (see resilience)."""
+        def call() -> str:
+            started = time.monotonic()
             try:
-                import google.generativeai as genai_legacy  # type: ignore
-                genai_legacy.configure(api_key=api_key)
-                self._legacy_model = genai_legacy
-            except Exception as exc:
-                raise RuntimeError("No Gemini client available (google.genai / google-generativeai)") from exc
+                if self._client:
+                    response = self._client.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=_GENERATION_CONFIG,
+                    )
+                elif self._legacy_model:
+                    legacy = self._legacy_model.GenerativeModel(model, generation_config=_GENERATION_CONFIG)
+                    response = legacy.generate_content(prompt)
+                else:
+                    raise RuntimeError("No Gemini client")
+                text = response.text
+            except Exception as e:
+                self._record(model, started, e)
+                raise
+            self._record(model, started, output_tokens=self._output_tokens(response, text))
+            return text
+
+        return call_with_resilience(call, model)
+
+    def _open_stream(self, prompt: str, model: str):
+        """
+        The response stream with its first chunk already read, so connecting
+        and the time to first byte get the same deadline, retries and hedging
+        as a single call. Returns (first_chunk, rest_of_stream).
+        """
+        def call():
+            if self._client:
+                stream = self._client.models.generate_content_stream(
+                    model=model,
+                    contents=prompt,
+                    config=_GENERATION_CONFIG,
+                )
+            elif self._legacy_model:
+                legacy = self._legacy_model.GenerativeModel(model, generation_config=_GENERATION_CONFIG)
+                stream = legacy.generate_content(prompt, stream=True)
+            else:
+                raise RuntimeError("No Gemini client")
+            stream = iter(stream)
+            return next(stream, None), stream
+
+        return call_with_resilience(call, f"{model}:first-chunk")
+
+    def provider_available(self) -> bool:
+        """False while the circuit breaker of every candidate model is open."""
+        return any(get_breaker(model).state != "open" for model in get_router(self._model_name).models)
+
+    @staticmethod
+    def _drain(chunks: Iterator[str]) -> None:
+        """Read the rest of a stream (the closing brackets after the last question)."""
+        try:
+            for _ in chunks:
+                pass
+        except Exception as e:
+            logging.warning(f"Question stream tail lost: {str(e)}")
+
+    @staticmethod
+    def _chunk_texts(stream, received: List[str]) -> Iterator[str]:
+        """Text of each streamed chunk, also collected into `received`."""
+        for chunk in stream:
+            text = chunk.text or ""
+            received.append(text)
+            yield text
+
+    def _unique_questions(self, raw_questions: Iterable[Dict[str, Any]], avoidance_list: Optional[List[str]],
+                          job_role: str, num_questions: int) -> Iterator[Dict[str, Any]]:
+        """Normalized questions, skipping duplicates and avoided ones, up to num_questions."""
+        seen_questions = set()
+        avoid_set = {q.lower().strip() for q in (avoidance_list or [])}
+        count = 0
+        for raw in raw_questions:
+            q = self._normalize_question(raw, job_role)
+            if q is None:
+                continue
+            qkey = q["question"].lower().strip()
+            if qkey in seen_questions or qkey in avoid_set:
+                continue
+            seen_questions.add(qkey)
+            yield q
+            count += 1
+            # Stop when we have enough unique questions
+            if count >= num_questions:
+                return
 
     def generate_exam_questions_for_user(
         self,
@@ -53,105 +399,234 @@ class AIService:
         job_role: str,
         num_questions: int = 30,
         difficulty: str = "medium",
+        fresh: bool = False,
     ) -> Dict[str, Any]:
-        """Generate 30 unique questions FAST in ONE API call. Includes explanation for each answer."""
-        
-        # Build compact avoidance hint (only first 5 for speed)
-        avoid_hint = ""
-        if avoidance_list and len(avoidance_list) > 0:
-            avoid_hint = f" Avoid: {', '.join([q[:30] for q in avoidance_list[:5]])}..."
-        
-        # Ultra-compact prompt for speed
-        prompt = (
-            f'{num_questions} unique {job_role} interview questions.{avoid_hint}\n'
-            f'JSON: {{"questions":[{{"question":str,"options":[4 strings],"correct_answer":"A-D","explanation":str,"topic":str}}]}}'
-        )
-        
+        """
+        Generate 30 unique questions FAST in ONE API call. Includes explanation for each answer.
+        Unless `fresh`, the prompt may be answered from one of its cache slots
+        (see _cache_keys), shuffled and without the candidate's avoided
+        questions; a slot left short by that is generated again. While the
+        provider's circuit is open any slot is used, `fresh` or not.
+        """
+        prompt = self._exam_prompt(avoidance_list, job_role, num_questions, difficulty)
+        model = self._choose_model(num_questions)
+        keys = self._cache_keys(prompt, model)
+        key = random.choice(keys)
+
+        try:
+            text = self._cached(key, fresh)
+            if text is not None:
+                result = self._from_cache(text, avoidance_list, job_role, num_questions)
+                if len(result["questions"]) >= num_questions:
+                    return result
+            try:
+                text = self._generate_text(prompt, model)
+            except CircuitOpenError:
+                text = self._cached_any(keys)
+                if text is None:
+                    raise
+                return self._from_cache(text, avoidance_list, job_role, num_questions)
+
+            # Truncated or slightly malformed output still yields its complete questions
+            raw_questions, complete = salvage_array(text, "questions")
+            if not complete:
+                logging.warning(f"Question generation: response did not parse, recovered {len(raw_questions)} questions")
+            else:
+                self._remember(key, text)
+            questions = list(self._unique_questions(raw_questions, avoidance_list, job_role, num_questions))
+            return {"questions": questions, "complete": complete, "recovered": len(raw_questions)}
+        except CircuitOpenError as e:
+            logging.warning(f"Question generation skipped: {str(e)}")
+            return {"questions": [], "complete": False, "recovered": 0, "degraded": True}
+        except Exception as e:
+            # Log error and return empty
+            logging.error(f"Question generation failed: {str(e)}")
+            return {"questions": [], "complete": False, "recovered": 0}
+
+    def stream_exam_questions(
+        self,
+        *,
+        avoidance_list: Optional[List[str]],
+        job_role: str,
+        num_questions: int = 30,
+        difficulty: str = "medium",
+        fresh: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Same questions as generate_exam_questions_for_user, yielded one by one
+        while the response streams in, so the first ones can be used right away.
+        Opening the stream is retried within the deadline budget (see
+        _open_stream); later errors end the stream early. Errors are logged, not raised. A cached
+        response is served as in generate_exam_questions_for_user, all at once;
+        a streamed one is cached once its closing bracket has arrived, even
+        when the consumer stops reading early.
+        """
+        prompt = self._exam_prompt(avoidance_list, job_role, num_questions, difficulty)
+        model = self._choose_model(num_questions)
+        keys = self._cache_keys(prompt, model)
+        key = random.choice(keys)
+        started = time.monotonic()
+        received: List[str] = []
+        pending_tail = None  # the chunks left once every question is out: only the closing brackets
+        failed = False
+        opened = False  # past _open_stream, whose retries already told the breaker about their failures
+        try:
+            text = self._cached(key, fresh)
+            if text is not None:
+                cached = self._from_cache(text, avoidance_list, job_role, num_questions)["questions"]
+                if len(cached) >= num_questions:
+                    yield from cached
+                    return
+            try:
+                first, stream = self._open_stream(prompt, model)
+                opened = True
+            except CircuitOpenError:
+                text = self._cached_any(keys)
+                if text is None:
+                    raise
+                yield from self._from_cache(text, avoidance_list, job_role, num_questions)["questions"]
+                return
+
+            chunks = self._chunk_texts(chain([first] if first is not None else [], stream), received)
+            questions = self._unique_questions(iter_array_objects(chunks, "questions"),
+                                               avoidance_list, job_role, num_questions)
+            for count, q in enumerate(questions, 1):
+                if count == num_questions:
+                    pending_tail = chunks
+                yield q
+            self._drain(chunks)
+            pending_tail = None
+        except Exception as e:
+            failed = True
+            self._record(model, started, e)
+            if opened and is_retryable(e):
+                # Broke off mid-stream: counts against the provider like a failed call
+                get_breaker(model).record_failure()
+            logging.error(f"Question streaming failed: {str(e)}")
+        finally:
+            # Also runs when the consumer closes the generator after the questions it needed
+            if pending_tail is not None:
+                self._drain(pending_tail)
+            if received and not failed:
+                text = "".join(received)
+                if salvage_array(text, "questions")[1]:
+                    self._remember(key, text)
+                    # A complete response is a success for the router however the consumer stopped;
+                    # tokens are estimated from the text, streamed chunks carry no reliable usage totals
+                    self._record(model, started, output_tokens=len(text) // 4)
+
+    async def _generate_shard(self, prompt: str, model: str, fresh: bool = False) -> Tuple[List[Dict[str, Any]], bool]:
+        """(raw questions, complete) of one shard, cached ones shuffled; raises on API errors."""
+        keys = self._cache_keys(prompt, model)
+        key = random.choice(keys)
+        text = self._cached(key, fresh)
+        if text is not None:
+            return self._shuffled(text), True
+        # Shards already share one deadline; the breaker still fails them fast when the provider is down
+        breaker = get_breaker(model)
+        if not breaker.allow():
+            text = self._cached_any(keys)
+            if text is not None:
+                return self._shuffled(text), True
+            raise CircuitOpenError(f"{model}: provider circuit is open")
+        started = time.monotonic()
         try:
-            # Use faster model if available
-            fast_model = "gemini-2.0-flash-exp" if "2.0" in self._model_name else self._model_name
-            
             if self._client:
-                response = self._client.models.generate_content(
-                    model=fast_model,
+                response = await self._client.aio.models.generate_content(
+                    model=model,
                     contents=prompt,
-                    config={"response_mime_type": "application/json", "temperature": 0.7, "max_output_tokens": 16000}
+                    config=_GENERATION_CONFIG,
                 )
-                text = response.text
             elif self._legacy_model:
-                model = self._legacy_model.GenerativeModel(
-                    fast_model,
-                    generation_config={"response_mime_type": "application/json", "temperature": 0.7, "max_output_tokens": 16000}
-                )
-                response = model.generate_content(prompt)
-                text = response.text
+                legacy = self._legacy_model.GenerativeModel(model, generation_config=_GENERATION_CONFIG)
+                response = await legacy.generate_content_async(prompt)
             else:
                 raise RuntimeError("No Gemini client")
-            
-            data = json.loads(text)
-            raw_questions = data.get("questions", [])
-            
-            # Deduplicate questions - ensure uniqueness
-            questions = []
-            seen_questions = set()
-            avoid_set = {q.lower().strip() for q in (avoidance_list or [])}
-            
-            for q in raw_questions:
-                qtext = str(q.get("question", "")).strip()
-                if not qtext or len(qtext) < 10:
-                    continue
-                    
-                # Check if question is unique
-                qkey = qtext.lower().strip()
-                if qkey in seen_questions or qkey in avoid_set:
-                    continue
-                
-                # Ensure 4 options
-                options = q.get("options", [])
-                if not isinstance(options, list):
-                    options = []
-                while len(options) < 4:
-                    options.append(f"Option {len(options) + 1}")
-                options = [str(opt).strip() for opt in options[:4]]
-                
-                # Normalize correct answer
-                correct = q.get("correct_answer", "A")
-                if isinstance(correct, int) and 0 <= correct < 4:
-                    correct = ['A', 'B', 'C', 'D'][correct]
-                else:
-                    correct = str(correct)[0].upper() if correct else 'A'
-                    if correct not in ['A', 'B', 'C', 'D']:
-                        correct = 'A'
-                
-                # Ensure explanation exists
-                explanation = str(q.get("explanation", "")).strip()
-                if not explanation or len(explanation) < 5:
-                    explanation = f"The correct answer is {correct} because it is the most appropriate option for this {job_role} question."
-                
-                questions.append({
-                    "question": qtext,
-                    "options": options,
-                    "correct_answer": correct,
-                    "explanation": explanation,
-                    "topic": str(q.get("topic", job_role)).strip()
-                })
-                seen_questions.add(qkey)
-                
-                # Stop when we have enough unique questions
-                if len(questions) >= num_questions:
-                    break
-            
-            return {"questions": questions}
+        except asyncio.CancelledError:
+            # Missed the shard deadline: as slow as a timeout, for the stats
+            self._record(model, started, TimeoutError())
+            breaker.release()
+            raise
         except Exception as e:
-            # Log error and return empty
-            import logging
-            logging.error(f"Question generation failed: {str(e)}")
-            return {"questions": []}
-
-
+            self._record(model, started, e)
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        self._record(model, started, output_tokens=self._output_tokens(response, response.text))
+        questions, complete = salvage_array(response.text, "questions")
+        if complete:
+            self._remember(key, response.text)
+        return questions, complete
 
+    async def _generate_shards(self, shards: List[Tuple[str, str]], deadline: float,
+                               fresh: bool = False) -> List[Tuple[List[Dict[str, Any]], bool]]:
+        """
+        Run every (prompt, model) shard concurrently; whatever has not finished
+        by the deadline is dropped, as ([], False) like a failed shard.
+        """
+        tasks = [asyncio.ensure_future(self._generate_shard(prompt, model, fresh)) for prompt, model in shards]
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logging.warning(f"Question generation: {len(pending)}/{len(tasks)} shards missed the {deadline}s deadline")
+        results = []
+        for task in tasks:
+            if task in done and task.exception() is None:
+                results.append(task.result())
+            else:
+                if task in done:
+                    logging.error(f"Question generation shard failed: {task.exception()}")
+                results.append(([], False))
+        return results
 
+    def generate_exam_questions_sharded(
+        self,
+        *,
+        avoidance_list: Optional[List[str]],
+        job_role: str,
+        num_questions: int = 30,
+        difficulty: str = "medium",
+        topics: Optional[Sequence[str]] = None,
+        shards: Optional[int] = None,
+        deadline: Optional[float] = None,
+        fresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Same result as generate_exam_questions_for_user, from several smaller
+        concurrent requests, each scoped to one sub-topic of the role.
 
+        Shards that fail or miss the deadline (GEMINI_SHARD_DEADLINE seconds by
+        default) are dropped and the exam is built from the others, so a
+        partial failure yields fewer questions rather than none; "complete" is
+        then False, as for a truncated response.
+        """
+        topics = list(topics or EXAM_FACETS)
+        shards = max(1, min(shards or int(os.environ.get("GEMINI_SHARDS", "5")), len(topics), num_questions))
+        deadline = deadline or float(os.environ.get("GEMINI_SHARD_DEADLINE", "25"))
+        # A little over-asked per shard, since duplicates across shards are dropped
+        per_shard = math.ceil(num_questions / shards) + 1
+        # Each shard is routed on its own, with the shard deadline as its latency target
+        requests = [
+            (self._exam_prompt(avoidance_list, f"{job_role} ({topic})", per_shard, difficulty),
+             self._choose_model(per_shard, deadline))
+            for topic in topics[:shards]
+        ]
 
+        try:
+            results = run_async(self._generate_shards(requests, deadline, fresh), timeout=deadline + 5)
+        except Exception as e:
+            logging.error(f"Sharded question generation failed: {str(e)}")
+            results = [([], False)] * len(requests)
 
+        # Interleave the shards so a short exam still covers every sub-topic
+        merged = [q for group in zip_longest(*(raw for raw, _ in results)) for q in group if q is not None]
+        questions = list(self._unique_questions(merged, avoidance_list, job_role, num_questions))
+        data = {"questions": questions, "complete": all(complete for _, complete in results), "recovered": len(merged)}
+        if not questions and all(get_breaker(model).state == "open" for _, model in requests):
+            data["degraded"] = True
+        return data
 
@@ -0,0 +1,298 @@
+"""
+Local stand-in for the Gemini REST API, for offline load tests.
+
+Point AIService at it with GEMINI_BASE_URL=http://127.0.0.1:8765 (any
+GEMINI_API_KEY will do) and it answers generateContent, streamGenerateContent
+(SSE) and model lookups:
+
+  replay (default)  Serve recorded fixtures: the one recorded for the same
+                    prompt, else (unless --strict) the next fixture round-robin,
+                    so prompts with per-user avoidance lists still get answers.
+  record            Proxy to the real API (--upstream) and save each response
+                    as a fixture for later replays.
+
+Replies can be shaped to look like production: a latency distribution before
+the first byte, chunked streaming with a delay between chunks, truncated
+responses (finishReason MAX_TOKENS) and injected API errors.
+
+    python -m ai_agents.fake_gemini --fixtures var/gemini_fixtures \\
+        --latency lognormal:0.4,0.5 --truncate-rate 0.05 --error-rate 0.02
+
+Only the standard library is used, so it runs without Django.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+_ERROR_STATUS = {400: 'INVALID_ARGUMENT', 429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE',
+                 504: 'DEADLINE_EXCEEDED'}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Seconds-before-first-byte sampler from "fixed:S", "uniform:LO,HI",
+    "normal:MEAN,SD" or "lognormal:MEDIAN,SIGMA".
+    """
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',') if v]
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == 'lognormal':
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+class Fixtures:
+    """Recorded responses, one JSON file each: {"model", "prompt", "text"}."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._by_key: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        for path in sorted(self.directory.glob('*.json')):
+            try:
+                entry = json.loads(path.read_text(encoding='utf-8'))
+                self._by_key[prompt_key(entry['prompt'])] = entry['text']
+            except (OSError, ValueError, KeyError):
+                continue
+        self._cycle = itertools.cycle(list(self._by_key.values())) if self._by_key else None
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def lookup(self, prompt: str, strict: bool) -> Optional[str]:
+        text = self._by_key.get(prompt_key(prompt))
+        if text is None and not strict and self._cycle is not None:
+            with self._lock:
+                text = next(self._cycle)
+        return text
+
+    def save(self, model: str, prompt: str, text: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        key = prompt_key(prompt)
+        path = self.directory / f"{key}.json"
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'model': model, 'prompt': prompt, 'text': text}, indent=1), encoding='utf-8')
+        tmp.replace(path)
+        with self._lock:
+            self._by_key[key] = text
+
+
+def _response(text: str, finish_reason: str = 'STOP') -> Dict:
+    return {
+        'candidates': [{
+            'content': {'parts': [{'text': text}], 'role': 'model'},
+            'finishReason': finish_reason,
+            'index': 0,
+        }],
+        'usageMetadata': {'candidatesTokenCount': max(1, len(text) // 4)},
+        'modelVersion': 'fake-gemini',
+    }
+
+
+def _chunks(text: str, count: int) -> List[str]:
+    size = max(1, -(-len(text) // max(1, count)))
+    return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    server_version = 'FakeGemini/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    # Set on the server instance by make_server()
+    @property
+    def options(self):
+        return self.server.options
+
+    def log_message(self, format, *args):
+        if self.options.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, code: int, message: str) -> None:
+        self._send_json(code, {'error': {'code': code, 'message': message,
+                                         'status': _ERROR_STATUS.get(code, 'UNKNOWN')}})
+
+    def _route(self) -> Tuple[str, str]:
+        """(model, method) from /v1beta/models/<model>:<method>?..."""
+        path = self.path.split('?', 1)[0]
+        name = path.rsplit('/models/', 1)[-1]
+        model, _, method = name.partition(':')
+        return model, method
+
+    def do_GET(self):
+        model, _ = self._route()
+        self._send_json(200, {'name': f"models/{model}", 'displayName': model,
+                              'supportedGenerationMethods': ['generateContent']})
+
+    def do_POST(self):
+        model, method = self._route()
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_error(400, 'Invalid JSON payload')
+        prompt = ''.join(part.get('text', '') for content in request.get('contents', [])
+                         for part in content.get('parts', []))
+        if method not in ('generateContent', 'streamGenerateContent'):
+            return self._send_error(404, f"Unknown method {method}")
+        stream = method == 'streamGenerateContent'
+        if self.options.record:
+            return self._record(model, method, request, prompt, stream)
+        self._replay(prompt, stream)
+
+    def _replay(self, prompt: str, stream: bool) -> None:
+        options, rng = self.options, self.server.rng()
+        time.sleep(options.latency(rng))
+        if rng.random() < options.error_rate:
+            return self._send_error(rng.choice(options.error_codes), 'Injected error')
+        text = self.server.fixtures.lookup(prompt, options.strict)
+        if text is None:
+            return self._send_error(404, 'No fixture recorded for this prompt')
+        finish_reason = 'STOP'
+        if rng.random() < options.truncate_rate and len(text) > 1:
+            text = text[:rng.randint(1, len(text) - 1)]
+            finish_reason = 'MAX_TOKENS'
+        if not stream:
+            return self._send_json(200, _response(text, finish_reason))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        pieces = _chunks(text, options.chunks)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(options.chunk_delay)
+            last = i == len(pieces) - 1
+            event = f"data: {json.dumps(_response(piece, finish_reason if last else None))}\r\n\r\n".encode('utf-8')
+            self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _record(self, model: str, method: str, request: Dict, prompt: str, stream: bool) -> None:
+        query = '?alt=sse' if stream else ''
+        upstream = urllib.request.Request(
+            f"{self.options.upstream.rstrip('/')}/v1beta/models/{model}:{method}{query}",
+            data=json.dumps(request).encode('utf-8'),
+            headers={'Content-Type': 'application/json',
+                     'x-goog-api-key': self.headers.get('x-goog-api-key') or self.options.api_key or ''},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(upstream, timeout=300) as response:
+                raw = response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            return self._send_json(e.code, json.loads(e.read() or b'{}') or {})
+        except OSError as e:
+            return self._send_error(503, f"Upstream unreachable: {e}")
+
+        payloads = ([json.loads(line[len('data: '):]) for line in raw.splitlines() if line.startswith('data: ')]
+                    if stream else [json.loads(raw)])
+        text = ''.join(part.get('text', '') for payload in payloads
+                       for candidate in payload.get('candidates', [])[:1]
+                       for part in candidate.get('content', {}).get('parts', []))
+        self.server.fixtures.save(model, prompt, text)
+        # Recording is for capture, not latency: the client gets the whole reply at once
+        if stream:
+            self._replay_recorded(payloads)
+        else:
+            self._send_json(200, payloads[0])
+
+    def _replay_recorded(self, payloads: List[Dict]) -> None:
+        body = ''.join(f"data: {json.dumps(p)}\r\n\r\n" for p in payloads).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping pooled keep-alive connections are routine under load
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def make_server(options: argparse.Namespace) -> ThreadingHTTPServer:
+    server = FakeGeminiServer((options.host, options.port), FakeGeminiHandler)
+    server.options = options
+    server.fixtures = Fixtures(options.fixtures)
+    seed = itertools.count(options.seed)
+    seed_lock = threading.Lock()
+
+    def rng() -> random.Random:
+        # One generator per request, from a seeded sequence: reproducible runs
+        with seed_lock:
+            return random.Random(next(seed))
+
+    server.rng = rng
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m ai_agents.fake_gemini', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default='var/gemini_fixtures', help='Directory of recorded responses')
+    parser.add_argument('--record', action='store_true', help='Proxy to the real API and save fixtures')
+    parser.add_argument('--upstream', default='https://generativelanguage.googleapis.com')
+    parser.add_argument('--api-key', help='Key for the upstream in record mode (default: the client\'s)')
+    parser.add_argument('--strict', action='store_true', help='404 for prompts without their own fixture')
+    parser.add_argument('--latency', type=parse_latency, default=parse_latency('fixed:0'),
+                        help='Time to first byte: fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--chunks', type=int, default=20, help='SSE chunks per streamed reply')
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help='Seconds between streamed chunks')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='Share of replies cut off (MAX_TOKENS)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with an error')
+    parser.add_argument('--error-codes', type=lambda v: [int(c) for c in v.split(',')], default=[429, 500, 503])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true')
+    return parser
+
+
+def main(argv=None) -> None:
+    options = build_parser().parse_args(argv)
+    server = make_server(options)
+    mode = f"recording to {options.fixtures}" if options.record else f"replaying {len(server.fixtures)} fixtures"
+    print(f"Fake Gemini on http://{options.host}:{server.server_address[1]} ({mode})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Incremental JSON parsing for streamed model output.
+
+Gemini streams a JSON document as arbitrary text chunks. ArrayObjectStream
+is fed those chunks and returns every object of one top-level array (e.g.
+"questions") as soon as its closing brace arrives, so callers can act on the
+first question while the rest are still being generated. Each character is
+scanned once; consumed text is dropped from the buffer.
+
+salvage_array() applies the same scan to a complete response that json.loads
+rejects (cut off by max_output_tokens, wrapped in a code fence, trailing
+commas) and recovers every object that did complete.
+"""
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_FENCE = re.compile(r'^\s*```[\w-]*\s*\n?|\n?\s*```\s*$')
+
+
+def strip_code_fences(text: str) -> str:
+    return _FENCE.sub('', text or '')
+
+
+def strip_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing brace or bracket, outside strings."""
+    out = []
+    in_string = escape = False
+    pending_comma = None
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            out.append(ch)
+            continue
+        if pending_comma is not None:
+            if ch.isspace():
+                pending_comma.append(ch)
+                continue
+            if ch not in '}]':
+                out.append(',')
+            out.extend(pending_comma)
+            pending_comma = None
+        if ch == ',':
+            pending_comma = []
+            continue
+        if ch == '"':
+            in_string = True
+        out.append(ch)
+    if pending_comma is not None:
+        out.append(',')
+        out.extend(pending_comma)
+    return ''.join(out)
+
+
+def loads_lenient(text: str) -> Any:
+    """json.loads that also accepts raw control characters in strings and trailing commas."""
+    try:
+        return json.loads(text, strict=False)
+    except ValueError:
+        return json.loads(strip_trailing_commas(text), strict=False)
+
+
+class ArrayObjectStream:
+    """
+    Objects of the array under `key` in a streamed JSON object, or of a
+    top-level JSON array when `key` is None.
+    """
+
+    def __init__(self, key: Optional[str] = 'questions') -> None:
+        self._key = key
+        self._buffer = ''
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._last_string = ''      # most recent complete string outside array objects
+        self._current_key = None    # key of the top-level member being read
+        self._string_start = -1
+        self._array_depth = -1      # stack depth of the target array once found
+        self._object_start = -1
+        self.skipped = 0            # complete objects that could not be parsed even leniently
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Append a chunk; return the array objects it completed (unparseable ones are skipped)."""
+        self._buffer += chunk
+        done = []
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._object_start < 0:
+                        self._last_string = buf[self._string_start + 1:i]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ':' and len(self._stack) == 1:
+                self._current_key = self._last_string
+            elif ch in '{[':
+                self._stack.append(ch)
+                if ch == '[' and self._array_depth < 0 and self._is_target_array():
+                    self._array_depth = len(self._stack)
+                elif ch == '{' and len(self._stack) == self._array_depth + 1 and self._object_start < 0:
+                    self._object_start = i
+            elif ch in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if ch == '}' and self._object_start >= 0 and len(self._stack) == self._array_depth:
+                    try:
+                        value = loads_lenient(buf[self._object_start:i + 1])
+                        if isinstance(value, dict):
+                            done.append(value)
+                    except ValueError:
+                        self.skipped += 1
+                    self._object_start = -1
+                elif ch == ']' and len(self._stack) == self._array_depth - 1:
+                    self._array_depth = -2  # target array closed; ignore the rest
+            i += 1
+
+        # Keep only what an unfinished object or string still needs
+        keep = self._object_start if self._object_start >= 0 else (self._string_start if self._in_string else i)
+        self._buffer = buf[keep:]
+        self._pos = i - keep
+        if self._object_start >= 0:
+            self._object_start -= keep
+        if self._in_string:
+            self._string_start -= keep
+        return done
+
+    def _is_target_array(self) -> bool:
+        if self._key is None:
+            return len(self._stack) == 1
+        return len(self._stack) == 2 and self._stack[0] == '{' and self._current_key == self._key
+
+
+def iter_array_objects(chunks: Iterable[str], key: Optional[str] = 'questions') -> Iterator[Dict[str, Any]]:
+    """Yield each object of the `key` array as soon as the chunks complete it."""
+    stream = ArrayObjectStream(key)
+    for chunk in chunks:
+        if chunk:
+            yield from stream.feed(chunk)
+
+
+def salvage_array(text: str, key: Optional[str] = 'questions') -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    The objects of the `key` array in a model response, and whether the
+    response parsed as a whole. When it does not (truncated output, stray
+    prose), every object that completed is still returned; a bare top-level
+    array is accepted too.
+    """
+    text = strip_code_fences(text).strip()
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    text = text[min(starts):] if starts else ''
+    try:
+        data = loads_lenient(text)
+        items = data.get(key) if isinstance(data, dict) and key is not None else data
+        if isinstance(items, list):
+            return [item for item in items if isinstance(item, dict)], True
+    except ValueError:
+        pass
+
+    items = ArrayObjectStream(key).feed(text)
+    if not items and key is not None and text.startswith('['):
+        items = ArrayObjectStream(None).feed(text)
+    return items, False
+
@@ -0,0 +1,243 @@
+"""
+Bounded-latency calls to the LLM provider.
+
+call_with_resilience() runs a blocking provider call under one deadline
+budget for the whole request instead of a timeout per attempt:
+
+  - transient failures (429, 5xx, timeouts, dropped connections) are retried
+    with exponential backoff and full jitter, but only while the budget lasts;
+  - with GEMINI_HEDGE on, an attempt still running past the model's rolling
+    p95 latency gets a second, identical request; the first reply wins;
+  - a circuit breaker per model opens after GEMINI_BREAKER_FAILURES
+    consecutive failures. While it is open calls fail fast with
+    CircuitOpenError, so callers fall back to cached or banked questions
+    right away; after GEMINI_BREAKER_RESET seconds one trial call is let
+    through and its outcome closes or re-opens the circuit.
+
+Attempts run on a shared thread pool so the caller stops waiting at the
+deadline; an abandoned attempt ends at the HTTP client's own timeout.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar('T')
+
+_RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider is failing; the call was not attempted."""
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one trial call at a time."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+
+    def release(self) -> None:
+        """A call ended without a verdict (cancelled): let the next trial through."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Durations of the most recent successful calls."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyWindow] = {}
+_registry_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """The breaker of one model, shared by all kinds of calls to it."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                failure_threshold=int(_env_float('GEMINI_BREAKER_FAILURES', 5)),
+                reset_timeout=_env_float('GEMINI_BREAKER_RESET', 30),
+            )
+        return _breakers[name]
+
+
+def get_latency(name: str) -> LatencyWindow:
+    with _registry_lock:
+        return _latencies.setdefault(name, LatencyWindow())
+
+
+def reset_resilience() -> None:
+    """Forget breaker states and latency samples (in tests)."""
+    with _registry_lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _registry_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=int(_env_float('GEMINI_POOL_SIZE', 20)),
+                                           thread_name_prefix='gemini-call')
+        return _executor
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transient provider errors worth another attempt; bad requests and auth errors are not."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, 'code', None)
+    if isinstance(code, int):
+        return code in _RETRYABLE_CODES
+    # httpx transport errors (timeouts, resets) carry no status code
+    return type(exc).__module__.startswith('httpx')
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def hedge_threshold(name: str) -> Optional[float]:
+    """Seconds after which an attempt is hedged: GEMINI_HEDGE_AFTER, else the rolling p95 once known."""
+    if os.environ.get('GEMINI_HEDGE', '0').lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+    fixed = _env_float('GEMINI_HEDGE_AFTER', 0)
+    if fixed > 0:
+        return fixed
+    window = get_latency(name)
+    return window.percentile(95) if len(window) >= 20 else None
+
+
+def _attempt(call: Callable[[], T], name: str, budget: float) -> T:
+    """One attempt, hedged past the threshold; raises TimeoutError when the budget runs out."""
+    started = time.monotonic()
+    futures = [_pool().submit(call)]
+    hedge_after = hedge_threshold(name)
+    if hedge_after is not None and hedge_after < budget:
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            futures.append(_pool().submit(call))
+
+    error: Optional[BaseException] = None
+    pending = set(futures)
+    while pending:
+        remaining = budget - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                get_latency(name).add(time.monotonic() - started)
+                return future.result()
+            error = future.exception()
+    if error is not None and not pending:
+        raise error
+    raise TimeoutError(f"{name}: no reply within {budget:.1f}s")
+
+
+def call_with_resilience(call: Callable[[], T], name: str, deadline: Optional[float] = None,
+                         max_attempts: Optional[int] = None) -> T:
+    """
+    call() within `deadline` seconds (GEMINI_DEADLINE by default), retried and
+    hedged as described above. `name` selects the circuit breaker and the
+    latency window (e.g. the model name, with a suffix for another kind of
+    call). Raises CircuitOpenError without calling when the breaker is open,
+    else the last error once the budget or the attempts (GEMINI_MAX_ATTEMPTS)
+    are used up.
+    """
+    deadline = deadline or _env_float('GEMINI_DEADLINE', 40)
+    max_attempts = max_attempts or int(_env_float('GEMINI_MAX_ATTEMPTS', 3))
+    breaker = get_breaker(name.split(':')[0])
+    end = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{name}: provider circuit is open")
+        attempt += 1
+        try:
+            result = _attempt(call, name, end - time.monotonic())
+        except Exception as e:
+            if not is_retryable(e):
+                # The provider answered (bad request, auth): not a sign of degradation
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(attempt)
+            if attempt >= max_attempts or time.monotonic() + delay >= end:
+                raise
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
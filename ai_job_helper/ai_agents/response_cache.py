@@ -0,0 +1,155 @@
+"""
+On-disk cache of LLM responses.
+
+Entries are keyed by a SHA-256 of (model, prompt, generation config) and
+stored one file per entry, zlib-compressed, under GEMINI_CACHE_DIR (default
+<BASE_DIR>/var/llm_cache). Reads bump the file's mtime, so eviction can drop
+the least recently used entries once the directory outgrows
+GEMINI_CACHE_MAX_MB. Entries older than GEMINI_CACHE_TTL seconds are misses
+(0 keeps them forever, e.g. for a recorded cache replayed in load tests).
+Writes go through a temp file and os.replace, so concurrent workers never
+read half an entry. GEMINI_CACHE=0 turns the cache off.
+
+Exam generation spreads each prompt over GEMINI_CACHE_VARIANTS entries and
+serves a cached response shuffled and filtered against the candidate's
+seen questions, so first-time candidates for a role do not all get the
+same exam (see AIService._cache_keys).
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_SUFFIX = '.z'
+
+
+def cache_key(model: str, prompt: str, config: Dict[str, Any]) -> str:
+    payload = json.dumps({'model': model, 'prompt': prompt, 'config': config}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, directory: Path, max_bytes: int, ttl: float) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None  # approximate bytes on disk, rescanned on eviction
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / (key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                entry = json.loads(zlib.decompress(fh.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error):
+            self._remove(path)
+            return None
+        if self.ttl and time.time() - entry.get('created', 0) > self.ttl:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)  # recency for LRU eviction
+        except OSError:
+            pass
+        return entry.get('text')
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        data = zlib.compress(json.dumps({'created': time.time(), 'text': text}).encode('utf-8'))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"LLM cache write failed: {e}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for path in self.directory.glob(f'*/*{_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            yield path, stat
+
+    def _scan_size(self) -> int:
+        return sum(stat.st_size for _, stat in self._entries())
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is at 90% of its budget."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        size = sum(stat.st_size for _, stat in entries)
+        budget = self.max_bytes * 0.9
+        for path, stat in entries:
+            if size <= budget:
+                break
+            self._remove(path)
+            size -= stat.st_size
+        self._size = size
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for path, _ in list(self._entries()):
+                self._remove(path)
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        entries = list(self._entries())
+        return {'entries': len(entries), 'bytes': sum(stat.st_size for _, stat in entries)}
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def _default_dir() -> Path:
+    configured = os.environ.get('GEMINI_CACHE_DIR')
+    if configured:
+        return Path(configured)
+    try:
+        from django.conf import settings
+        return Path(settings.BASE_DIR) / 'var' / 'llm_cache'
+    except Exception:
+        return Path.home() / '.cache' / 'ai_job_helper' / 'llm'
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The process-wide cache, or None when GEMINI_CACHE=0."""
+    global _cache
+    if os.environ.get('GEMINI_CACHE', '1').lower() in ('0', 'false', 'no', 'off'):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    _default_dir(),
+                    max_bytes=int(float(os.environ.get('GEMINI_CACHE_MAX_MB', '256')) * 1024 * 1024),
+                    ttl=float(os.environ.get('GEMINI_CACHE_TTL', str(7 * 24 * 3600))),
+                )
+    return _cache
@@ -0,0 +1,219 @@
+"""
+Per-call model routing from observed performance.
+
+Every provider attempt is recorded against its model in a rolling window
+(GEMINI_ROUTER_WINDOW calls): latency, success, and output tokens. From
+those, ModelRouter.choose() picks a model for each request:
+
+  - small requests (at most GEMINI_ROUTER_SMALL questions, e.g. top-ups)
+    go to the model expected to answer fastest;
+  - larger ones go to the most reliable model, the lowest failure rate,
+    among those expected to finish within the latency target, and to the
+    fastest one when none is.
+
+The expected latency of a model is its time to first byte plus the request's
+estimated output tokens at the model's generation speed, both fitted from
+the window (latency against output tokens). Models whose circuit breaker is open are
+skipped while any other is available. A model with fewer than
+_MIN_SAMPLES calls is tried first, and afterwards a share GEMINI_ROUTER_EXPLORE
+of requests goes to a random model, so every candidate keeps fresh stats.
+
+Candidates come from GEMINI_MODELS (comma-separated), defaulting to the one
+configured model. snapshot() returns every model's stats and the most
+recent routing decisions, for monitoring.
+"""
+import os
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .resilience import CircuitBreaker, get_breaker
+
+TOKENS_PER_QUESTION = 110  # question, four options, explanation and topic, as JSON
+_MIN_SAMPLES = 3
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Sample(NamedTuple):
+    at: float
+    latency: float
+    ok: bool
+    output_tokens: int
+
+
+class Route(NamedTuple):
+    model: str
+    reason: str
+    num_questions: int
+    expected_latency: Optional[float]
+    at: float
+
+
+class ModelStats:
+    """Rolling window of one model's calls."""
+
+    def __init__(self, size: int = 100) -> None:
+        self._samples: Deque[Sample] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool, output_tokens: int = 0) -> None:
+        with self._lock:
+            self._samples.append(Sample(time.time(), latency, ok, output_tokens))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+        ok = [s for s in samples if s.ok]
+        latencies = sorted(s.latency for s in ok)
+        overhead, seconds_per_token = _fit_latency(ok)
+        busy = sum(s.latency for s in ok if s.output_tokens)
+        tokens = sum(s.output_tokens for s in ok if s.output_tokens)
+        return {
+            'calls': len(samples),
+            'failure_rate': round(1 - len(ok) / len(samples), 4) if samples else None,
+            'p50_latency': round(latencies[len(latencies) // 2], 3) if latencies else None,
+            'p95_latency': round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 3) if latencies else None,
+            # Output tokens per second of wall time, time to first byte included
+            'tokens_per_second': round(tokens / busy, 1) if busy else None,
+            # Fitted time to first byte and generation speed once the first byte is out
+            'overhead': round(overhead, 3) if overhead is not None else None,
+            'generation_tokens_per_second': round(1 / seconds_per_token, 1) if seconds_per_token else None,
+        }
+
+
+def _fit_latency(samples: Sequence[Sample]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (overhead seconds, seconds per output token) from a least-squares fit of
+    latency against output tokens; without enough spread in output sizes, no
+    overhead and the wall-time rate.
+    """
+    points = [(s.output_tokens, s.latency) for s in samples if s.output_tokens]
+    if not points:
+        return None, None
+    if len(points) >= 3:
+        mean_t = statistics.fmean(t for t, _ in points)
+        mean_l = statistics.fmean(l for _, l in points)
+        var_t = sum((t - mean_t) ** 2 for t, _ in points)
+        if var_t > 0:
+            slope = sum((t - mean_t) * (l - mean_l) for t, l in points) / var_t
+            intercept = mean_l - slope * mean_t
+            if slope > 0 and intercept >= 0:
+                return intercept, slope
+    return 0.0, sum(l for _, l in points) / sum(t for t, _ in points)
+
+
+def expected_latency(summary: Dict[str, Any], num_questions: int) -> Optional[float]:
+    """Seconds a model should take for num_questions, from its summary; None without data."""
+    if summary['p50_latency'] is None:
+        return None
+    if not summary['generation_tokens_per_second']:
+        return summary['p50_latency']
+    return summary['overhead'] + num_questions * TOKENS_PER_QUESTION / summary['generation_tokens_per_second']
+
+
+class ModelRouter:
+    def __init__(self, models: Sequence[str], window: int = 100, small_request: int = 10,
+                 latency_target: float = 20.0, explore: float = 0.05) -> None:
+        self.models = list(dict.fromkeys(models))
+        self.small_request = small_request
+        self.latency_target = latency_target
+        self.explore = explore
+        self._stats = {model: ModelStats(window) for model in self.models}
+        self._routes: Deque[Route] = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def stats(self, model: str) -> ModelStats:
+        with self._lock:
+            if model not in self._stats:
+                self._stats[model] = ModelStats(next(iter(self._stats.values()))._samples.maxlen
+                                                if self._stats else 100)
+            return self._stats[model]
+
+    def record(self, model: str, latency: float, ok: bool, output_tokens: int = 0) -> None:
+        self.stats(model).record(latency, ok, output_tokens)
+
+    def choose(self, num_questions: int, latency_target: Optional[float] = None) -> str:
+        target = latency_target or self.latency_target
+        usable = [m for m in self.models if get_breaker(m).state != CircuitBreaker.OPEN] or self.models
+        if len(usable) == 1:
+            return self._route(usable[0], 'only', num_questions, None)
+
+        untried = [m for m in usable if len(self.stats(m)) < _MIN_SAMPLES]
+        if untried:
+            model = min(untried, key=lambda m: len(self.stats(m)))
+            return self._route(model, 'warmup', num_questions, None)
+        if random.random() < self.explore:
+            return self._route(random.choice(usable), 'explore', num_questions, None)
+
+        summaries = {m: self.stats(m).summary() for m in usable}
+        expected = {m: expected_latency(summaries[m], num_questions) for m in usable}
+        # Models without a successful call yet are assumed slow
+        expected = {m: float('inf') if e is None else e for m, e in expected.items()}
+        fastest = min(usable, key=lambda m: (expected[m], summaries[m]['failure_rate']))
+        if num_questions <= self.small_request:
+            return self._route(fastest, 'fastest', num_questions, expected[fastest])
+        in_time = [m for m in usable if expected[m] <= target]
+        if not in_time:
+            return self._route(fastest, 'fastest-over-target', num_questions, expected[fastest])
+        reliable = min(in_time, key=lambda m: (summaries[m]['failure_rate'], expected[m]))
+        return self._route(reliable, 'reliable', num_questions, expected[reliable])
+
+    def _route(self, model: str, reason: str, num_questions: int, expected: Optional[float]) -> str:
+        self._routes.append(Route(model, reason, num_questions,
+                                  None if expected is None or expected == float('inf') else round(expected, 3),
+                                  time.time()))
+        return model
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every model's stats and breaker state, and the latest routing decisions."""
+        return {
+            'models': {m: dict(self.stats(m).summary(), breaker=get_breaker(m).state) for m in list(self._stats)},
+            'routes': [route._asdict() for route in list(self._routes)],
+            'small_request': self.small_request,
+            'latency_target': self.latency_target,
+        }
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def candidate_models(default_model: str) -> List[str]:
+    configured = [m.strip() for m in os.environ.get('GEMINI_MODELS', '').split(',') if m.strip()]
+    return configured or [default_model]
+
+
+def get_router(default_model: str) -> ModelRouter:
+    """
+    The process-wide router. Its candidates are read from the environment on
+    first use, and again when the configured model is not among them.
+    """
+    global _router
+    with _router_lock:
+        if _router is None or (default_model not in _router.models and not os.environ.get('GEMINI_MODELS')):
+            _router = ModelRouter(
+                candidate_models(default_model),
+                window=int(_env_float('GEMINI_ROUTER_WINDOW', 100)),
+                small_request=int(_env_float('GEMINI_ROUTER_SMALL', 10)),
+                latency_target=_env_float('GEMINI_LATENCY_TARGET', 20),
+                explore=_env_float('GEMINI_ROUTER_EXPLORE', 0.05),
+            )
+        return _router
+
+
+def reset_router() -> None:
+    global _router
+    with _router_lock:
+        _router = None
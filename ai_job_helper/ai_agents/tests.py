@@ -0,0 +1,481 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from . import fake_gemini
+from .ai_service import AIService, reset_gemini
+from .resilience import CircuitBreaker, CircuitOpenError, call_with_resilience, get_breaker, reset_resilience
+from .json_stream import ArrayObjectStream, iter_array_objects, salvage_array
+from .response_cache import ResponseCache
+from .router import ModelRouter, get_router, reset_router
+
+
+class ArrayObjectStreamTests(SimpleTestCase):
+    def test_objects_complete_as_chunks_arrive(self):
+        stream = ArrayObjectStream('questions')
+        self.assertEqual(stream.feed('{"questions": [{"question": "a"}, {"quest'), [{'question': 'a'}])
+        self.assertEqual(stream.feed('ion": "b}"}'), [{'question': 'b}'}])
+        self.assertEqual(stream.feed(']}'), [])
+
+    def test_any_chunking_matches_json_loads(self):
+        rng = random.Random(7)
+        questions = [{'question': f'Q{i} "quoted" {{x}} [y] \\ z', 'options': ['a', 'b}', 'c]', 'd'],
+                      'meta': {'n': [1, {'k': 'v'}]}} for i in range(6)]
+        doc = json.dumps({'note': 'questions', 'other': {'questions': [{'bad': 1}]},
+                          'questions': questions, 'tail': [{'z': 1}]})
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(doc)), 30))
+            chunks = [doc[a:b] for a, b in zip([0] + cuts, cuts + [len(doc)])]
+            self.assertEqual(list(iter_array_objects(chunks)), questions)
+
+    def test_top_level_array(self):
+        self.assertEqual(list(iter_array_objects(['[{"a": 1},', ' {"b": 2}]'], key=None)), [{'a': 1}, {'b': 2}])
+
+
+class _ShardModels:
+    """Async generate_content answering per sub-topic: one shard fails, one is too slow."""
+
+    async def generate_content(self, *, model, contents, config):
+        if 'troubleshooting' in contents:
+            raise RuntimeError('quota exceeded')
+        if 'security' in contents:
+            await asyncio.sleep(5)
+        topic = contents.split('(')[1].split(')')[0]
+        questions = [{'question': f'{topic} question {i}?', 'options': ['a', 'b', 'c', 'd'],
+                      'correct_answer': 'A', 'explanation': 'because', 'topic': topic} for i in range(8)]
+        questions.append({'question': 'Shared duplicate question?', 'options': ['a', 'b', 'c', 'd']})
+        return SimpleNamespace(text=json.dumps({'questions': questions}))
+
+
+@mock.patch.dict(os.environ, {'GEMINI_CACHE': '0'})
+class ShardedGenerationTests(SimpleTestCase):
+    def setUp(self):
+        self.service = AIService.__new__(AIService)
+        self.service._client = SimpleNamespace(aio=SimpleNamespace(models=_ShardModels()))
+        self.service._legacy_model = None
+        self.service._model_name = 'test-model'
+
+    def test_partial_failures_still_yield_questions(self):
+        started = time.monotonic()
+        data = self.service.generate_exam_questions_sharded(
+            avoidance_list=['core concepts and fundamentals question 0?'],
+            job_role='Backend Developer', num_questions=30, shards=5, deadline=1)
+        self.assertLess(time.monotonic() - started, 3)
+        texts = [q['question'] for q in data['questions']]
+        # 3 of 5 shards answered: 3 x 8 topic questions, one avoided, plus one shared duplicate
+        self.assertEqual(len(texts), 24)
+        self.assertEqual(len(set(texts)), len(texts))
+        self.assertNotIn('core concepts and fundamentals question 0?', texts)
+        self.assertEqual({t.split(' question')[0] for t in texts[:3]},
+                         {'core concepts and fundamentals', 'tools, languages and technologies',
+                          'architecture, design and trade-offs'})
+        # Dropped shards make the result incomplete, so callers ask again for the shortfall
+        self.assertFalse(data['complete'])
+        self.assertEqual(data['recovered'], 27)
+        self.assertNotIn('degraded', data)
+
+    def test_difficulty_reaches_the_prompts(self):
+        prompts = []
+
+        async def generate_content(*, model, contents, config):
+            prompts.append(contents)
+            return SimpleNamespace(text=_questions_doc(2))
+
+        self.service._client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+        data = self.service.generate_exam_questions_sharded(
+            avoidance_list=[], job_role='Backend Developer', num_questions=4, shards=2, difficulty='hard')
+        self.assertEqual(len(prompts), 2)
+        self.assertTrue(all('hard-difficulty' in prompt for prompt in prompts))
+        self.assertTrue(data['complete'])
+
+
+def _questions_doc(n):
+    return json.dumps({'questions': [
+        {'question': f'Question number {i}, with "quotes"?', 'options': ['a', 'b', 'c', 'd'],
+         'correct_answer': 'B', 'explanation': 'Because it is.', 'topic': 'python'} for i in range(n)
+    ]}, indent=2)
+
+
+class SalvageArrayTests(SimpleTestCase):
+    def test_valid_document_is_complete(self):
+        items, complete = salvage_array(_questions_doc(3))
+        self.assertTrue(complete)
+        self.assertEqual(len(items), 3)
+
+    def test_truncated_output_keeps_complete_objects(self):
+        doc = _questions_doc(10)
+        items, complete = salvage_array(doc[:doc.index('Question number 7')])
+        self.assertFalse(complete)
+        self.assertEqual([q['question'][:17] for q in items], [f'Question number {i}' for i in range(7)])
+
+    def test_code_fences_prose_and_trailing_commas(self):
+        text = 'Here you go:\n```json\n{"questions": [{"question": "a, b]",}, {"question": "c"},],}\n```'
+        self.assertEqual(salvage_array(text), ([{'question': 'a, b]'}, {'question': 'c'}], True))
+
+    def test_truncated_bare_array(self):
+        self.assertEqual(salvage_array('[{"question": "x"}, {"question": "y'), ([{'question': 'x'}], False))
+
+
+@mock.patch.dict(os.environ, {'GEMINI_CACHE': '0'})
+class TruncatedGenerationTests(SimpleTestCase):
+    def test_recovered_questions_are_reported(self):
+        doc = _questions_doc(30)
+        truncated = doc[:doc.index('Question number 12')]
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(
+            generate_content=lambda **kwargs: SimpleNamespace(text=truncated)))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        data = service.generate_exam_questions_for_user(
+            user_context={}, avoidance_list=[], job_role='Backend Developer', num_questions=30)
+        self.assertFalse(data['complete'])
+        self.assertEqual(data['recovered'], 12)
+        self.assertEqual(len(data['questions']), 12)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def test_roundtrip_and_ttl(self):
+        cache = ResponseCache(self.dir, max_bytes=1 << 20, ttl=60)
+        cache.put('ab' * 32, 'response text')
+        self.assertEqual(cache.get('ab' * 32), 'response text')
+        self.assertIsNone(cache.get('cd' * 32))
+        with mock.patch('ai_agents.response_cache.time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get('ab' * 32))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_evicts_least_recently_used(self):
+        keys = [f'{i:02d}' * 32 for i in range(4)]
+        values = ['x' * 50 + str(i) for i in range(4)]
+        entry_size = len(zlib.compress(json.dumps({'created': time.time(), 'text': values[0]}).encode()))
+        # Room for three entries and a half
+        cache = ResponseCache(self.dir, max_bytes=int(entry_size * 3.5), ttl=0)
+        for i, key in enumerate(keys[:3]):
+            cache.put(key, values[i])
+            os.utime(cache._path(key), (1000 + i, 1000 + i))
+        cache.get(keys[0])  # now the most recently used
+        cache.put(keys[3], values[3])
+        self.assertEqual(cache.get(keys[0]), values[0])
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual(cache.get(keys[2]), values[2])
+        self.assertEqual(cache.stats()['entries'], 3)
+
+    def test_cached_generation_is_filtered_per_candidate(self):
+        calls = []
+
+        def generate_content(**kwargs):
+            calls.append(kwargs['contents'])
+            return SimpleNamespace(text=_questions_doc(3))
+
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE_DIR': str(self.dir), 'GEMINI_CACHE': '1',
+                                          'GEMINI_CACHE_VARIANTS': '1'}), \
+                mock.patch('ai_agents.response_cache._cache', None):
+            # The prompt names only the first five avoided questions
+            avoided = [f'Earlier question {i}?' for i in range(5)]
+            kwargs = dict(user_context={}, job_role='Backend Developer', num_questions=3)
+            first = service.generate_exam_questions_for_user(avoidance_list=avoided, **kwargs)
+            second = service.generate_exam_questions_for_user(avoidance_list=avoided, **kwargs)
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(sorted(q['question'] for q in second['questions']),
+                             sorted(q['question'] for q in first['questions']))
+            # Same prompt, but this candidate has seen a cached question: too few left, so generate
+            seen = avoided + [first['questions'][0]['question']]
+            third = service.generate_exam_questions_for_user(avoidance_list=seen, **kwargs)
+            self.assertEqual(len(calls), 2)
+            self.assertNotIn(seen[-1], [q['question'] for q in third['questions']])
+            service.generate_exam_questions_for_user(avoidance_list=avoided, fresh=True, **kwargs)
+        self.assertEqual(len(calls), 3)
+
+    def test_cache_slots_hold_different_responses(self):
+        docs = iter([_questions_doc(3), _questions_doc(3).replace('Question number', 'Other question')])
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(
+            generate_content=lambda **kwargs: SimpleNamespace(text=next(docs))))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE_DIR': str(self.dir), 'GEMINI_CACHE': '1',
+                                          'GEMINI_CACHE_VARIANTS': '2'}), \
+                mock.patch('ai_agents.response_cache._cache', None), \
+                mock.patch('ai_agents.ai_service.random.choice', side_effect=lambda keys: keys[len(keys) > 1]):
+            kwargs = dict(user_context={}, avoidance_list=[], job_role='Backend Developer', num_questions=3)
+            service.generate_exam_questions_for_user(**kwargs)
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE_DIR': str(self.dir), 'GEMINI_CACHE': '1',
+                                          'GEMINI_CACHE_VARIANTS': '2'}), \
+                mock.patch('ai_agents.response_cache._cache', None), \
+                mock.patch('ai_agents.ai_service.random.choice', side_effect=lambda keys: keys[0]):
+            other = service.generate_exam_questions_for_user(**kwargs)
+            self.assertTrue(all(q['question'].startswith('Other') for q in other['questions']))
+            self.assertEqual(ResponseCache(self.dir, 1 << 20, 0).stats()['entries'], 2)
+
+    def test_stream_cached_when_consumer_stops_after_last_question(self):
+        reset_router()
+        self.addCleanup(reset_router)
+        doc = _questions_doc(5)
+        tail = doc.rindex(']')
+        chunks = [SimpleNamespace(text=doc[i:min(i + 40, tail)]) for i in range(0, tail, 40)]
+        chunks.append(SimpleNamespace(text=doc[tail:]))
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(generate_content_stream=lambda **kwargs: iter(chunks)))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE_DIR': str(self.dir), 'GEMINI_CACHE': '1'}), \
+                mock.patch('ai_agents.response_cache._cache', None):
+            got = []
+            # Like exam.streaming: stop reading once the questions needed are in
+            for q in service.stream_exam_questions(avoidance_list=[], job_role='Backend Developer', num_questions=5):
+                got.append(q)
+                if len(got) == 5:
+                    break
+            self.assertEqual(ResponseCache(self.dir, 1 << 20, 0).stats()['entries'], 1)
+        stats = get_router('test-model').snapshot()['models']['test-model']
+        self.assertEqual((stats['calls'], stats['failure_rate']), (1, 0.0))
+
+
+class FakeGeminiTests(SimpleTestCase):
+    """AIService against the local stand-in server, over real HTTP."""
+
+    def start_server(self, *argv):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        fixtures = fake_gemini.Fixtures(Path(tmp.name))
+        fixtures.save('gemini-2.5-flash', 'recorded prompt', _questions_doc(5))
+        options = fake_gemini.build_parser().parse_args(['--port', '0', '--fixtures', tmp.name, *argv])
+        server = fake_gemini.make_server(options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        env = mock.patch.dict(os.environ, {'GEMINI_BASE_URL': f'http://127.0.0.1:{server.server_address[1]}',
+                                           'GEMINI_API_KEY': 'test', 'GEMINI_CACHE': '0'})
+        env.start()
+        self.addCleanup(env.stop)
+        reset_gemini()
+        reset_resilience()
+        self.addCleanup(reset_gemini)
+        self.addCleanup(reset_resilience)
+        return server
+
+    def test_replay_and_stream(self):
+        self.start_server('--latency', 'uniform:0,0.01', '--chunks', '7')
+        service = AIService()
+        kwargs = dict(avoidance_list=[], job_role='Backend Developer', num_questions=5)
+        result = service.generate_exam_questions_for_user(user_context={}, **kwargs)
+        self.assertEqual(len(result['questions']), 5)
+        self.assertTrue(result['complete'])
+        self.assertEqual(list(service.stream_exam_questions(**kwargs)), result['questions'])
+
+    def test_truncation_and_errors(self):
+        self.start_server('--truncate-rate', '1')
+        result = AIService().generate_exam_questions_for_user(
+            user_context={}, avoidance_list=[], job_role='Backend Developer', num_questions=5)
+        self.assertFalse(result['complete'])
+        self.assertLess(len(result['questions']), 5)
+
+        self.start_server('--error-rate', '1', '--error-codes', '503')
+        result = AIService().generate_exam_questions_for_user(
+            user_context={}, avoidance_list=[], job_role='Backend Developer', num_questions=5)
+        self.assertEqual(result['questions'], [])
+
+    def test_latency_distributions(self):
+        rng = random.Random(1)
+        self.assertEqual(fake_gemini.parse_latency('fixed:0.2')(rng), 0.2)
+        self.assertTrue(all(0.1 <= fake_gemini.parse_latency('uniform:0.1,0.3')(rng) <= 0.3 for _ in range(50)))
+        self.assertTrue(all(fake_gemini.parse_latency('lognormal:0.5,0.4')(rng) > 0 for _ in range(50)))
+        with self.assertRaises(ValueError):
+            fake_gemini.parse_latency('pareto:1')
+
+
+class _APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f'HTTP {code}')
+        self.code = code
+
+
+class ResilienceTests(SimpleTestCase):
+    def setUp(self):
+        reset_resilience()
+        self.addCleanup(reset_resilience)
+        patcher = mock.patch('ai_agents.resilience.backoff_delay', return_value=0.01)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def flaky(self, *outcomes):
+        """A call that raises or returns each outcome in turn, sleeping for (seconds, value) tuples."""
+        calls = []
+
+        def call():
+            outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+            calls.append(outcome)
+            if isinstance(outcome, tuple):
+                time.sleep(outcome[0])
+                outcome = outcome[1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return call, calls
+
+    def test_transient_errors_are_retried(self):
+        call, calls = self.flaky(_APIError(503), _APIError(429), 'ok')
+        self.assertEqual(call_with_resilience(call, 'm', deadline=5), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_bad_request_is_not_retried(self):
+        call, calls = self.flaky(_APIError(400), 'ok')
+        with self.assertRaises(_APIError):
+            call_with_resilience(call, 'm', deadline=5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(get_breaker('m').state, CircuitBreaker.CLOSED)
+
+    def test_deadline_bounds_slow_calls(self):
+        call, _ = self.flaky((1.0, 'late'))
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            call_with_resilience(call, 'm', deadline=0.2)
+        self.assertLess(time.monotonic() - started, 0.6)
+
+    def test_slow_attempt_is_hedged(self):
+        call, calls = self.flaky((1.0, 'slow'), (0.0, 'hedge'))
+        with mock.patch.dict(os.environ, {'GEMINI_HEDGE': '1', 'GEMINI_HEDGE_AFTER': '0.05'}):
+            started = time.monotonic()
+            self.assertEqual(call_with_resilience(call, 'm', deadline=5), 'hedge')
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(calls), 2)
+
+    def test_breaker_opens_then_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.15)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_circuit_fails_fast_and_falls_back_to_cache(self):
+        calls = []
+
+        def generate_content(**kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(text=_questions_doc(3))
+
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        kwargs = dict(user_context={}, avoidance_list=[], job_role='Backend Developer', num_questions=3)
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE_DIR': tmp.name, 'GEMINI_CACHE': '1',
+                                          'GEMINI_BREAKER_FAILURES': '1', 'GEMINI_BREAKER_RESET': '60'}), \
+                mock.patch('ai_agents.response_cache._cache', None):
+            cached = service.generate_exam_questions_for_user(**kwargs)
+            get_breaker('test-model').record_failure()
+            self.assertFalse(service.provider_available())
+            fallback = service.generate_exam_questions_for_user(fresh=True, **kwargs)
+            self.assertEqual(sorted(q['question'] for q in fallback['questions']),
+                             sorted(q['question'] for q in cached['questions']))
+            other = service.generate_exam_questions_for_user(**dict(kwargs, job_role='Data Engineer'))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(other['questions'], [])
+        self.assertTrue(other['degraded'])
+
+    def test_failed_stream_open_counts_once_per_attempt(self):
+        def generate_content_stream(**kwargs):
+            raise _APIError(503)
+
+        def broken_stream(**kwargs):
+            yield SimpleNamespace(text='{"questions": [')
+            raise _APIError(503)
+
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        kwargs = dict(avoidance_list=[], job_role='Backend Developer', num_questions=3)
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE': '0', 'GEMINI_MAX_ATTEMPTS': '2',
+                                          'GEMINI_BREAKER_FAILURES': '10'}):
+            self.assertEqual(list(service.stream_exam_questions(**kwargs)), [])
+            self.assertEqual(get_breaker('test-model')._failures, 2)
+            # The open of a stream that breaks off later succeeded; the break is one failure
+            service._client.models.generate_content_stream = broken_stream
+            self.assertEqual(list(service.stream_exam_questions(**kwargs)), [])
+            self.assertEqual(get_breaker('test-model')._failures, 1)
+
+    def test_open_circuit_stream_replays_cache(self):
+        doc = _questions_doc(3)
+        service = AIService.__new__(AIService)
+        service._client = SimpleNamespace(models=SimpleNamespace(
+            generate_content_stream=lambda **kwargs: iter([SimpleNamespace(text=doc)])))
+        service._legacy_model = None
+        service._model_name = 'test-model'
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        kwargs = dict(avoidance_list=[], job_role='Backend Developer', num_questions=3)
+        with mock.patch.dict(os.environ, {'GEMINI_CACHE_DIR': tmp.name, 'GEMINI_CACHE': '1',
+                                          'GEMINI_BREAKER_FAILURES': '1', 'GEMINI_BREAKER_RESET': '60'}), \
+                mock.patch('ai_agents.response_cache._cache', None):
+            streamed = list(service.stream_exam_questions(**kwargs))
+            get_breaker('test-model').record_failure()
+            self.assertEqual(sorted(q['question'] for q in service.stream_exam_questions(fresh=True, **kwargs)),
+                             sorted(q['question'] for q in streamed))
+            self.assertEqual(list(service.stream_exam_questions(**dict(kwargs, job_role='Data Engineer'))), [])
+        self.assertEqual(len(streamed), 3)
+
+
+class ModelRouterTests(SimpleTestCase):
+    def setUp(self):
+        reset_resilience()
+        self.addCleanup(reset_resilience)
+        # 'quick': 0.3s to first byte, 1000 tokens/s, fails one call in four.
+        # 'steady': 1.5s to first byte, 400 tokens/s, never fails.
+        self.router = ModelRouter(['quick', 'steady'], small_request=10, latency_target=20, explore=0)
+        for i in range(20):
+            tokens = 200 + 50 * (i % 5)
+            self.router.record('quick', 0.3 + tokens / 1000, i % 4 != 0, tokens)
+            self.router.record('steady', 1.5 + tokens / 400, True, tokens)
+
+    def test_small_requests_go_to_the_fastest_model(self):
+        self.assertEqual(self.router.choose(5), 'quick')
+
+    def test_large_requests_go_to_the_most_reliable_model_in_time(self):
+        self.assertEqual(self.router.choose(30), 'steady')
+        # 30 questions take steady about 9.75s and quick about 3.6s
+        self.assertEqual(self.router.choose(30, latency_target=5), 'quick')
+        self.assertEqual(self.router.choose(30, latency_target=3), 'quick')
+        self.assertEqual([r['reason'] for r in self.router.snapshot()['routes']],
+                         ['reliable', 'reliable', 'fastest-over-target'])
+
+    def test_open_breaker_and_cold_models(self):
+        for _ in range(5):
+            get_breaker('steady').record_failure()
+        self.assertEqual(self.router.choose(30), 'quick')
+        router = ModelRouter(['quick', 'fresh'], explore=0)
+        router.record('quick', 1.0, True, 100)
+        self.assertEqual(router.choose(30), 'fresh')
+
+    def test_snapshot_reports_fitted_stats(self):
+        stats = self.router.snapshot()['models']['steady']
+        self.assertEqual(stats['calls'], 20)
+        self.assertEqual(self.router.snapshot()['models']['quick']['failure_rate'], 0.25)
+        self.assertAlmostEqual(stats['overhead'], 1.5, places=2)
+        self.assertAlmostEqual(stats['generation_tokens_per_second'], 400, delta=1)
+        self.assertEqual(stats['breaker'], 'closed')
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_job_helper.settings')
 
 application = get_wsgi_application()
+
+# Optionally build the shared Gemini client and open its connection while the
+# worker boots, instead of during the first exam generation
+if os.environ.get('GEMINI_WARMUP', '').lower() in ('1', 'true', 'yes'):
+    from ai_agents.ai_service import warmup
+    warmup(background=True)
@@ -7,7 +7,6 @@ from django.contrib.auth.decorators import login_required
 def home(request):
     ai_suggestions = None
     rewritten_resume = None
-    resume_text_ctx = request.user.userprofile.resume_text.strip() if getattr(request.user, 'userprofile', None) and request.user.userprofile.resume_text else ""
 
     if request.method == "POST":
         job_description = request.POST.get("job_description", "").strip()
@@ -28,5 +27,4 @@ def home(request):
     return render(request, "analysis/home.html", {
         "ai_suggestions": ai_suggestions,
         "rewritten_resume": rewritten_resume,
-        "resume_text": resume_text_ctx,
     })
@@ -1,8 +1,13 @@
 from django.contrib import admin
-from .models import ATSResult
+from .models import ATSResult, JDAnalysis
 
 @admin.register(ATSResult)
 class ATSResultAdmin(admin.ModelAdmin):
     list_display = ("user", "final_score", "created_at")
     list_filter = ("created_at", "final_score")
     search_fields = ("user__username",)
+
+@admin.register(JDAnalysis)
+class JDAnalysisAdmin(admin.ModelAdmin):
+    list_display = ("fingerprint", "taxonomy", "updated_at")
+    search_fields = ("fingerprint",)
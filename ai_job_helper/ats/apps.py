@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AtsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ats'
+
+    def ready(self):
+        # Compile the skill taxonomy once at startup instead of on first request
+        from .keywords import get_keywords
+        get_keywords()
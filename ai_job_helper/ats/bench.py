@@ -0,0 +1,238 @@
+"""
+Micro-benchmarks for the ATS scoring path.
+
+A seeded generator builds resume/JD pairs from 1 KB to 200 KB, keyword-dense
+or sparse, so runs are comparable across commits. Every case is timed with
+timeit (median of several rounds) and then run once more under tracemalloc
+to record its peak allocation. Runs are appended to a JSON history file, and
+compare() flags cases that got slower or allocate more than a baseline run.
+
+The taxonomy can be inflated with synthetic terms (taxonomy_scale) to check
+that matching cost follows document length, not vocabulary size.
+"""
+import json
+import platform
+import random
+import statistics
+import timeit
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.test.utils import override_settings
+
+from . import keywords as keywords_module
+from . import services
+from .keywords import compile_taxonomy, load_taxonomy
+from .sections import segment_resume
+from .suggestions import build_suggestions
+
+SIZES = {'1kb': 1_000, '10kb': 10_000, '50kb': 50_000, '200kb': 200_000}
+QUICK_SIZES = ('1kb', '10kb')
+# Share of words that are taxonomy terms
+DENSITIES = {'dense': 0.4, 'sparse': 0.02}
+
+_FILLER = (
+    'the and with for our team work across build deliver project customer product support '
+    'data service platform daily improve process quality systems role responsible ensure '
+    'new using within business users reports tasks meeting plan design review results'
+).split()
+_HEADINGS = ('Summary', 'Experience', 'Projects', 'Skills', 'Education')
+
+
+def _words(rng: random.Random, terms: List[str], size: int, density: float) -> str:
+    out, length = [], 0
+    while length < size:
+        word = rng.choice(terms) if rng.random() < density else rng.choice(_FILLER)
+        if rng.random() < 0.03:
+            word = f"{word} {rng.randint(2, 95)}%"
+        out.append(word)
+        length += len(word) + 1
+    return ' '.join(out)
+
+
+def make_resume(rng: random.Random, terms: List[str], size: int, density: float) -> str:
+    body = size // len(_HEADINGS)
+    parts = ['Jane Doe\njane.doe@example.com | +1 555 010 0199\n']
+    for heading in _HEADINGS:
+        text = _words(rng, terms, body, density)
+        # Line lengths of a real resume: a bullet every dozen words or so
+        words = text.split(' ')
+        lines = [' '.join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        parts.append(f"{heading}\n" + '\n'.join(f"- {line}" for line in lines) + '\n')
+    return ''.join(parts)[:size]
+
+
+def make_jd(rng: random.Random, terms: List[str], size: int, density: float) -> str:
+    intro = f"We are hiring. {rng.randint(2, 8)}+ years of experience, Bachelor's degree required.\n"
+    return intro + _words(rng, terms, max(0, size - len(intro)), density)
+
+
+def make_corpus(seed: int = 0, sizes=None) -> List[Tuple[str, str, str]]:
+    """(name, resume, jd) for every size x density, identical for the same seed and taxonomy."""
+    rng = random.Random(seed)
+    terms = keywords_module.get_keywords().terms
+    corpus = []
+    for size_name in sizes or SIZES:
+        for density_name, density in DENSITIES.items():
+            size = SIZES[size_name]
+            corpus.append((
+                f"{size_name}/{density_name}",
+                make_resume(rng, terms, size, density),
+                make_jd(rng, terms, size, density),
+            ))
+    return corpus
+
+
+def scaled_taxonomy(extra_terms: int, seed: int = 0):
+    """The shipped taxonomy plus `extra_terms` synthetic technical terms."""
+    data = load_taxonomy()
+    rng = random.Random(seed)
+    synthetic = [{'term': f"tool{i:05d} {rng.choice(_FILLER)}kit"} for i in range(extra_terms)]
+    data['categories']['technical'] = list(data['categories']['technical']) + synthetic
+    return compile_taxonomy(data)
+
+
+@contextmanager
+def use_keywords(automaton):
+    """Serve `automaton` from get_keywords() for the duration of the block."""
+    previous = keywords_module._keywords
+    with keywords_module._lock:
+        keywords_module._keywords = automaton
+    try:
+        yield automaton
+    finally:
+        with keywords_module._lock:
+            keywords_module._keywords = previous
+
+
+def _clear_caches() -> None:
+    with services._resume_features_lock:
+        services._resume_features.clear()
+    with services._jd_analyses_lock:
+        services._jd_analyses.clear()
+
+
+def _cases(resume: str, jd: str) -> Dict[str, Callable[[], object]]:
+    from .views import generate_comprehensive_suggestions
+
+    analysis = services.real_ats_analysis(resume, jd)
+
+    def cold_analysis():
+        _clear_caches()
+        return services.real_ats_analysis(resume, jd)
+
+    return {
+        'real_ats_analysis/cold': cold_analysis,
+        'real_ats_analysis/warm': lambda: services.real_ats_analysis(resume, jd),
+        'extract_resume_features': lambda: services.extract_resume_features(resume),
+        'extract_jd_keywords': lambda: services.extract_jd_keywords(jd),
+        'parse_requirements': lambda: services.parse_requirements(jd),
+        'segment_resume': lambda: segment_resume(resume),
+        'format_signals': lambda: services.format_signals(resume),
+        'generate_comprehensive_suggestions': lambda: generate_comprehensive_suggestions(analysis),
+        'build_suggestions': lambda: build_suggestions(analysis),
+    }
+
+
+def _time(fn: Callable, rounds: int) -> float:
+    """Median seconds per call over `rounds` timeit repeats."""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    return statistics.median(t / loops for t in timer.repeat(repeat=rounds, number=loops))
+
+
+def _peak_bytes(fn: Callable) -> int:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - base)
+
+
+def run_suite(seed: int = 0, quick: bool = False, taxonomy_scale: int = 0,
+              only: Optional[str] = None) -> Dict:
+    """Run every benchmark case over the corpus and return one history entry."""
+    automaton = scaled_taxonomy(taxonomy_scale, seed) if taxonomy_scale else keywords_module.get_keywords()
+    rounds = 3 if quick else 7
+    results: Dict[str, Dict] = {}
+    # Shared-cache round trips would measure the database, not the scorer
+    with override_settings(ATS_JD_SHARED_CACHE=False), use_keywords(automaton):
+        for name, resume, jd in make_corpus(seed, QUICK_SIZES if quick else None):
+            for case, fn in _cases(resume, jd).items():
+                key = f"{case}@{name}"
+                if only and only not in key:
+                    continue
+                seconds = _time(fn, rounds)
+                results[key] = {
+                    'us_per_call': round(seconds * 1e6, 2),
+                    'calls_per_sec': round(1 / seconds, 1) if seconds else None,
+                    'peak_kb': round(_peak_bytes(fn) / 1024, 1),
+                }
+        _clear_caches()
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': seed,
+        'quick': quick,
+        'taxonomy_terms': len(automaton.terms),
+        'results': results,
+    }
+
+
+def default_history_path() -> Path:
+    configured = getattr(settings, 'ATS_BENCH_HISTORY', None)
+    return Path(configured) if configured else Path(settings.BASE_DIR) / 'var' / 'ats_bench' / 'history.json'
+
+
+def load_history(path: Path) -> List[Dict]:
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return []
+
+
+def append_history(path: Path, run: Dict) -> None:
+    history = load_history(path)
+    history.append(run)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(history, fh, indent=1)
+    tmp.replace(path)
+
+
+def find_baseline(history: List[Dict], label: Optional[str] = None) -> Optional[Dict]:
+    """Most recent run with `label`, or simply the most recent run."""
+    for run in reversed(history):
+        if label is None or run.get('label') == label:
+            return run
+    return None
+
+
+# Absolute changes below these are timer / allocator noise, whatever the ratio
+_MIN_DELTA = {'us_per_call': 1.0, 'peak_kb': 4.0}
+
+
+def compare(run: Dict, baseline: Dict, threshold: float = 0.15) -> List[Dict]:
+    """Cases whose time per call or peak allocation grew by more than `threshold`."""
+    regressions = []
+    for key, current in run['results'].items():
+        previous = baseline['results'].get(key)
+        if not previous:
+            continue
+        for metric, min_delta in _MIN_DELTA.items():
+            old, new = previous.get(metric), current.get(metric)
+            if old and new and new > old * (1 + threshold) and new - old >= min_delta:
+                regressions.append({'case': key, 'metric': metric, 'baseline': old, 'current': new,
+                                    'change': round(new / old - 1, 3)})
+    return regressions
@@ -0,0 +1,127 @@
+"""
+Offline bulk scoring: every resume file in a directory against a set of JDs.
+
+Each resume file is one unit of work for a process pool. A worker extracts
+its text (PDF, DOCX or plain text) and scores it against all JDs at once
+with batch_ats_analysis, so the JD side is analyzed once per worker and then
+served from its cache. Results are yielded as workers finish, not in input
+order, so callers can stream them to disk. A resume that cannot be read or
+scored yields a single row with `error` set instead of ending the run.
+
+This module must stay importable before Django is set up: worker processes
+started with the "spawn" method (Windows, macOS) run _init_worker first.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+RESUME_SUFFIXES = ('.pdf', '.docx', '.txt')
+
+# Columns of every result row, in CSV order
+FIELDS = (
+    'resume', 'jd', 'final_score', 'keyword_score', 'section_score', 'format_score',
+    'experience_score', 'relevance_score', 'missing_keywords', 'error',
+)
+
+_jds: List[Tuple[str, str]] = []
+
+
+def extract_text(path: Path) -> str:
+    """Text of a resume file, chosen by extension."""
+    suffix = path.suffix.lower()
+    if suffix == '.pdf':
+        from pdfminer.high_level import extract_text as extract_pdf_text
+        return extract_pdf_text(str(path))
+    if suffix == '.docx':
+        from docx import Document
+        return '\n'.join(p.text for p in Document(str(path)).paragraphs)
+    return path.read_text(encoding='utf-8', errors='replace')
+
+
+def find_resumes(directory: Path, recursive: bool = False) -> List[Path]:
+    pattern = '**/*' if recursive else '*'
+    return sorted(p for p in directory.glob(pattern) if p.is_file() and p.suffix.lower() in RESUME_SUFFIXES)
+
+
+def _init_worker(jds: List[Tuple[str, str]]) -> None:
+    global _jds
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ai_job_helper.settings')
+        django.setup()
+    # Never reuse a database connection inherited from the parent through fork
+    from django.db import connections
+    for conn in connections.all():
+        conn.close()
+    _jds = jds
+
+
+def score_resume_file(path: str) -> List[Dict]:
+    """Rows for one resume file against every JD of this worker."""
+    from .services import batch_ats_analysis
+
+    try:
+        text = extract_text(Path(path))
+    except Exception as exc:
+        return [{'resume': path, 'jd': '', 'error': f"extract failed: {exc}"}]
+    if not text.strip():
+        return [{'resume': path, 'jd': '', 'error': 'no text extracted'}]
+
+    try:
+        analyses = batch_ats_analysis(text, [jd for _, jd in _jds])
+    except Exception as exc:
+        return [{'resume': path, 'jd': '', 'error': f"scoring failed: {exc}"}]
+
+    rows = []
+    for (name, _), analysis in zip(_jds, analyses):
+        rows.append({
+            'resume': path,
+            'jd': name,
+            'final_score': analysis['final_score'],
+            'keyword_score': analysis['keyword_score'],
+            'section_score': analysis['section_score'],
+            'format_score': analysis['format_score'],
+            'experience_score': analysis['experience_score'],
+            'relevance_score': analysis['relevance_score'],
+            'missing_keywords': analysis['missing_keywords'],
+            'error': '',
+        })
+    return rows
+
+
+def score_files(paths: Iterable[Path], jds: List[Tuple[str, str]],
+                workers: Optional[int] = None) -> Iterator[List[Dict]]:
+    """Yield the rows of each resume file as soon as its worker finishes."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(jds)
+        for path in paths:
+            yield score_resume_file(str(path))
+        return
+
+    from django.db import connections
+    connections.close_all()
+    paths = iter(paths)
+    # Bounded window of in-flight files, so thousands of resumes never queue at once
+    window = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(jds,)) as pool:
+        pending = {}
+        for path in paths:
+            pending[pool.submit(score_resume_file, str(path))] = str(path)
+            if len(pending) >= window:
+                yield from _collect(pending)
+        while pending:
+            yield from _collect(pending)
+
+
+def _collect(pending: Dict) -> Iterator[List[Dict]]:
+    """Rows of the files whose workers finished next; a worker that died becomes an error row."""
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        path = pending.pop(future)
+        try:
+            yield future.result()
+        except Exception as exc:
+            yield [{'resume': path, 'jd': '', 'error': f"worker failed: {exc}"}]
@@ -0,0 +1,54 @@
+"""
+ATS history listing.
+
+Pages are summary projections (no JD, suggestions or optimized resume text)
+ordered newest first, and paginated by keyset on (created_at, id): the cursor
+is the position of the last row served, so each page is one indexed range
+read however deep the user scrolls. Full details are loaded per result.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.db.models import Q
+
+from .models import ATSResult
+from .templatetags.ats_filters import result_suggestions, split
+
+SUMMARY_FIELDS = ('id', 'final_score', 'baseline_score', 'created_at', 'jd_title', 'jd_fingerprint')
+
+
+def encode_cursor(row: Dict) -> str:
+    return f"{row['created_at'].isoformat()}|{row['id']}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor."""
+    created_at, _, pk = (cursor or '').rpartition('|')
+    return datetime.fromisoformat(created_at), int(pk)
+
+
+def history_page(user, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Dict], Optional[str]]:
+    """One page of summary rows, newest first, and the cursor of the next page (None at the end)."""
+    rows = ATSResult.objects.filter(user=user)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        rows = rows.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    page = list(rows.order_by('-created_at', '-id').values(*SUMMARY_FIELDS)[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def result_detail(result: ATSResult) -> Dict:
+    """Everything stored for one result, with suggestions rendered."""
+    return {
+        'id': result.id,
+        'created_at': result.created_at.isoformat(),
+        'jd_title': result.jd_title,
+        'jd_fingerprint': result.jd_fingerprint,
+        'job_description': result.job_description,
+        'final_score': result.final_score,
+        'baseline_score': result.baseline_score,
+        'missing_keywords': split(result.missing_keywords),
+        'suggestions': result_suggestions(result),
+        'optimized_resume': result.optimized_resume or '',
+    }
@@ -0,0 +1,174 @@
+"""
+IDF table for the BM25 relevance component of the ATS score.
+
+Document frequencies of taxonomy terms over the stored JD corpus
+(ATSResult and TrainingSession job descriptions) are kept on disk:
+
+- meta.json: term list (df column order), document count, taxonomy signature
+  and per-source watermarks (created_at of the last JD already counted)
+- df.npy: int64 document frequencies, memory-mapped by every worker
+- seen.npy: sorted 64-bit JD fingerprints, so re-pasted postings count once
+
+The build_idf_table command only reads JDs from the watermarks on, so the
+table grows incrementally instead of rescanning the corpus; JDs at exactly
+the watermark instant are re-read and the ones already counted are skipped
+by fingerprint.
+"""
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def idf_dir() -> Path:
+    configured = getattr(settings, 'ATS_IDF_DIR', None)
+    return Path(configured) if configured else Path(settings.BASE_DIR) / 'var' / 'ats_idf'
+
+
+class IdfTable:
+    """Read side of the table: df counts are memory-mapped, never copied."""
+
+    def __init__(self, meta: Dict, df: np.ndarray) -> None:
+        self.documents = int(meta['documents'])
+        self.taxonomy = meta['taxonomy']
+        self.term_ids = {term: i for i, term in enumerate(meta['terms'])}
+        self._df = df
+
+    def idf(self, terms: Iterable[str]) -> np.ndarray:
+        """BM25 idf of each term; terms never seen in the corpus get the maximum."""
+        terms = list(terms)
+        df = np.zeros(len(terms))
+        known = [(i, self.term_ids[t]) for i, t in enumerate(terms) if t in self.term_ids]
+        if known:
+            rows, cols = zip(*known)
+            df[list(rows)] = self._df[list(cols)]
+        n = self.documents
+        return np.log1p((n - df + 0.5) / (df + 0.5))
+
+
+_lock = threading.Lock()
+_table: Optional[IdfTable] = None
+_table_mtime = 0.0
+
+
+def get_idf_table() -> Optional[IdfTable]:
+    """Process-wide table, reopened when build_idf_table publishes a new one."""
+    global _table, _table_mtime
+    meta_path = idf_dir() / 'meta.json'
+    try:
+        mtime = os.path.getmtime(meta_path)
+    except OSError:
+        return None
+    if mtime == _table_mtime:
+        return _table
+    with _lock:
+        if mtime != _table_mtime:
+            with open(meta_path, encoding='utf-8') as fh:
+                meta = json.load(fh)
+            df = np.load(idf_dir() / 'df.npy', mmap_mode='r')
+            _table = IdfTable(meta, df) if meta.get('documents') else None
+            _table_mtime = mtime
+        return _table
+
+
+def bm25_score(query_terms: Iterable[str], term_counts: Dict[str, int], doc_length: int,
+               table: Optional[IdfTable] = None) -> Optional[int]:
+    """
+    BM25 relevance of a resume (term -> hit count) to the JD query terms, 0-100.
+    100 means every query term appears once in a resume of average length.
+    None when no IDF table has been built yet.
+    """
+    table = table or get_idf_table()
+    query_terms = list(dict.fromkeys(query_terms))
+    if table is None or not query_terms:
+        return None
+    idf = table.idf(query_terms)
+    avg_length = float(getattr(settings, 'ATS_BM25_AVG_RESUME_TOKENS', 450))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * (doc_length or avg_length) / avg_length)
+    score = 0.0
+    for weight, term in zip(idf, query_terms):
+        tf = term_counts.get(term, 0)
+        if tf:
+            score += weight * tf * (BM25_K1 + 1) / (tf + norm)
+    ideal = float(idf.sum())
+    if ideal <= 0 or math.isnan(ideal):
+        return None
+    return int(min(100, max(0, round(score / ideal * 100))))
+
+
+def _sources():
+    from ats.models import ATSResult
+    from training.models import TrainingSession
+    return {'ats': ATSResult, 'training': TrainingSession}
+
+
+def _save_atomic(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as fh:
+        np.save(fh, array)
+    os.replace(tmp, path)
+
+
+def update_idf_table(full: bool = False) -> Dict:
+    """Count JDs from the stored watermarks on into the table and publish it."""
+    from .keywords import get_keywords
+    from .services import extract_jd_keywords, jd_fingerprint
+
+    keywords = get_keywords()
+    directory = idf_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    meta_path = directory / 'meta.json'
+
+    meta = None
+    if not full and meta_path.exists():
+        with open(meta_path, encoding='utf-8') as fh:
+            meta = json.load(fh)
+        if meta.get('taxonomy') != keywords.signature:
+            meta = None  # the term space changed: old counts cannot be remapped
+    if meta is None:
+        meta = {'terms': keywords.terms, 'documents': 0, 'taxonomy': keywords.signature, 'watermarks': {}}
+        df = np.zeros(len(keywords.terms), dtype=np.int64)
+        seen = np.zeros(0, dtype=np.uint64)
+    else:
+        df = np.array(np.load(directory / 'df.npy'), dtype=np.int64)
+        seen = np.load(directory / 'seen.npy')
+
+    term_ids = {term: i for i, term in enumerate(meta['terms'])}
+    new_seen = set()
+    added = 0
+    for source, model in _sources().items():
+        rows = model.objects.order_by('created_at')
+        watermark = meta['watermarks'].get(source)
+        if watermark:
+            # Inclusive: a JD committed after the last run with the watermark's timestamp still
+            # counts, while JDs already counted at that instant are skipped by fingerprint below
+            rows = rows.filter(created_at__gte=watermark)
+        for jd, created_at in rows.values_list('job_description', 'created_at').iterator():
+            meta['watermarks'][source] = created_at.isoformat()
+            key = int(jd_fingerprint(jd or '')[:16], 16)
+            if key in new_seen or (len(seen) and seen[min(np.searchsorted(seen, key), len(seen) - 1)] == key):
+                continue
+            new_seen.add(key)
+            found = extract_jd_keywords(jd or '')
+            ids = [term_ids[t] for terms in found.values() for t in terms if t in term_ids]
+            df[ids] += 1
+            added += 1
+
+    meta['documents'] += added
+    if new_seen:
+        seen = np.union1d(seen, np.fromiter(new_seen, dtype=np.uint64, count=len(new_seen)))
+    _save_atomic(directory / 'df.npy', df)
+    _save_atomic(directory / 'seen.npy', seen)
+    tmp = meta_path.with_name('meta.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, meta_path)  # publishing meta.json makes workers reopen the table
+    return {'added': added, 'documents': meta['documents'], 'terms': len(meta['terms'])}
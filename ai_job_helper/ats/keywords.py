@@ -0,0 +1,212 @@
+"""
+Keyword automaton for the ATS scorer.
+
+The skill taxonomy lives in data/taxonomy.json (versioned, with aliases that
+map to canonical terms). It is compiled once per process into an Aho-Corasick
+automaton over *tokens* rather than characters, so matching cost grows with
+the document length and not with the size of the vocabulary. A single linear
+pass over a document finds every taxonomy hit together with its character
+offsets, and because matching happens on whole tokens "go" never matches
+inside "good" and "java" never matches inside "javascript".
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+
+# Tokens keep tech punctuation (c++, c#, node.js, .net); hyphens, slashes and
+# whitespace act as separators so "e-commerce" and "e commerce" are the same.
+_TOKEN = re.compile(r"\.?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+TECHNICAL = 'technical'
+SOFT = 'soft'
+EXPERIENCE = 'experience'
+
+CATEGORIES = (TECHNICAL, SOFT, EXPERIENCE)
+
+TAXONOMY_PATH = Path(__file__).resolve().parent / 'data' / 'taxonomy.json'
+
+
+class Hit(NamedTuple):
+    start: int
+    end: int
+    term: str
+    category: str
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """Return (token, start, end) triples for lowercased text."""
+    if not text:
+        return []
+    return [(m.group(), m.start(), m.end()) for m in _TOKEN.finditer(text.lower())]
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton whose alphabet is the token stream of a document."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str, str]], version: int = 0, signature: str = '') -> None:
+        """patterns: iterable of (phrase, canonical_term, category)."""
+        self.version = version
+        # Content hash of the taxonomy; caches of derived features key on it
+        self.signature = signature
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, str]]] = [[]]
+        self.categories: Dict[str, str] = {}
+        for phrase, term, category in patterns:
+            self._add(phrase, term, category)
+        self._link()
+        # Column order of the term space (used by the batch scorer's term matrix)
+        self.terms: List[str] = list(self.categories)
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(self.terms)}
+
+    def _add(self, phrase: str, term: str, category: str) -> None:
+        tokens = [tok for tok, _, _ in tokenize(phrase)]
+        if not tokens:
+            return
+        node = 0
+        for tok in tokens:
+            nxt = self._goto[node].get(tok)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][tok] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(tokens), term, category))
+        self.categories.setdefault(term, category)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for tok, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and tok not in self._goto[state]:
+                    state = self._fail[state]
+                fallback = self._goto[state].get(tok, 0)
+                self._fail[child] = fallback if fallback != child else 0
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def scan(self, text: str) -> List[Hit]:
+        """Find every taxonomy hit in one pass. Hits are ordered by end offset."""
+        tokens = tokenize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: List[Hit] = []
+        node = 0
+        for i, (tok, _, end) in enumerate(tokens):
+            while node and tok not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(tok, 0)
+            for length, term, category in out[node]:
+                hits.append(Hit(tokens[i - length + 1][1], end, term, category))
+        return hits
+
+    def terms_by_category(self, text: str) -> Dict[str, List[str]]:
+        """Distinct canonical terms per category, in order of first appearance."""
+        found: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+        seen: Set[str] = set()
+        for hit in sorted(self.scan(text)):
+            if hit.term not in seen:
+                seen.add(hit.term)
+                found.setdefault(hit.category, []).append(hit.term)
+        return found
+
+    def term_set(self, text: str) -> Set[str]:
+        return {hit.term for hit in self.scan(text)}
+
+    def postings(self, text: str) -> Dict[str, List[int]]:
+        """Map each canonical term to the start offsets of its hits."""
+        index: Dict[str, List[int]] = {}
+        for hit in sorted(self.scan(text)):
+            index.setdefault(hit.term, []).append(hit.start)
+        return index
+
+
+def load_taxonomy(path: Optional[Path] = None) -> Dict:
+    """Read and validate the taxonomy data file."""
+    with open(path or TAXONOMY_PATH, encoding='utf-8') as fh:
+        data = json.load(fh)
+    if not isinstance(data.get('version'), int):
+        raise ValueError("Taxonomy is missing an integer 'version'")
+    categories = data.get('categories') or {}
+    unknown = set(categories) - set(CATEGORIES)
+    if unknown:
+        raise ValueError(f"Unknown taxonomy categories: {', '.join(sorted(unknown))}")
+    owners: Dict[str, str] = {}
+    for category, entries in categories.items():
+        for entry in entries:
+            term = (entry.get('term') or '').strip().lower()
+            if not term:
+                raise ValueError(f"Empty term in category '{category}'")
+            for phrase in [term] + [a.strip().lower() for a in entry.get('aliases', [])]:
+                key = ' '.join(tok for tok, _, _ in tokenize(phrase))
+                if not key:
+                    raise ValueError(f"Phrase '{phrase}' has no matchable tokens")
+                if key in owners and owners[key] != term:
+                    raise ValueError(f"Phrase '{phrase}' maps to both '{owners[key]}' and '{term}'")
+                owners[key] = term
+    return data
+
+
+def compile_taxonomy(data: Dict) -> KeywordAutomaton:
+    """Expand aliases to canonical terms and build the automaton."""
+    patterns = []
+    for category, entries in data['categories'].items():
+        for entry in entries:
+            term = entry['term'].strip().lower()
+            patterns.append((term, term, category))
+            patterns.extend((alias.strip().lower(), term, category) for alias in entry.get('aliases', []))
+    signature = hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+    return KeywordAutomaton(patterns, version=data['version'], signature=signature)
+
+
+_lock = threading.Lock()
+_keywords: Optional[KeywordAutomaton] = None
+_loaded_mtime = 0.0
+_checked_at = 0.0
+
+
+def _check_interval() -> float:
+    return float(getattr(settings, 'ATS_TAXONOMY_CHECK_INTERVAL', 30))
+
+
+def get_keywords() -> KeywordAutomaton:
+    """Process-wide automaton, recompiled when the data file changes on disk."""
+    global _keywords, _loaded_mtime, _checked_at
+    now = time.monotonic()
+    if _keywords is not None and now - _checked_at < _check_interval():
+        return _keywords
+    with _lock:
+        if _keywords is None or now - _checked_at >= _check_interval():
+            _checked_at = now
+            try:
+                mtime = os.path.getmtime(TAXONOMY_PATH)
+                if _keywords is None or mtime != _loaded_mtime:
+                    # Recorded even if the load fails, so a bad file is retried only once it changes
+                    _loaded_mtime = mtime
+                    _keywords = compile_taxonomy(load_taxonomy())
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                if _keywords is None:
+                    raise
+                # A malformed or half-written edit: keep scoring with the last good taxonomy
+                logging.error(f"Taxonomy reload failed, keeping version {_keywords.version}: {e}")
+        return _keywords
+
+
+def reload_keywords() -> KeywordAutomaton:
+    """Force an immediate recompile in this process."""
+    global _keywords
+    with _lock:
+        _keywords = None
+    return get_keywords()
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.bench import append_history, compare, default_history_path, find_baseline, load_history, run_suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the ATS scoring path over a synthetic 1 KB - 200 KB resume/JD corpus "
+        "(time per call and peak allocation), record the run and optionally flag regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history', help='History JSON file (default: var/ats_bench/history.json)')
+        parser.add_argument('--label', default='', help='Name to store the run under, e.g. a commit or branch')
+        parser.add_argument('--quick', action='store_true', help='Only the 1 KB and 10 KB documents, fewer rounds')
+        parser.add_argument('--only', help='Run only cases whose name contains this text')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--taxonomy-scale', type=int, default=0,
+                            help='Add this many synthetic terms to the taxonomy for the run')
+        parser.add_argument('--compare', nargs='?', const='', metavar='LABEL',
+                            help='Compare with the latest run (or the latest run with LABEL); fail on regressions')
+        parser.add_argument('--threshold', type=float, default=0.15,
+                            help='Relative slowdown / allocation growth counted as a regression (default 0.15)')
+        parser.add_argument('--no-save', action='store_true', help='Do not append this run to the history')
+
+    def handle(self, *args, **options):
+        path = Path(options['history']) if options['history'] else default_history_path()
+        history = load_history(path)
+        baseline = None
+        if options['compare'] is not None:
+            baseline = find_baseline(history, options['compare'] or None)
+            if baseline is None:
+                raise CommandError(f"No baseline run{' labelled ' + options['compare'] if options['compare'] else ''} in {path}")
+
+        run = run_suite(
+            seed=options['seed'], quick=options['quick'],
+            taxonomy_scale=options['taxonomy_scale'], only=options['only'],
+        )
+        run['label'] = options['label']
+
+        self.stdout.write(f"{'case':<62}{'us/call':>12}{'calls/s':>12}{'peak KB':>10}")
+        for key, result in run['results'].items():
+            self.stdout.write(
+                f"{key:<62}{result['us_per_call']:>12.1f}{result['calls_per_sec'] or 0:>12.1f}{result['peak_kb']:>10.1f}"
+            )
+        if not options['no_save']:
+            append_history(path, run)
+            self.stdout.write(f"Run recorded in {path} ({run['taxonomy_terms']} taxonomy terms).")
+
+        if baseline is not None:
+            regressions = compare(run, baseline, options['threshold'])
+            for item in regressions:
+                self.stdout.write(self.style.ERROR(
+                    f"REGRESSION {item['case']} {item['metric']}: {item['baseline']} -> {item['current']} "
+                    f"(+{item['change']:.0%})"
+                ))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against the run from {baseline['timestamp']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against the run from {baseline['timestamp']}."))
@@ -0,0 +1,82 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.bulk import FIELDS, find_resumes, score_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Score every PDF/DOCX/TXT resume in a directory against one or more job descriptions "
+        "across a process pool. Rows stream to JSONL or CSV as each resume finishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('resumes', help='Directory of resume files')
+        parser.add_argument('--jd', action='append', required=True, metavar='PATH',
+                            help='Job description text file, or a directory of .txt JDs (repeatable)')
+        parser.add_argument('--output', '-o', default='-', help='Output file (default: stdout)')
+        parser.add_argument('--format', choices=('jsonl', 'csv'),
+                            help='Output format (default: from the output extension, else jsonl)')
+        parser.add_argument('--workers', type=int, default=0, help='Worker processes (default: CPU count)')
+        parser.add_argument('--recursive', action='store_true', help='Include resumes in subdirectories')
+
+    def _load_jds(self, specs):
+        jds = []
+        for spec in specs:
+            path = Path(spec)
+            files = sorted(path.glob('*.txt')) if path.is_dir() else [path]
+            for file in files:
+                try:
+                    text = file.read_text(encoding='utf-8', errors='replace').strip()
+                except OSError as exc:
+                    raise CommandError(f"Cannot read JD {file}: {exc}")
+                if text:
+                    jds.append((file.stem, text))
+        if not jds:
+            raise CommandError("No job descriptions found")
+        return jds
+
+    def handle(self, *args, **options):
+        directory = Path(options['resumes'])
+        if not directory.is_dir():
+            raise CommandError(f"Not a directory: {directory}")
+        jds = self._load_jds(options['jd'])
+        resumes = find_resumes(directory, recursive=options['recursive'])
+        if not resumes:
+            raise CommandError(f"No .pdf, .docx or .txt resumes in {directory}")
+
+        output = options['output']
+        fmt = options['format'] or ('csv' if output.lower().endswith('.csv') else 'jsonl')
+        # The raw stream behind self.stdout, so call_command(stdout=...) captures the rows
+        out = self.stdout._out if output == '-' else open(output, 'w', encoding='utf-8', newline='')
+        writer = csv.DictWriter(out, fieldnames=FIELDS) if fmt == 'csv' else None
+        if writer:
+            writer.writeheader()
+
+        started = time.monotonic()
+        done = failed = 0
+        try:
+            for rows in score_files(resumes, jds, workers=options['workers'] or None):
+                for row in rows:
+                    row['resume'] = str(Path(row['resume']).relative_to(directory))
+                    if writer:
+                        writer.writerow(dict(row, missing_keywords='; '.join(row.get('missing_keywords') or [])))
+                    else:
+                        out.write(json.dumps(row) + '\n')
+                out.flush()
+                done += 1
+                failed += bool(rows and rows[0].get('error'))
+                if done % 100 == 0:
+                    self.stderr.write(f"{done}/{len(resumes)} resumes scored")
+        finally:
+            if output != '-':
+                out.close()
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Scored {done} resumes x {len(jds)} JDs in {elapsed:.1f}s ({failed} could not be scored)."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ats.idf import idf_dir, update_idf_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Count job descriptions stored since the last run into the BM25 IDF table "
+        "(ATSResult and TrainingSession). Safe to run from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Discard the existing table and rescan the whole corpus')
+
+    def handle(self, *args, **options):
+        stats = update_idf_table(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f"IDF table at {idf_dir()}: +{stats['added']} JDs, "
+            f"{stats['documents']} documents, {stats['terms']} terms."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import UserProfile
+from ats.models import ResumeIndexEntry, TermPosting
+from ats.recruiter import index_resume
+
+
+class Command(BaseCommand):
+    help = "Build or refresh the recruiter inverted index from every profile's resume text."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Drop the whole index before rebuilding')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            TermPosting.objects.mongo_delete_many({})
+            ResumeIndexEntry.objects.all().delete()
+
+        changed = total = 0
+        for profile in UserProfile.objects.select_related('user').iterator():
+            total += 1
+            if index_resume(profile.user, profile.resume_text or ''):
+                changed += 1
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} profiles ({changed} updated)."))
@@ -0,0 +1,39 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ats.keywords import CATEGORIES, TAXONOMY_PATH, compile_taxonomy, load_taxonomy
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate and compile the ATS skill taxonomy, then mark it changed so every "
+        "running worker recompiles it on its next check (ATS_TAXONOMY_CHECK_INTERVAL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Validate another taxonomy file instead of the live one')
+        parser.add_argument('--check', action='store_true', help='Only validate; do not signal workers')
+
+    def handle(self, *args, **options):
+        path = options.get('path') or TAXONOMY_PATH
+        try:
+            data = load_taxonomy(path)
+            automaton = compile_taxonomy(data)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Invalid taxonomy {path}: {exc}")
+
+        counts = {category: len(data['categories'].get(category, [])) for category in CATEGORIES}
+        aliases = sum(len(e.get('aliases', [])) for entries in data['categories'].values() for e in entries)
+        self.stdout.write(
+            f"Taxonomy v{automaton.version}: "
+            + ", ".join(f"{count} {category}" for category, count in counts.items())
+            + f", {aliases} aliases"
+        )
+
+        # Files other than the live taxonomy are only validated
+        if options['check'] or str(path) != str(TAXONOMY_PATH):
+            return
+        # Bump mtime: get_keywords() compares it and recompiles in every process
+        os.utime(TAXONOMY_PATH, None)
+        self.stdout.write(self.style.SUCCESS("Taxonomy published; workers will reload it."))
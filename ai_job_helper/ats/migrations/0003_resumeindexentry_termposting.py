@@ -0,0 +1,37 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ats', '0002_jdanalysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermPosting',
+            fields=[
+                ('term', models.CharField(max_length=128, primary_key=True, serialize=False)),
+                ('user_ids', djongo.models.fields.JSONField(default=list)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumeIndexEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40)),
+                ('taxonomy', models.CharField(max_length=40)),
+                ('terms', models.JSONField(default=list)),
+                ('section_score', models.PositiveIntegerField(default=0)),
+                ('format_score', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resume_index', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
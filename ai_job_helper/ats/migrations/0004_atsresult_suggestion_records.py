@@ -0,0 +1,18 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0003_resumeindexentry_termposting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='atsresult',
+            name='suggestion_records',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
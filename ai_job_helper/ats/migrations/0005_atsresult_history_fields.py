@@ -0,0 +1,50 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:42
+
+import hashlib
+
+from django.db import migrations, models
+
+
+# Frozen copies of ats.services.jd_fingerprint and jd_title as of this migration,
+# so later changes to the live helpers cannot alter what the backfill writes
+def jd_fingerprint(jd_text):
+    return hashlib.sha1(' '.join((jd_text or '').split()).encode('utf-8')).hexdigest()
+
+
+def jd_title(jd_text, max_length=120):
+    line = next((l.strip() for l in (jd_text or '').splitlines() if l.strip()), '')
+    return line if len(line) <= max_length else line[:max_length - 1].rstrip() + '…'
+
+
+def backfill_summary_fields(apps, schema_editor):
+    ATSResult = apps.get_model('ats', 'ATSResult')
+    for result in ATSResult.objects.filter(jd_fingerprint='').only('id', 'job_description').iterator():
+        ATSResult.objects.filter(pk=result.pk).update(
+            jd_fingerprint=jd_fingerprint(result.job_description),
+            jd_title=jd_title(result.job_description),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ats', '0004_atsresult_suggestion_records'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='atsresult',
+            name='jd_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='atsresult',
+            name='jd_title',
+            field=models.CharField(blank=True, default='', max_length=120),
+        ),
+        migrations.AddIndex(
+            model_name='atsresult',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='ats_history_idx'),
+        ),
+        migrations.RunPython(backfill_summary_fields, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from djongo import models as djongo_models
 
 class ATSResult(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -7,12 +8,65 @@ class ATSResult(models.Model):
     baseline_score = models.PositiveIntegerField(default=0)   # heuristic overlap score
     final_score = models.PositiveIntegerField(default=0)      # fused with LLM (0-100)
     missing_keywords = models.TextField(blank=True, null=True)
-    suggestions = models.TextField(blank=True, null=True)
+    suggestions = models.TextField(blank=True, null=True)       # legacy / LLM prose, " | "-separated
+    suggestion_records = models.JSONField(default=list, blank=True)  # compact records, see ats.suggestions
     optimized_resume = models.TextField(blank=True, null=True)
+    jd_title = models.CharField(max_length=120, blank=True, default='')      # first line of the JD, for history lists
+    jd_fingerprint = models.CharField(max_length=40, blank=True, default='')  # whitespace-normalized JD hash
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        # History pages: a user's results newest first, keyset-paginated on (created_at, id)
+        indexes = [models.Index(fields=['user', '-created_at', '-id'], name='ats_history_idx')]
+
+    def save(self, *args, **kwargs):
+        # Summary fields are derived from the JD so every writer fills them in
+        if self.job_description and not self.jd_fingerprint:
+            from .services import jd_fingerprint, jd_title
+            self.jd_fingerprint = jd_fingerprint(self.job_description)
+            self.jd_title = jd_title(self.job_description)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"ATSResult(user={self.user.username}, score={self.final_score}, at={self.created_at:%Y-%m-%d %H:%M})"
+
+
+class JDAnalysis(models.Model):
+    """Shared tier of the JD analysis cache (see ats.services.analyze_job_description)."""
+    fingerprint = models.CharField(max_length=40, unique=True)  # sha1 of whitespace-normalized JD
+    taxonomy = models.CharField(max_length=40)                  # taxonomy signature the keywords came from
+    analysis = models.JSONField(default=dict)                    # {fingerprint, keywords, requirements}
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"JDAnalysis({self.fingerprint[:12]})"
+
+
+class ResumeIndexEntry(models.Model):
+    """Per-user document of the recruiter index: the resume's terms and resume-only scores."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='resume_index')
+    fingerprint = models.CharField(max_length=40)   # sha1 of the indexed resume text
+    taxonomy = models.CharField(max_length=40)      # taxonomy signature the terms came from
+    terms = models.JSONField(default=list)          # canonical taxonomy terms in the resume
+    section_score = models.PositiveIntegerField(default=0)
+    format_score = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ResumeIndexEntry(user={self.user_id}, terms={len(self.terms)})"
+
+
+class TermPosting(models.Model):
+    """Posting list of the recruiter index: users whose resume contains `term`.
+
+    Updated with atomic $addToSet/$pull through DjongoManager, never via save().
+    """
+    term = models.CharField(max_length=128, primary_key=True)
+    user_ids = djongo_models.JSONField(default=list)
+
+    objects = djongo_models.DjongoManager()
+
+    def __str__(self):
+        return f"TermPosting({self.term}, {len(self.user_ids)} users)"
@@ -0,0 +1,140 @@
+"""
+Recruiter mode: rank stored resumes against a job description.
+
+The index has two parts:
+- TermPosting: taxonomy term -> list of user ids whose resume contains it.
+- ResumeIndexEntry: per user, the indexed term set plus the resume-only score
+  components (section and format), so ranking never touches resume text.
+
+index_resume() keeps both in sync incrementally (only the terms that changed
+are pulled from or added to posting lists). top_resumes() reads the posting
+lists of the JD's terms only and scores every matching user with vectorized
+accumulation, then re-ranks the short list with the resume-only components.
+Postings record presence only, so keyword hits count fully regardless of the
+resume section they appear in.
+"""
+import heapq
+from typing import Dict, List
+
+import numpy as np
+from django.contrib.auth.models import User
+from pymongo import UpdateOne
+
+from .keywords import get_keywords, TECHNICAL, SOFT, EXPERIENCE
+from .models import ResumeIndexEntry, TermPosting
+from .services import (
+    analyze_job_description, get_resume_features,
+    calculate_section_score, calculate_format_score, weighted_final_score,
+)
+
+# Section + format contribute at most this many points to the final score
+_RESUME_ONLY_MAX = 100 * 0.25 + 100 * 0.2
+
+
+def index_resume(user, resume_text: str) -> bool:
+    """Bring the user's postings in line with resume_text. Returns True if the index changed."""
+    resume_text = resume_text or ''
+    signature = get_keywords().signature
+    entry = ResumeIndexEntry.objects.filter(user=user).first()
+    features = get_resume_features(resume_text) if resume_text.strip() else None
+    if entry and features and entry.fingerprint == features['fingerprint'] and entry.taxonomy == signature:
+        return False
+
+    old_terms = set(entry.terms) if entry else set()
+    new_terms = set(features['terms']) if features else set()
+    ops = [UpdateOne({'term': t}, {'$pull': {'user_ids': user.pk}}) for t in old_terms - new_terms]
+    ops += [UpdateOne({'term': t}, {'$addToSet': {'user_ids': user.pk}}, upsert=True) for t in new_terms - old_terms]
+    if ops:
+        TermPosting.objects.mongo_bulk_write(ops, ordered=False)
+
+    if features is None:
+        if entry:
+            entry.delete()
+        return bool(entry)
+    ResumeIndexEntry.objects.update_or_create(
+        user=user,
+        defaults={
+            'fingerprint': features['fingerprint'],
+            'taxonomy': signature,
+            'terms': sorted(new_terms),
+            'section_score': calculate_section_score(features['sections']),
+            'format_score': calculate_format_score(features['format']),
+        },
+    )
+    return True
+
+
+def top_resumes(jd_text: str, k: int = 20) -> List[Dict]:
+    """Top-k users by ATS compatibility with jd_text, best first."""
+    keywords = analyze_job_description(jd_text)['keywords']
+    weights = {t: 1.5 for t in keywords[TECHNICAL]}
+    weights.update({t: 1.0 for t in keywords[SOFT]})
+    experience_terms = set(keywords[EXPERIENCE])
+    kw_denominator = sum(weights.values())
+    query_terms = list(weights) + list(experience_terms)
+    if not query_terms or k <= 0:
+        return []
+
+    postings = {
+        doc['term']: np.asarray(doc.get('user_ids') or [], dtype=np.int64)
+        for doc in TermPosting.objects.mongo_find({'term': {'$in': query_terms}}, {'term': 1, 'user_ids': 1})
+    }
+    postings = {t: ids for t, ids in postings.items() if len(ids)}
+    if not postings:
+        return []
+
+    # Accumulate per-user matched weight over all posting lists in one pass
+    all_ids = np.concatenate(list(postings.values()))
+    kw_weights = np.concatenate([np.full(len(ids), weights.get(t, 0.0)) for t, ids in postings.items()])
+    exp_weights = np.concatenate([np.full(len(ids), 1.0 if t in experience_terms else 0.0) for t, ids in postings.items()])
+    user_ids, inverse = np.unique(all_ids, return_inverse=True)
+    kw_found = np.bincount(inverse, weights=kw_weights, minlength=len(user_ids))
+    exp_found = np.bincount(inverse, weights=exp_weights, minlength=len(user_ids))
+
+    keyword_scores = np.round(kw_found / kw_denominator * 100) if kw_denominator else np.full(len(user_ids), 50.0)
+    experience_scores = np.round(exp_found / len(experience_terms) * 100) if experience_terms else np.full(len(user_ids), 50.0)
+    partial = keyword_scores * 0.4 + experience_scores * 0.15
+
+    # Only users within reach of the k-th best partial score can enter the top k
+    if len(user_ids) > k:
+        cutoff = np.partition(partial, -k)[-k] - _RESUME_ONLY_MAX
+        shortlist = np.nonzero(partial >= cutoff)[0]
+    else:
+        shortlist = np.arange(len(user_ids))
+
+    resume_only = {
+        user_id: (section, fmt)
+        for user_id, section, fmt in ResumeIndexEntry.objects.filter(
+            user_id__in=[int(user_ids[i]) for i in shortlist]
+        ).values_list('user_id', 'section_score', 'format_score')
+    }
+    ranked = []
+    for i in shortlist:
+        user_id = int(user_ids[i])
+        if user_id not in resume_only:
+            continue
+        section, fmt = resume_only[user_id]
+        final = int(round(weighted_final_score(keyword_scores[i], section, fmt, experience_scores[i])))
+        ranked.append((final, int(keyword_scores[i]), int(experience_scores[i]), section, fmt, user_id))
+    top = heapq.nlargest(k, ranked)
+
+    top_ids = np.asarray([row[-1] for row in top], dtype=np.int64)
+    matched: Dict[int, List[str]] = {row[-1]: [] for row in top}
+    for term, ids in postings.items():
+        if term in weights:
+            for user_id in top_ids[np.isin(top_ids, ids)]:
+                matched[int(user_id)].append(term)
+    usernames = dict(User.objects.filter(pk__in=list(matched)).values_list('id', 'username'))
+    return [
+        {
+            'user_id': user_id,
+            'username': usernames.get(user_id, ''),
+            'final_score': final,
+            'keyword_score': keyword_score,
+            'experience_score': experience_score,
+            'section_score': section,
+            'format_score': fmt,
+            'matched_keywords': matched[user_id],
+        }
+        for final, keyword_score, experience_score, section, fmt, user_id in top
+    ]
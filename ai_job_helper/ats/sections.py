@@ -0,0 +1,124 @@
+"""
+Single-pass resume section segmenter.
+
+Walks the resume line by line and recognizes section headers ("EXPERIENCE",
+"Technical Skills:", "Skills: Python, SQL") against a fixed vocabulary. Every
+line is classified once, so the cost is linear in the resume length. The
+result is a list of (section, start, end) character spans; text before the
+first header is the contact "header" span.
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, List, Tuple
+
+SECTIONS = ('header', 'summary', 'experience', 'education', 'skills', 'projects')
+
+_HEADERS = {
+    'summary': ['summary', 'professional summary', 'career summary', 'objective', 'career objective',
+                'profile', 'professional profile', 'about', 'about me'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'internship', 'internships', 'internship experience'],
+    'education': ['education', 'educational background', 'academic background', 'academics',
+                  'education and training', 'qualifications', 'academic qualifications'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core skills', 'core competencies', 'competencies',
+               'technologies', 'tech stack', 'tools and technologies', 'skills and tools'],
+    'projects': ['projects', 'personal projects', 'academic projects', 'key projects', 'portfolio',
+                 'achievements', 'accomplishments'],
+    # Recognized so they end the previous section, but not scored
+    'other': ['certifications', 'certificates', 'awards', 'honors', 'publications', 'languages',
+              'interests', 'hobbies', 'references', 'volunteering', 'volunteer experience', 'activities'],
+}
+_HEADER_LOOKUP = {phrase: section for section, phrases in _HEADERS.items() for phrase in phrases}
+_MAX_HEADER_WORDS = max(len(p.split()) for p in _HEADER_LOOKUP)
+
+# Bullets, numbering and decoration around a header line ("## Skills", "1. EDUCATION --")
+_DECORATION = re.compile(r"^[\s#*•\-=_|>\d.)]+|[\s#*•\-=_|:]+$")
+_INLINE_HEADER = re.compile(r"^\s*([A-Za-z][A-Za-z &/]{1,40}?)\s*[:\-–]\s+\S")
+_INLINE_HEADING = re.compile(r"^\s*[A-Za-z][A-Za-z &/]{1,40}?\s*[:\-–][ \t]+")
+_CONTACT = re.compile(r"@\w+\.\w+|\+?\d[\d\s().-]{7,}\d|linkedin\.com|github\.com", re.IGNORECASE)
+
+# Weight of a keyword by where it appears: used experience beats a listed skill
+SECTION_WEIGHTS = {
+    'experience': 1.0,
+    'projects': 1.0,
+    'skills': 0.9,
+    'summary': 0.8,
+    'education': 0.7,
+    'header': 0.7,
+    'other': 0.7,
+}
+
+
+def _normalize_header(text: str) -> str:
+    text = _DECORATION.sub('', text.replace('&', 'and'))
+    return ' '.join(text.lower().split())
+
+
+def _header_section(line: str):
+    """Section name if the line is a header, else None."""
+    if len(line) <= 60:
+        key = _normalize_header(line)
+        if key and len(key.split()) <= _MAX_HEADER_WORDS and key in _HEADER_LOOKUP:
+            return _HEADER_LOOKUP[key]
+    match = _INLINE_HEADER.match(line)
+    if match:
+        return _HEADER_LOOKUP.get(_normalize_header(match.group(1)))
+    return None
+
+
+def segment_resume(resume_text: str) -> List[Tuple[str, int, int]]:
+    """Split a resume into (section, start, end) spans in one pass over its lines."""
+    if not resume_text:
+        return []
+    spans: List[Tuple[str, int, int]] = []
+    current, start, offset = 'header', 0, 0
+    for line in resume_text.splitlines(keepends=True):
+        section = _header_section(line)
+        if section is not None:
+            if offset > start or current != 'header':
+                spans.append((current, start, offset))
+            current, start = section, offset
+        offset += len(line)
+    spans.append((current, start, offset))
+    return spans
+
+
+def split_heading(section: str, span_text: str) -> Tuple[str, str]:
+    """(heading, body) of a segmenter span; the contact header span has no heading."""
+    if section == 'header' or not span_text:
+        return '', span_text
+    first = span_text.splitlines(keepends=True)[0]
+    if _normalize_header(first) in _HEADER_LOOKUP:
+        return first, span_text[len(first):]
+    match = _INLINE_HEADING.match(first)
+    if match is None:
+        return '', span_text
+    return match.group(), span_text[match.end():]
+
+
+def sections_present(resume_text: str, spans: List[Tuple[str, int, int]]) -> Dict[str, bool]:
+    """Section completeness flags from segmenter spans."""
+    found = {name: False for name in SECTIONS}
+    for section, start, end in spans:
+        if section == 'header':
+            found['header'] = bool(_CONTACT.search(resume_text, start, end))
+        elif section in found:
+            found[section] = True
+    if not found['header'] and spans:
+        # Contact details placed right under the first header still count
+        found['header'] = bool(_CONTACT.search(resume_text, 0, min(len(resume_text), 400)))
+    return found
+
+
+def term_weights(postings: Dict[str, List[int]], spans: List[Tuple[str, int, int]]) -> Dict[str, float]:
+    """Best section weight of every term, given its hit offsets."""
+    if not spans or all(section == 'header' for section, _, _ in spans):
+        # Unstructured text: nothing to tell sections apart, count every hit fully
+        return {term: 1.0 for term in postings}
+    starts = [start for _, start, _ in spans]
+    weights = {}
+    for term, offsets in postings.items():
+        weights[term] = max(
+            SECTION_WEIGHTS.get(spans[bisect_right(starts, offset) - 1][0], 0.7) for offset in offsets
+        )
+    return weights
@@ -1,8 +1,37 @@
 import re
 import json
-from typing import List, Tuple, Dict
+import hashlib
+import threading
+import logging
+from collections import Counter
+from datetime import timedelta
+from typing import List, Optional, Set, Tuple, Dict
+import numpy as np
+from cachetools import LRUCache, TTLCache
 from django.conf import settings
+from django.utils import timezone
+from .keywords import get_keywords, tokenize, TECHNICAL, SOFT, EXPERIENCE
+from .sections import segment_resume, sections_present, term_weights
+from .idf import BM25_B, BM25_K1, bm25_score, get_idf_table
+from .models import JDAnalysis
+
+logger = logging.getLogger(__name__)
  
+# Parsed resume features keyed by (resume hash, taxonomy signature).
+# Users score one resume against many JDs, so only the JD side should cost CPU.
+_resume_features = LRUCache(maxsize=getattr(settings, 'ATS_RESUME_CACHE_SIZE', 512))
+_resume_features_lock = threading.Lock()
+
+# JD analyses keyed by (JD fingerprint, taxonomy signature). The in-process tier
+# sits in front of the shared JDAnalysis collection; both expire after the TTL.
+JD_CACHE_TTL = getattr(settings, 'ATS_JD_CACHE_TTL', 7 * 24 * 3600)
+_jd_analyses = TTLCache(maxsize=getattr(settings, 'ATS_JD_CACHE_SIZE', 1024), ttl=JD_CACHE_TTL)
+_jd_analyses_lock = threading.Lock()
+_jd_stats = Counter()
+
+# Soft skills worth flagging as missing; everything technical is always flagged
+IMPORTANT_SOFT_SKILLS = ['leadership', 'communication', 'problem solving', 'teamwork', 'analytical']
+MAX_MISSING_KEYWORDS = 20
 
 # regex for tokens incl. tech like c++, c#, .net
 _WORD = re.compile(r"[A-Za-z][A-Za-z\-\+\.#\d]{1,}")
@@ -18,6 +47,164 @@ def extract_keywords(text: str) -> List[str]:
         return []
     return [_normalize_token(w) for w in _WORD.findall(text)]
 
+def text_fingerprint(text: str) -> str:
+    """Stable content hash used as a cache key for resumes."""
+    return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+
+def extract_resume_features(resume_text: str) -> Dict:
+    """Everything the scorer needs from a resume, computed in one go."""
+    keywords = get_keywords()
+    postings: Dict[str, List[int]] = {}
+    for hit in sorted(keywords.scan(resume_text)):
+        postings.setdefault(hit.term, []).append(hit.start)
+    tokens = tokenize(resume_text)
+    spans = segment_resume(resume_text)
+    return {
+        'fingerprint': text_fingerprint(resume_text),
+        'taxonomy': keywords.signature,
+        'tokens': frozenset(tok for tok, _, _ in tokens),
+        'token_count': len(tokens),
+        'terms': frozenset(postings),
+        'postings': postings,
+        'term_counts': {term: len(offsets) for term, offsets in postings.items()},
+        'section_spans': spans,
+        'sections': sections_present(resume_text, spans),
+        'term_weights': term_weights(postings, spans),
+        'format': format_signals(resume_text),
+    }
+
+def get_resume_features(resume_text: str) -> Dict:
+    """Cached extract_resume_features. The returned dict is shared: do not mutate it."""
+    key = (text_fingerprint(resume_text), get_keywords().signature)
+    with _resume_features_lock:
+        features = _resume_features.get(key)
+    if features is None:
+        features = extract_resume_features(resume_text)
+        with _resume_features_lock:
+            _resume_features[key] = features
+    return features
+
+def _resume_term_set(resume) -> Set[str]:
+    """Accept raw resume text or a term set that was already scanned."""
+    if isinstance(resume, str):
+        return get_resume_features(resume)['terms']
+    return resume
+
+def _resume_term_weights(resume) -> Dict[str, float]:
+    """Accept raw resume text, a {term: section weight} map or a plain term set."""
+    if isinstance(resume, str):
+        return get_resume_features(resume)['term_weights']
+    if isinstance(resume, dict):
+        return resume
+    return {term: 1.0 for term in resume}
+
+def extract_jd_keywords(jd_text: str) -> Dict[str, List[str]]:
+    """Technical, soft-skill and experience keywords of a JD in a single scan."""
+    return get_keywords().terms_by_category(jd_text)
+
+def jd_fingerprint(jd_text: str) -> str:
+    """Hash of the JD with whitespace normalized, so re-pasted postings collide."""
+    return text_fingerprint(' '.join((jd_text or '').split()))
+
+def jd_title(jd_text: str, max_length: int = 120) -> str:
+    """Short label for a JD: its first non-empty line, truncated."""
+    line = next((l.strip() for l in (jd_text or '').splitlines() if l.strip()), '')
+    return line if len(line) <= max_length else line[:max_length - 1].rstrip() + '…'
+
+_YEARS = re.compile(r'(\d{1,2})\s*(?:\+|plus)?\s*(?:(?:-|to)\s*\d{1,2}\s*)?(?:years?|yrs)', re.IGNORECASE)
+_DEGREES = (
+    ('phd', re.compile(r"\b(?:ph\.?d|doctorate)(?!\w)", re.IGNORECASE)),
+    ('master', re.compile(r"\b(?:master'?s?\s+(?:degree|in|of)|m\.s\.|m\.sc|msc|mba|m\.tech|mtech)(?!\w)", re.IGNORECASE)),
+    ('bachelor', re.compile(r"\b(?:bachelor'?s?|b\.s\.|b\.sc|bsc|b\.e\.|b\.tech|btech|undergraduate degree)(?!\w)", re.IGNORECASE)),
+)
+
+def parse_requirements(jd_text: str) -> Dict:
+    """Pull the hard requirements (minimum years, degree level) out of a JD"""
+    years = [int(m.group(1)) for m in _YEARS.finditer(jd_text or '')]
+    degree = next((level for level, pattern in _DEGREES if pattern.search(jd_text or '')), None)
+    return {
+        'min_years': max(years) if years else None,
+        'degree': degree,
+    }
+
+def _load_shared_jd_analysis(fingerprint: str, signature: str) -> Optional[Dict]:
+    if not getattr(settings, 'ATS_JD_SHARED_CACHE', True):
+        return None
+    try:
+        row = JDAnalysis.objects.filter(fingerprint=fingerprint, taxonomy=signature).first()
+        if row and row.updated_at >= timezone.now() - timedelta(seconds=JD_CACHE_TTL):
+            return row.analysis
+    except Exception as exc:
+        logger.warning("JD cache read failed: %s", exc)
+    return None
+
+def _store_shared_jd_analysis(fingerprint: str, signature: str, analysis: Dict) -> None:
+    if not getattr(settings, 'ATS_JD_SHARED_CACHE', True):
+        return
+    try:
+        JDAnalysis.objects.update_or_create(
+            fingerprint=fingerprint,
+            defaults={'taxonomy': signature, 'analysis': analysis},
+        )
+    except Exception as exc:
+        logger.warning("JD cache write failed: %s", exc)
+
+def analyze_job_description(jd_text: str) -> Dict:
+    """
+    Keywords and requirements of a JD, memoized by fingerprint.
+    Lookup order: in-process LRU+TTL, shared JDAnalysis collection, extraction.
+    The returned dict is shared: do not mutate it.
+    """
+    fingerprint = jd_fingerprint(jd_text)
+    signature = get_keywords().signature
+    key = (fingerprint, signature)
+    with _jd_analyses_lock:
+        analysis = _jd_analyses.get(key)
+        if analysis is not None:
+            _jd_stats['local_hits'] += 1
+            return analysis
+
+    analysis = _load_shared_jd_analysis(fingerprint, signature)
+    if analysis is None:
+        analysis = {
+            'fingerprint': fingerprint,
+            'keywords': extract_jd_keywords(jd_text),
+            'requirements': parse_requirements(jd_text),
+        }
+        _store_shared_jd_analysis(fingerprint, signature, analysis)
+        outcome = 'misses'
+    else:
+        outcome = 'shared_hits'
+    with _jd_analyses_lock:
+        _jd_stats[outcome] += 1
+        _jd_analyses[key] = analysis
+    return analysis
+
+def jd_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of the JD analysis cache for this process"""
+    with _jd_analyses_lock:
+        stats = {name: _jd_stats[name] for name in ('local_hits', 'shared_hits', 'misses')}
+        stats['local_size'] = len(_jd_analyses)
+    return stats
+
+def weighted_final_score(keyword_score, section_score, format_score, experience_score, relevance_score=None):
+    """Weighted final score (real ATS systems use similar weighting). Works on scalars and arrays."""
+    if relevance_score is None:
+        return (
+            keyword_score * 0.4 +      # 40% - Keywords (most important for ATS)
+            section_score * 0.25 +     # 25% - Complete sections
+            format_score * 0.2 +       # 20% - ATS-friendly format
+            experience_score * 0.15    # 15% - Relevant experience
+        )
+    # With an IDF table, rare JD terms matter more: part of the keyword weight goes to BM25
+    return (
+        keyword_score * 0.25 +
+        relevance_score * 0.15 +
+        section_score * 0.25 +
+        format_score * 0.2 +
+        experience_score * 0.15
+    )
+
 def real_ats_analysis(resume_text: str, jd_text: str) -> Dict:
     """
     REAL ATS Analysis - not just keyword matching!
@@ -29,30 +216,33 @@ def real_ats_analysis(resume_text: str, jd_text: str) -> Dict:
     5. Experience relevance
     """
     
-    # Extract meaningful keywords (not just any words)
-    technical_keywords = extract_technical_keywords(jd_text)
-    soft_skills = extract_soft_skills(jd_text)
-    experience_keywords = extract_experience_keywords(jd_text)
+    # Extract meaningful keywords (not just any words) - memoized per JD fingerprint
+    jd_analysis = analyze_job_description(jd_text)
+    jd_keywords = jd_analysis['keywords']
+    technical_keywords = jd_keywords[TECHNICAL]
+    soft_skills = jd_keywords[SOFT]
+    experience_keywords = jd_keywords[EXPERIENCE]
+
+    # Resume side comes from the content-hash cache; every matcher below reuses it
+    features = get_resume_features(resume_text)
+    resume_terms = features['terms']
     
     # Analyze resume sections
-    sections = analyze_resume_sections(resume_text)
+    sections = dict(features['sections'])
     
     # Calculate real ATS scores
-    keyword_score = calculate_keyword_score(resume_text, technical_keywords, soft_skills)
+    keyword_score = calculate_keyword_score(features['term_weights'], technical_keywords, soft_skills)
     section_score = calculate_section_score(sections)
-    format_score = calculate_format_score(resume_text)
-    experience_score = calculate_experience_relevance(resume_text, experience_keywords)
+    format_score = calculate_format_score(features['format'])
+    experience_score = calculate_experience_relevance(resume_terms, experience_keywords)
     
-    # Weighted final score (real ATS systems use similar weighting)
-    final_score = int(round(
-        keyword_score * 0.4 +      # 40% - Keywords (most important for ATS)
-        section_score * 0.25 +     # 25% - Complete sections
-        format_score * 0.2 +       # 20% - ATS-friendly format
-        experience_score * 0.15    # 15% - Relevant experience
-    ))
+    # BM25 relevance against the JD corpus IDF table (None until build_idf_table has run)
+    relevance_score = bm25_score(technical_keywords + soft_skills, features['term_counts'], features['token_count'])
+    
+    final_score = int(round(weighted_final_score(keyword_score, section_score, format_score, experience_score, relevance_score)))
     
     # Find missing critical keywords
-    missing_keywords = find_missing_critical_keywords(resume_text, technical_keywords, soft_skills)
+    missing_keywords = find_missing_critical_keywords(resume_terms, technical_keywords, soft_skills)
     
     return {
         'final_score': final_score,
@@ -60,94 +250,168 @@ def real_ats_analysis(resume_text: str, jd_text: str) -> Dict:
         'section_score': section_score,
         'format_score': format_score,
         'experience_score': experience_score,
+        'relevance_score': relevance_score,
         'missing_keywords': missing_keywords,
         'sections_analysis': sections,
-        'technical_keywords_found': find_matching_keywords(resume_text, technical_keywords),
-        'soft_skills_found': find_matching_keywords(resume_text, soft_skills)
+        'technical_keywords_found': find_matching_keywords(resume_terms, technical_keywords),
+        'soft_skills_found': find_matching_keywords(resume_terms, soft_skills),
+        'requirements': jd_analysis['requirements'],
     }
 
+def _relevance_at(relevance_scores, row: int):
+    if relevance_scores is None or np.isnan(relevance_scores[row]):
+        return None
+    return int(relevance_scores[row])
+
+def batch_ats_analysis(resume_text: str, jd_texts: List[str]) -> List[Dict]:
+    """
+    Score one resume against many JDs at once.
+    Builds a sparse JD x term matrix over the taxonomy and computes keyword,
+    experience, missing and matching results as matrix operations. Each entry
+    has the same shape as real_ats_analysis (plus the JD fingerprint).
+    """
+    from scipy import sparse
+
+    if not jd_texts:
+        return []
+    keywords = get_keywords()
+    term_ids = keywords.term_ids
+    n_terms = len(keywords.terms)
+    features = get_resume_features(resume_text)
+    analyses = [analyze_job_description(jd) for jd in jd_texts]
+
+    # Per-term vectors over the taxonomy
+    category = np.array([keywords.categories[t] for t in keywords.terms])
+    is_tech = (category == TECHNICAL).astype(np.float64)
+    is_soft = (category == SOFT).astype(np.float64)
+    is_exp = (category == EXPERIENCE).astype(np.float64)
+    in_resume = np.zeros(n_terms)
+    in_resume[[term_ids[t] for t in features['terms'] if t in term_ids]] = 1.0
+    resume_weight = np.zeros(n_terms)
+    for term, weight in features['term_weights'].items():
+        if term in term_ids:
+            resume_weight[term_ids[term]] = weight
+    important = np.zeros(n_terms)
+    important[[term_ids[t] for t in IMPORTANT_SOFT_SKILLS if t in term_ids]] = 1.0
+
+    # Row layout keeps the per-JD reporting order: technical terms in JD order,
+    # then important soft skills in priority order, then the remaining terms.
+    soft_rank = {t: i for i, t in enumerate(IMPORTANT_SOFT_SKILLS)}
+    indices: List[int] = []
+    indptr = [0]
+    for analysis in analyses:
+        kw = analysis['keywords']
+        soft = sorted(kw[SOFT], key=lambda t: soft_rank.get(t, len(soft_rank)))
+        indices.extend(term_ids[t] for t in kw[TECHNICAL] + soft + kw[EXPERIENCE] if t in term_ids)
+        indptr.append(len(indices))
+    indices_arr = np.asarray(indices, dtype=np.int64)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices_arr)), indices_arr, np.asarray(indptr)),
+        shape=(len(analyses), n_terms),
+    )
+
+    tech_total, soft_total, exp_total = matrix @ is_tech, matrix @ is_soft, matrix @ is_exp
+    kw_found = matrix @ ((is_tech * 1.5 + is_soft) * resume_weight)
+    exp_found = matrix @ (is_exp * in_resume)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kw_denominator = tech_total * 1.5 + soft_total
+        keyword_scores = np.where(kw_denominator > 0, np.round((kw_found / kw_denominator) * 100), 50)
+        experience_scores = np.where(exp_total > 0, np.round((exp_found / exp_total) * 100), 50)
+    keyword_scores = np.clip(keyword_scores, 0, 100).astype(int)
+    experience_scores = np.clip(experience_scores, 0, 100).astype(int)
+
+    sections = dict(features['sections'])
+    section_score = calculate_section_score(sections)
+    format_score = calculate_format_score(features['format'])
+    # BM25 over the same matrix: per-term saturated tf of the resume, scaled by idf
+    relevance_scores = None
+    table = get_idf_table()
+    if table is not None:
+        idf = table.idf(keywords.terms)
+        tf = np.zeros(n_terms)
+        for term, count in features['term_counts'].items():
+            if term in term_ids:
+                tf[term_ids[term]] = count
+        avg_length = float(getattr(settings, 'ATS_BM25_AVG_RESUME_TOKENS', 450))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * (features['token_count'] or avg_length) / avg_length)
+        query = is_tech + is_soft
+        gained = matrix @ (query * idf * tf * (BM25_K1 + 1) / (tf + norm))
+        ideal = matrix @ (query * idf)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relevance_scores = np.clip(np.round(gained / ideal * 100), 0, 100)
+
+    final_scores = weighted_final_score(keyword_scores, section_score, format_score, experience_scores)
+    if relevance_scores is not None:
+        # JDs without technical/soft terms have no BM25 query and keep the plain weighting
+        with_relevance = weighted_final_score(
+            keyword_scores, section_score, format_score, experience_scores, np.nan_to_num(relevance_scores)
+        )
+        final_scores = np.where(np.isnan(relevance_scores), final_scores, with_relevance)
+    final_scores = np.round(final_scores).astype(int)
+
+    # Classify every stored (JD, term) entry at once, then cut rows back out
+    present = in_resume[indices_arr] > 0
+    missing_mask = ~present & ((is_tech[indices_arr] > 0) | (important[indices_arr] > 0))
+    tech_found_mask = present & (is_tech[indices_arr] > 0)
+    soft_found_mask = present & (is_soft[indices_arr] > 0)
+    terms = np.asarray(keywords.terms, dtype=object)[indices_arr] if len(indices_arr) else np.empty(0, dtype=object)
+
+    results = []
+    for row, analysis in enumerate(analyses):
+        lo, hi = indptr[row], indptr[row + 1]
+        row_terms = terms[lo:hi]
+        # Soft matches are reported in JD order, like find_matching_keywords
+        soft_found_terms = set(row_terms[soft_found_mask[lo:hi]])
+        results.append({
+            'fingerprint': analysis['fingerprint'],
+            'final_score': int(final_scores[row]),
+            'keyword_score': int(keyword_scores[row]),
+            'section_score': section_score,
+            'format_score': format_score,
+            'experience_score': int(experience_scores[row]),
+            'relevance_score': _relevance_at(relevance_scores, row),
+            'missing_keywords': list(row_terms[missing_mask[lo:hi]][:MAX_MISSING_KEYWORDS]),
+            'sections_analysis': dict(sections),
+            'technical_keywords_found': list(row_terms[tech_found_mask[lo:hi]]),
+            'soft_skills_found': [t for t in analysis['keywords'][SOFT] if t in soft_found_terms],
+            'requirements': analysis['requirements'],
+        })
+    return results
+
 def extract_technical_keywords(jd_text: str) -> List[str]:
     """Extract technical skills and technologies from job description"""
-    technical_patterns = [
-        r'\b(?:Python|Java|JavaScript|C\+\+|C#|PHP|Ruby|Go|Rust|Swift|Kotlin)\b',
-        r'\b(?:React|Angular|Vue|Node\.js|Express|Django|Flask|Spring|Laravel)\b',
-        r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Jenkins|Git|GitHub|GitLab)\b',
-        r'\b(?:SQL|MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b',
-        r'\b(?:HTML|CSS|SASS|LESS|Bootstrap|Tailwind|jQuery)\b',
-        r'\b(?:REST|API|GraphQL|Microservices|Agile|Scrum|DevOps)\b',
-        r'\b(?:Machine Learning|AI|Data Science|Analytics|Tableau|Power BI)\b',
-        r'\b(?:Linux|Unix|Windows|macOS|iOS|Android)\b'
-    ]
-    
-    keywords = set()
-    for pattern in technical_patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE)
-        keywords.update([match.lower() for match in matches])
-    
-    return list(keywords)
+    return extract_jd_keywords(jd_text)[TECHNICAL]
 
 def extract_soft_skills(jd_text: str) -> List[str]:
     """Extract soft skills from job description"""
-    soft_skill_patterns = [
-        r'\b(?:leadership|teamwork|communication|problem solving|analytical|creative)\b',
-        r'\b(?:collaboration|time management|project management|mentoring|training)\b',
-        r'\b(?:adaptability|flexibility|initiative|attention to detail|critical thinking)\b',
-        r'\b(?:presentation|negotiation|customer service|client relations|stakeholder management)\b'
-    ]
-    
-    keywords = set()
-    for pattern in soft_skill_patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE)
-        keywords.update([match.lower() for match in matches])
-    
-    return list(keywords)
+    return extract_jd_keywords(jd_text)[SOFT]
 
 def extract_experience_keywords(jd_text: str) -> List[str]:
     """Extract experience-related keywords"""
-    experience_patterns = [
-        r'\b(?:years?|experience|senior|junior|lead|principal|architect|engineer|developer|analyst)\b',
-        r'\b(?:startup|enterprise|fintech|healthcare|e-commerce|SaaS|B2B|B2C)\b',
-        r'\b(?:remote|hybrid|onsite|full-time|part-time|contract|freelance)\b'
-    ]
-    
-    keywords = set()
-    for pattern in experience_patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE)
-        keywords.update([match.lower() for match in matches])
-    
-    return list(keywords)
+    return extract_jd_keywords(jd_text)[EXPERIENCE]
 
 def analyze_resume_sections(resume_text: str) -> Dict:
-    """Analyze completeness of resume sections"""
-    sections = {
-        'header': bool(re.search(r'(?:name|email|phone|linkedin)', resume_text, re.IGNORECASE)),
-        'summary': bool(re.search(r'(?:summary|objective|profile|about)', resume_text, re.IGNORECASE)),
-        'experience': bool(re.search(r'(?:experience|employment|work history|professional)', resume_text, re.IGNORECASE)),
-        'education': bool(re.search(r'(?:education|degree|university|college|school)', resume_text, re.IGNORECASE)),
-        'skills': bool(re.search(r'(?:skills|technical|technologies|competencies)', resume_text, re.IGNORECASE)),
-        'projects': bool(re.search(r'(?:projects|portfolio|achievements)', resume_text, re.IGNORECASE))
-    }
-    
-    return sections
+    """Analyze completeness of resume sections from its section headers"""
+    return sections_present(resume_text, segment_resume(resume_text))
 
-def calculate_keyword_score(resume_text: str, technical_keywords: List[str], soft_skills: List[str]) -> int:
+def calculate_keyword_score(resume, technical_keywords: List[str], soft_skills: List[str]) -> int:
     """Calculate keyword matching score (0-100)"""
     if not technical_keywords and not soft_skills:
         return 50  # Default if no keywords found
     
-    resume_lower = resume_text.lower()
+    # Each hit counts by its best section (experience > skills > summary > elsewhere)
+    resume_weights = _resume_term_weights(resume)
     total_keywords = len(technical_keywords) + len(soft_skills)
     found_keywords = 0
     
     # Check technical keywords (weighted more heavily)
     for keyword in technical_keywords:
-        if keyword in resume_lower:
-            found_keywords += 1.5  # Technical keywords are more important
+        found_keywords += 1.5 * resume_weights.get(keyword, 0)  # Technical keywords are more important
     
     # Check soft skills
     for skill in soft_skills:
-        if skill in resume_lower:
-            found_keywords += 1
+        found_keywords += resume_weights.get(skill, 0)
     
     # Calculate percentage
     if total_keywords == 0:
@@ -168,58 +432,67 @@ def calculate_section_score(sections: Dict) -> int:
     score = int(round((required_score * 2 + optional_score) / (len(required_sections) * 2 + len(optional_sections)) * 100))
     return min(100, max(0, score))
 
-def calculate_format_score(resume_text: str) -> int:
-    """Calculate ATS-friendly format score (0-100)"""
+def format_signals(resume_text: str) -> Dict[str, bool]:
+    """Detect the ATS-friendly format elements used by calculate_format_score"""
+    return {
+        'quantified': bool(re.search(r'\b\d+%|\b\d+\+|\b\d+[kK]|\$\d+', resume_text)),  # Quantified achievements
+        'action_verbs': bool(re.search(r'\b(?:developed|implemented|created|designed|managed|led|improved|optimized)', resume_text, re.IGNORECASE)),
+        'line_breaks': len(resume_text.split('\n')) > 10,  # Proper formatting with line breaks
+        'email': bool(re.search(r'@\w+\.\w+', resume_text)),  # Professional email
+    }
+
+def calculate_format_score(resume) -> int:
+    """Calculate ATS-friendly format score (0-100) from resume text or its format_signals"""
+    signals = format_signals(resume) if isinstance(resume, str) else resume
     score = 50  # Base score
     
     # Check for ATS-friendly elements
-    if re.search(r'\b\d+%|\b\d+\+|\b\d+[kK]|\$\d+', resume_text):  # Quantified achievements
+    if signals['quantified']:
         score += 15
     
-    if re.search(r'\b(?:developed|implemented|created|designed|managed|led|improved|optimized)', resume_text, re.IGNORECASE):  # Action verbs
+    if signals['action_verbs']:
         score += 15
     
-    if len(resume_text.split('\n')) > 10:  # Proper formatting with line breaks
+    if signals['line_breaks']:
         score += 10
     
-    if re.search(r'@\w+\.\w+', resume_text):  # Professional email
+    if signals['email']:
         score += 10
     
     return min(100, max(0, score))
 
-def calculate_experience_relevance(resume_text: str, experience_keywords: List[str]) -> int:
+def calculate_experience_relevance(resume, experience_keywords: List[str]) -> int:
     """Calculate experience relevance score (0-100)"""
     if not experience_keywords:
         return 50
     
-    resume_lower = resume_text.lower()
-    found_keywords = sum(1 for keyword in experience_keywords if keyword in resume_lower)
+    resume_terms = _resume_term_set(resume)
+    found_keywords = sum(1 for keyword in experience_keywords if keyword in resume_terms)
     
     score = int(round((found_keywords / len(experience_keywords)) * 100))
     return min(100, max(0, score))
 
-def find_missing_critical_keywords(resume_text: str, technical_keywords: List[str], soft_skills: List[str]) -> List[str]:
+def find_missing_critical_keywords(resume, technical_keywords: List[str], soft_skills: List[str]) -> List[str]:
     """Find missing critical keywords that should be added"""
-    resume_lower = resume_text.lower()
+    resume_terms = _resume_term_set(resume)
     missing = []
     
     # Check technical keywords (prioritize these)
     for keyword in technical_keywords:
-        if keyword not in resume_lower:
+        if keyword not in resume_terms:
             missing.append(keyword)
     
     # Check soft skills (limit to most important ones)
-    important_soft_skills = ['leadership', 'communication', 'problem solving', 'teamwork', 'analytical']
-    for skill in important_soft_skills:
-        if skill in soft_skills and skill not in resume_lower:
+    for skill in IMPORTANT_SOFT_SKILLS:
+        if skill in soft_skills and skill not in resume_terms:
             missing.append(skill)
     
-    return missing[:20]  # Limit to top 20 most important
+    return missing[:MAX_MISSING_KEYWORDS]  # Limit to top 20 most important
 
-def find_matching_keywords(resume_text: str, keywords: List[str]) -> List[str]:
+def find_matching_keywords(resume, keywords: List[str]) -> List[str]:
     """Find which keywords are present in the resume"""
-    resume_lower = resume_text.lower()
-    return [keyword for keyword in keywords if keyword in resume_lower]
+    resume_terms = _resume_term_set(resume)
+    return [keyword for keyword in keywords if keyword in resume_terms]
 
 def baseline_overlap_score(resume_text: str, jd_text: str) -> Tuple[int, List[str]]:
     """Legacy function - now uses real ATS analysis"""
@@ -0,0 +1,114 @@
+"""
+Structured ATS suggestions.
+
+An ATSResult stores its suggestions as compact records instead of rendered
+prose: a template code, the score it refers to and, where relevant, a keyword
+list, e.g. {"code": "keywords_low", "score": 54, "keywords": ["docker"]}.
+The prose lives only in SUGGESTION_TEMPLATES and is rendered at display time;
+renders are memoized because most records (the static advice) are identical
+across every result.
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Separator of the legacy single-string format (ATSResult.suggestions)
+LEGACY_SEPARATOR = ' | '
+
+SUGGESTION_TEMPLATES = {
+    'keywords_low': (
+        "🔑 CRITICAL KEYWORD OPTIMIZATION: Your keyword matching score is {score}%, which is below the 70% threshold that most ATS systems require. To increase your chances of passing ATS screening, strategically incorporate these missing keywords: {keywords}. Place them naturally in your experience descriptions, skills section, and summary. For example, if 'Python' is missing, add it to your technical skills and mention specific Python projects in your experience."
+    ),
+    'sections_missing': (
+        "📋 ESSENTIAL SECTIONS MISSING: Your resume is missing {keywords} section(s), which reduces your ATS compatibility score to {score}%. ATS systems expect standard resume sections. Add a {first} section with relevant content. For example, if 'projects' is missing, create a 'Projects' section highlighting 2-3 relevant projects with technologies used and results achieved."
+    ),
+    'format_low': (
+        "📄 FORMAT OPTIMIZATION NEEDED: Your format score is {score}%. To improve ATS compatibility: 1) Add quantified achievements with numbers and percentages (e.g., 'Increased performance by 40%'), 2) Use strong action verbs (Developed, Implemented, Led, Optimized), 3) Ensure proper formatting with clear section headers, 4) Include a professional email address. These elements help ATS systems better parse and rank your resume."
+    ),
+    'experience_low': (
+        '💼 EXPERIENCE RELEVANCE: Your experience relevance score is {score}%. To improve: 1) Tailor your experience descriptions to match the job requirements, 2) Include industry-specific terminology from the job description, 3) Highlight relevant technologies and methodologies, 4) Quantify your achievements with specific metrics and results.'
+    ),
+    'keyword_strategy': (
+        "🎯 ADVANCED KEYWORD STRATEGY: Your keyword score is {score}%. To maximize ATS compatibility: 1) Use exact keyword variations from the job description, 2) Include both technical skills (Python, React, SQL) and soft skills (Leadership, Communication), 3) Place keywords in multiple sections (summary, experience, skills), 4) Use industry-standard terminology and acronyms, 5) Include both full terms and abbreviations (e.g., 'Machine Learning' and 'ML')"
+    ),
+    'quantified': (
+        "📊 QUANTIFIED ACHIEVEMENTS STRATEGY: To boost your ATS score, add specific metrics throughout your resume: 1) Use numbers and percentages (e.g., 'Increased sales by 25%', 'Managed team of 8 developers'), 2) Include time-based achievements (e.g., 'Reduced processing time by 50% in 6 months'), 3) Add financial impact (e.g., 'Saved company $50K annually'), 4) Mention scale and scope (e.g., 'Led project serving 10,000+ users'), 5) Include specific technologies and tools used"
+    ),
+    'ats_formatting': (
+        '📝 ATS-FRIENDLY FORMATTING: Ensure your resume passes ATS parsing: 1) Use standard section headers (EXPERIENCE, EDUCATION, SKILLS, PROJECTS), 2) Avoid graphics, tables, or complex formatting, 3) Use simple bullet points and clear fonts, 4) Include contact information at the top, 5) Save as .docx or .pdf format, 6) Use consistent date formats (MM/YYYY), 7) Avoid headers and footers'
+    ),
+    'industry': (
+        '🏭 INDUSTRY-SPECIFIC OPTIMIZATION: Tailor your resume for your target industry: 1) Research common keywords in your field, 2) Include relevant certifications and licenses, 3) Highlight industry-specific tools and technologies, 4) Use terminology that recruiters in your field expect, 5) Include relevant projects and achievements, 6) Mention industry standards and best practices you follow'
+    ),
+    'experience_section': (
+        '💼 EXPERIENCE SECTION ENHANCEMENT: Make your experience stand out: 1) Start each bullet point with a strong action verb, 2) Focus on achievements rather than duties, 3) Use the STAR method (Situation, Task, Action, Result), 4) Include specific technologies and tools used, 5) Show progression and growth in your roles, 6) Quantify your impact with numbers and metrics'
+    ),
+    'skills_section': (
+        '🛠️ SKILLS SECTION OPTIMIZATION: Optimize your skills section for ATS: 1) Include both technical and soft skills, 2) Use exact keywords from the job description, 3) Organize skills by category (Technical Skills, Soft Skills, Tools), 4) Include proficiency levels when relevant, 5) Add industry-specific certifications, 6) Keep the list current and relevant'
+    ),
+    'projects_section': (
+        '🚀 PROJECTS SECTION STRATEGY: Showcase your work effectively: 1) Include 2-3 most relevant projects, 2) Describe the problem you solved and your solution, 3) Mention technologies, tools, and methodologies used, 4) Include quantifiable results and impact, 5) Add links to live demos or GitHub repositories, 6) Highlight projects that match the job requirements'
+    ),
+    'overall': (
+        '🎯 OVERALL STRATEGY: Your current ATS score is {score}%. To increase your chances of getting past ATS screening: 1) Prioritize adding missing keywords naturally throughout your resume, 2) Ensure all standard sections are present and well-formatted, 3) Include quantified achievements in your experience, 4) Use industry-standard terminology and action verbs, 5) Consider adding a projects section if you have relevant work to showcase, 6) Tailor your resume for each specific job application, 7) Get feedback from industry professionals'
+    ),
+    'excellent': (
+        '🎉 EXCELLENT ATS COMPATIBILITY: Your resume shows strong ATS compatibility with a score of {score}%! Continue to refine by adding more quantified achievements and staying current with industry keywords.'
+    ),
+}
+
+# Advice shown on every result, in display order
+_STATIC_CODES = ('quantified', 'ats_formatting', 'industry', 'experience_section', 'skills_section', 'projects_section')
+
+
+def build_suggestions(real_analysis: Dict) -> List[Dict]:
+    """Suggestion records for a real_ats_analysis result."""
+    records = []
+
+    # 1. CRITICAL KEYWORD OPTIMIZATION
+    if real_analysis['keyword_score'] < 70:
+        records.append({'code': 'keywords_low', 'score': real_analysis['keyword_score'],
+                        'keywords': list(real_analysis['missing_keywords'][:5])})
+
+    # 2. ESSENTIAL SECTIONS MISSING
+    if real_analysis['section_score'] < 80:
+        missing_sections = [section for section, present in real_analysis['sections_analysis'].items() if not present]
+        if missing_sections:
+            records.append({'code': 'sections_missing', 'score': real_analysis['section_score'],
+                            'keywords': missing_sections})
+
+    # 3. FORMAT OPTIMIZATION NEEDED
+    if real_analysis['format_score'] < 70:
+        records.append({'code': 'format_low', 'score': real_analysis['format_score']})
+
+    # 4. EXPERIENCE RELEVANCE
+    if real_analysis['experience_score'] < 70:
+        records.append({'code': 'experience_low', 'score': real_analysis['experience_score']})
+
+    # 5. DETAILED KEYWORD STRATEGY
+    if real_analysis['keyword_score'] < 80:
+        records.append({'code': 'keyword_strategy', 'score': real_analysis['keyword_score']})
+
+    # 6-11. General advice
+    records.extend({'code': code} for code in _STATIC_CODES)
+
+    # 12. OVERALL STRATEGY
+    if real_analysis['final_score'] < 80:
+        records.append({'code': 'overall', 'score': real_analysis['final_score']})
+
+    return records or [{'code': 'excellent', 'score': real_analysis['final_score']}]
+
+
+@lru_cache(maxsize=2048)
+def _render(code: str, score, keywords: Tuple[str, ...]) -> str:
+    template = SUGGESTION_TEMPLATES.get(code)
+    if template is None:
+        return ''
+    return template.format(score=score, keywords=', '.join(keywords), first=keywords[0] if keywords else '')
+
+
+def render_suggestion(record: Dict) -> str:
+    return _render(record.get('code', ''), record.get('score'), tuple(record.get('keywords') or ()))
+
+
+def render_suggestions(records: List[Dict]) -> List[str]:
+    return [text for text in (render_suggestion(r) for r in records or []) if text]
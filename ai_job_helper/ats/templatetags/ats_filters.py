@@ -1,5 +1,7 @@
 from django import template
 
+from ats.suggestions import render_suggestions
+
 register = template.Library()
 
 @register.filter
@@ -16,3 +18,13 @@ def split_suggestions(value, delimiter='|'):
         return []
     return [item.strip() for item in str(value).split(delimiter) if item.strip()]
 
+
+@register.filter
+def result_suggestions(result):
+    """Rendered suggestions of an ATSResult: structured records, else the legacy prose"""
+    if result is None:
+        return []
+    records = getattr(result, 'suggestion_records', None)
+    if records:
+        return render_suggestions(records)
+    return split_suggestions(getattr(result, 'suggestions', None))
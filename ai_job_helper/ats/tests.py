@@ -0,0 +1,319 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import keywords
+from .bench import compare, make_corpus
+from .bulk import score_files
+from .history import history_page
+from .idf import IdfTable, bm25_score, update_idf_table
+from .keywords import get_keywords, TECHNICAL, SOFT
+from .models import ATSResult
+from .sections import segment_resume
+from .suggestions import build_suggestions, render_suggestions
+from .templatetags.ats_filters import result_suggestions
+from .whatif import what_if_analysis
+from .services import (
+    real_ats_analysis, extract_jd_keywords, get_resume_features,
+    analyze_job_description, jd_cache_stats, jd_fingerprint, parse_requirements,
+    batch_ats_analysis,
+)
+
+
+@override_settings(ATS_JD_SHARED_CACHE=False)
+class KeywordAutomatonTests(SimpleTestCase):
+    def test_matches_on_token_boundaries(self):
+        terms = get_keywords().term_set("A good engineer with JavaScript and GitHub skills")
+        self.assertNotIn("go", terms)
+        self.assertNotIn("java", terms)
+        self.assertNotIn("git", terms)
+        self.assertIn("javascript", terms)
+        self.assertIn("github", terms)
+
+    def test_hits_carry_offsets_and_phrases(self):
+        text = "Python, C++ and Machine Learning; problem-solving"
+        hits = {hit.term: hit for hit in get_keywords().scan(text)}
+        self.assertEqual(text[hits["c++"].start:hits["c++"].end], "C++")
+        self.assertEqual(text[hits["machine learning"].start:hits["machine learning"].end], "Machine Learning")
+        self.assertIn("problem solving", hits)
+
+    @override_settings(ATS_TAXONOMY_CHECK_INTERVAL=0)
+    def test_malformed_taxonomy_edit_keeps_last_good_automaton(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "taxonomy.json")
+        shutil.copy(keywords.TAXONOMY_PATH, path)
+        with mock.patch.object(keywords, "TAXONOMY_PATH", path):
+            self.addCleanup(keywords.reload_keywords)
+            good = keywords.reload_keywords()
+            with open(path, "w") as fh:
+                fh.write('{"version": 2, "categories": {"technical": [{"te')
+            os.utime(path, (1, 1))
+            self.assertIs(keywords.get_keywords(), good)
+            with self.assertRaises(ValueError):
+                keywords.reload_keywords()
+
+    def test_jd_keywords_grouped_by_category_in_order(self):
+        found = extract_jd_keywords("Senior Django developer. Docker, Python, leadership.")
+        self.assertEqual(found[TECHNICAL], ["django", "docker", "python"])
+        self.assertEqual(found[SOFT], ["leadership"])
+
+    def test_analysis_reports_missing_and_found(self):
+        analysis = real_ats_analysis("Built Django apps in Python", "Python, Django and Kubernetes")
+        self.assertEqual(analysis["technical_keywords_found"], ["python", "django"])
+        self.assertEqual(analysis["missing_keywords"], ["kubernetes"])
+
+    def test_aliases_map_to_canonical_terms(self):
+        found = extract_jd_keywords("Deploy to K8s on Postgres; ML experience with Golang")
+        self.assertEqual(found[TECHNICAL], ["kubernetes", "postgresql", "machine learning", "go"])
+
+
+class ResumeFeatureCacheTests(SimpleTestCase):
+    def test_features_are_reused_for_identical_text(self):
+        text = "Jane Doe\njane@example.com\nSkills: Python, Docker\nImproved latency by 40%"
+        first = get_resume_features(text)
+        self.assertIs(get_resume_features(text), first)
+        self.assertEqual(first["terms"], {"python", "docker"})
+        self.assertTrue(first["format"]["quantified"])
+        self.assertIsNot(get_resume_features(text + " Kubernetes"), first)
+
+
+@override_settings(ATS_JD_SHARED_CACHE=False)
+class JDAnalysisCacheTests(SimpleTestCase):
+    def test_fingerprint_ignores_whitespace(self):
+        self.assertEqual(jd_fingerprint("Python  developer\n\nremote"), jd_fingerprint(" Python developer remote "))
+
+    def test_repeat_jd_is_served_from_cache(self):
+        jd = "Backend engineer, 4+ years of Django. Bachelor's degree preferred. Unique posting 7f3a."
+        before = jd_cache_stats()
+        first = analyze_job_description(jd)
+        self.assertIs(analyze_job_description(jd.replace(" ", "  ")), first)
+        after = jd_cache_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["local_hits"] - before["local_hits"], 1)
+        self.assertEqual(first["requirements"], {"min_years": 4, "degree": "bachelor"})
+
+    def test_requirements_ignore_false_degree_matches(self):
+        self.assertIsNone(parse_requirements("Scrum Master who will be on call")["degree"])
+
+
+@override_settings(ATS_JD_SHARED_CACHE=False)
+class BatchAnalysisTests(SimpleTestCase):
+    def test_batch_matches_single_analysis(self):
+        resume = "Education\nSkills: Python, Django, leadership\nSenior engineer, 5 years"
+        jds = [
+            "Python and Kubernetes; communication and leadership; senior, remote",
+            "React developer with teamwork",
+            "No known keywords here",
+        ]
+        for jd, batched in zip(jds, batch_ats_analysis(resume, jds)):
+            batched.pop("fingerprint")
+            self.assertEqual(batched, real_ats_analysis(resume, jd))
+
+
+class SectionSegmenterTests(SimpleTestCase):
+    RESUME = (
+        "Jane Doe\njane@example.com\n"
+        "PROFESSIONAL SUMMARY\nBackend engineer, professional and reliable.\n"
+        "Skills: Python, Docker\n"
+        "Experience\nBuilt Kubernetes operators\n"
+    )
+
+    def test_spans_follow_headers(self):
+        spans = segment_resume(self.RESUME)
+        self.assertEqual([s for s, _, _ in spans], ["header", "summary", "skills", "experience"])
+        section, start, end = spans[2]
+        self.assertEqual(self.RESUME[start:end], "Skills: Python, Docker\n")
+
+    def test_words_inside_text_are_not_headers(self):
+        flags = get_resume_features(self.RESUME)["sections"]
+        self.assertTrue(flags["header"])
+        self.assertFalse(flags["education"])
+        self.assertFalse(get_resume_features("A professional with great skills")["sections"]["experience"])
+
+    def test_keyword_weight_depends_on_section(self):
+        weights = get_resume_features(self.RESUME)["term_weights"]
+        self.assertEqual(weights["kubernetes"], 1.0)
+        self.assertLess(weights["python"], weights["kubernetes"])
+
+
+class BM25Tests(SimpleTestCase):
+    TABLE = IdfTable({'documents': 100, 'taxonomy': '', 'terms': ['python', 'sql']}, np.array([90, 5]))
+
+    def test_rare_terms_weigh_more(self):
+        counts = {'python': 1, 'sql': 1}
+        only_common = bm25_score(['python', 'sql'], {'python': 1}, 450, self.TABLE)
+        only_rare = bm25_score(['python', 'sql'], {'sql': 1}, 450, self.TABLE)
+        self.assertLess(only_common, only_rare)
+        self.assertEqual(bm25_score(['python', 'sql'], counts, 450, self.TABLE), 100)
+
+    def test_no_table_means_no_relevance(self):
+        with override_settings(ATS_IDF_DIR='/nonexistent/ats_idf'):
+            self.assertIsNone(bm25_score(['python'], {'python': 1}, 450))
+
+
+@override_settings(ATS_JD_SHARED_CACHE=False)
+class WhatIfTests(SimpleTestCase):
+    RESUME = "Jane Doe\njane@example.com\nSkills: Python, Docker\nExperience\nBuilt web apps\n"
+    JD = "Python, Kubernetes and Docker; leadership"
+
+    def test_no_edits_match_full_analysis(self):
+        analysis = what_if_analysis(self.RESUME, self.JD)
+        self.assertEqual(analysis.pop("recomputed"), [])
+        analysis.pop("unrecognized_keywords")
+        self.assertEqual(analysis, real_ats_analysis(self.RESUME, self.JD))
+
+    def test_keyword_edits_only_touch_keyword_components(self):
+        analysis = what_if_analysis(self.RESUME, self.JD, add_keywords=["k8s", "blockchainz"], remove_keywords=["docker"])
+        self.assertEqual(analysis["missing_keywords"], ["docker", "leadership"])
+        self.assertEqual(analysis["unrecognized_keywords"], ["blockchainz"])
+        self.assertNotIn("section_score", analysis["recomputed"])
+
+    def test_section_edit_matches_rescoring_edited_text(self):
+        edited = "Jane Doe\njane@example.com\nSkills: Python, Kubernetes\nExperience\nBuilt web apps\n"
+        analysis = what_if_analysis(self.RESUME, self.JD, sections={"skills": "Python, Kubernetes"})
+        analysis.pop("recomputed")
+        analysis.pop("unrecognized_keywords")
+        self.assertEqual(analysis, real_ats_analysis(edited, self.JD))
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_corpus_is_deterministic_and_sized(self):
+        corpus = make_corpus(seed=1, sizes=["1kb"])
+        self.assertEqual([name for name, _, _ in corpus], ["1kb/dense", "1kb/sparse"])
+        self.assertEqual(corpus, make_corpus(seed=1, sizes=["1kb"]))
+        self.assertTrue(all(900 <= len(resume) <= 1000 for _, resume, _ in corpus))
+
+    def test_compare_flags_only_real_regressions(self):
+        baseline = {"results": {"a": {"us_per_call": 100.0, "peak_kb": 50.0}, "b": {"us_per_call": 2.0, "peak_kb": 1.0}}}
+        run = {"results": {"a": {"us_per_call": 130.0, "peak_kb": 52.0}, "b": {"us_per_call": 2.6, "peak_kb": 2.0}}}
+        self.assertEqual([(r["case"], r["metric"]) for r in compare(run, baseline, 0.15)], [("a", "us_per_call")])
+
+
+class SuggestionRecordTests(SimpleTestCase):
+    ANALYSIS = {
+        "final_score": 62, "keyword_score": 40, "section_score": 67, "format_score": 90, "experience_score": 50,
+        "missing_keywords": ["docker", "kubernetes"],
+        "sections_analysis": {"header": True, "summary": False, "experience": True, "education": True,
+                              "skills": True, "projects": False},
+    }
+
+    def test_records_are_compact_and_render_to_prose(self):
+        records = build_suggestions(self.ANALYSIS)
+        self.assertEqual(records[0], {"code": "keywords_low", "score": 40, "keywords": ["docker", "kubernetes"]})
+        self.assertEqual(records[1], {"code": "sections_missing", "score": 67, "keywords": ["summary", "projects"]})
+        rendered = render_suggestions(records)
+        self.assertIn("incorporate these missing keywords: docker, kubernetes.", rendered[0])
+        self.assertIn("Add a summary section", rendered[1])
+        self.assertLess(len(json.dumps(records)) * 5, len(" | ".join(rendered)))
+
+    def test_legacy_prose_still_renders(self):
+        legacy = SimpleNamespace(suggestion_records=[], suggestions="First tip | Second tip")
+        self.assertEqual(result_suggestions(legacy), ["First tip", "Second tip"])
+
+
+class HistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="pass12345")
+        now = timezone.now()
+        for i in range(7):
+            result = ATSResult.objects.create(user=self.user, job_description=f"Role {i}\nDetails", final_score=i)
+            # Two results share a timestamp: the id breaks the tie
+            ATSResult.objects.filter(pk=result.pk).update(created_at=now - timedelta(minutes=min(i, 5)))
+
+    def test_keyset_pages_cover_every_result_once(self):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = history_page(self.user, cursor=cursor, limit=3)
+            seen += [row["final_score"] for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [0, 1, 2, 3, 4, 6, 5])
+        self.assertEqual(rows[-1]["jd_title"], "Role 5")
+
+    def test_history_api_serves_summaries_and_details(self):
+        self.client.login(username="tester", password="pass12345")
+        data = self.client.get(reverse("ats_history"), {"limit": 2}).json()
+        self.assertEqual([r["final_score"] for r in data["results"]], [0, 1])
+        self.assertNotIn("job_description", data["results"][0])
+        page = self.client.get(reverse("ats_history"), {"cursor": data["next_cursor"], "limit": 2}).json()
+        self.assertEqual([r["final_score"] for r in page["results"]], [2, 3])
+        detail = self.client.get(reverse("ats_history_detail", args=[data["results"][0]["id"]])).json()
+        self.assertEqual(detail["result"]["job_description"], "Role 0\nDetails")
+
+
+class JsonBodyTests(TestCase):
+    def setUp(self):
+        User.objects.create_user(username="tester", password="pass12345", is_staff=True)
+        self.client.login(username="tester", password="pass12345")
+
+    def test_non_object_bodies_are_rejected(self):
+        for name in ("ats_batch_score", "ats_what_if", "ats_recruiter_search"):
+            for body in ("[]", '"text"', "42", "null"):
+                response = self.client.post(reverse(name), body, content_type="application/json")
+                self.assertEqual(response.status_code, 400, (name, body))
+                self.assertEqual(response.json()["error"], "Expected a JSON object")
+
+
+class BulkScoringTests(TestCase):
+    def test_scoring_error_becomes_an_error_row(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        for name, text in (("good.txt", "Python developer with Django and SQL"), ("bad.txt", "boom")):
+            with open(os.path.join(tmp, name), "w") as fh:
+                fh.write(text)
+        real = batch_ats_analysis
+
+        def flaky(text, jds):
+            if text == "boom":
+                raise RuntimeError("analyzer crashed")
+            return real(text, jds)
+
+        with mock.patch("ats.services.batch_ats_analysis", side_effect=flaky):
+            rows = {os.path.basename(r[0]["resume"]): r for r in score_files(
+                [Path(tmp) / "good.txt", Path(tmp) / "bad.txt"], [("jd", "Python Django developer")], workers=1)}
+        self.assertEqual(rows["bad.txt"][0]["error"], "scoring failed: analyzer crashed")
+        self.assertEqual(rows["good.txt"][0]["error"], "")
+
+    def test_command_output_can_be_captured(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        with open(os.path.join(tmp, "resume.txt"), "w") as fh:
+            fh.write("Python developer with Django and SQL")
+        jd = os.path.join(tmp, "backend.jd")
+        with open(jd, "w") as fh:
+            fh.write("Python Django developer")
+        out, err = StringIO(), StringIO()
+        call_command("ats_score", tmp, "--jd", jd, "--workers", "1", stdout=out, stderr=err)
+        row = json.loads(out.getvalue())
+        self.assertEqual((row["resume"], row["jd"], row["error"]), ("resume.txt", "backend", ""))
+
+
+class IdfUpdateTests(TestCase):
+    def test_jd_committed_at_the_watermark_instant_is_counted(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        user = User.objects.create_user(username="tester", password="pass12345")
+        instant = timezone.now() - timedelta(minutes=1)
+        first = ATSResult.objects.create(user=user, job_description="Python developer with Django")
+        ATSResult.objects.filter(pk=first.pk).update(created_at=instant)
+        with override_settings(ATS_IDF_DIR=tmp):
+            self.assertEqual(update_idf_table()["added"], 1)
+            # Saved with the same timestamp, but only after the previous run
+            late = ATSResult.objects.create(user=user, job_description="Kubernetes and Docker engineer")
+            ATSResult.objects.filter(pk=late.pk).update(created_at=instant)
+            self.assertEqual(update_idf_table()["added"], 1)
+            self.assertEqual(update_idf_table()["added"], 0)
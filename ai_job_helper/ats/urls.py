@@ -3,4 +3,9 @@ from . import views
 
 urlpatterns = [
     path('', views.home, name='ats_home'), 
+    path('history/', views.history, name='ats_history'),
+    path('history/<int:pk>/', views.history_detail, name='ats_history_detail'),
+    path('batch/', views.batch_score, name='ats_batch_score'),
+    path('what-if/', views.what_if, name='ats_what_if'),
+    path('recruiter/', views.recruiter_search, name='ats_recruiter_search'),
 ]
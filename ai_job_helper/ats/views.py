@@ -1,22 +1,24 @@
-from django.contrib.auth.decorators import login_required
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import render, get_object_or_404
+from django.views.decorators.http import require_GET, require_POST
+from django.http import JsonResponse
+from django.conf import settings
 import re
+import json
 from .forms import ATSForm
 from .models import ATSResult
-from .services import real_ats_analysis, baseline_overlap_score
+from .services import real_ats_analysis, baseline_overlap_score, batch_ats_analysis
+from .recruiter import top_resumes
+from .whatif import what_if_analysis
+from .history import history_page, result_detail
+from .suggestions import LEGACY_SEPARATOR, build_suggestions, render_suggestions
 from analysis.models import AgentMemory
 
 @login_required
 def home(request):
+    # Client-side scoring (Puter.js) fetches the resume text from accounts' resume_text endpoint
     context = {"result": None, "history": None, "form": ATSForm()}
 
-    # Expose resume_text for client-side scoring (Puter.js)
-    try:
-        resume_text_ctx = getattr(request.user.userprofile, "resume_text", "") or ""
-    except Exception:
-        resume_text_ctx = ""
-    context["resume_text"] = resume_text_ctx
-
     if request.method == "POST":
         form = ATSForm(request.POST)
         context["form"] = form
@@ -26,9 +28,6 @@ def home(request):
             rewrite = form.cleaned_data["rewrite_resume"]
             resume_text = getattr(request.user.userprofile, "resume_text", "") or ""
 
-            # keep in context for template JS usage
-            context["resume_text"] = resume_text
-
             if not resume_text:
                 context["error"] = "No resume text found in your profile. Please paste your resume in Profile."
                 return render(request, "ats/home.html", context)
@@ -62,7 +61,9 @@ def home(request):
             # 3) Build final values preferring Puter.js when present
             final_score = llm_score if llm_score is not None else real_analysis['final_score']
             missing_keywords = parsed_missing if parsed_missing is not None else ", ".join(real_analysis['missing_keywords'])
-            suggestions = parsed_suggestions if parsed_suggestions is not None else generate_comprehensive_suggestions(real_analysis)
+            # Our own suggestions are stored as compact records and rendered at display time
+            suggestions = parsed_suggestions
+            suggestion_records = build_suggestions(real_analysis) if parsed_suggestions is None else []
             optimized_resume = parsed_optimized_resume if parsed_optimized_resume is not None else ""
 
             # 4) No Gemini/Groq enrichment; rely on Puter.js or comprehensive real analysis only
@@ -75,6 +76,7 @@ def home(request):
                 final_score=final_score,
                 missing_keywords=missing_keywords,
                 suggestions=suggestions,
+                suggestion_records=suggestion_records,
                 optimized_resume=optimized_resume
             )
             context["result"] = result
@@ -89,9 +91,160 @@ def home(request):
                 pass
 
     # recent history
-    context["history"] = ATSResult.objects.filter(user=request.user)[:10]
+    context["history"], context["history_next"] = history_page(request.user, limit=10)
     return render(request, "ats/home.html", context)
 
+@login_required
+@require_GET
+def history(request):
+    """One page of the user's ATS history (summary fields only), newest first.
+
+    Query params: cursor (from the previous page's next_cursor), limit (<= 100).
+    """
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or 20), 100))
+    except (TypeError, ValueError):
+        return JsonResponse({"ok": False, "error": "limit must be an integer"}, status=400)
+    try:
+        rows, next_cursor = history_page(request.user, cursor=request.GET.get("cursor"), limit=limit)
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "Invalid cursor"}, status=400)
+    for row in rows:
+        row["created_at"] = row["created_at"].isoformat()
+    return JsonResponse({"ok": True, "results": rows, "next_cursor": next_cursor})
+
+@login_required
+@require_GET
+def history_detail(request, pk):
+    """Full stored details of one of the user's ATS results."""
+    result = get_object_or_404(ATSResult, pk=pk, user=request.user)
+    return JsonResponse({"ok": True, "result": result_detail(result)})
+
+@login_required
+@require_POST
+def batch_score(request):
+    """Score the profile resume (or a supplied one) against many job descriptions.
+
+    Expected JSON body:
+    { "job_descriptions": [str, ...], "resume_text": Optional[str] }
+    """
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"ok": False, "error": "Expected a JSON object"}, status=400)
+
+    jds = data.get("job_descriptions")
+    if not isinstance(jds, list) or not jds:
+        return JsonResponse({"ok": False, "error": "Missing job_descriptions"}, status=400)
+    max_jds = getattr(settings, "ATS_BATCH_MAX_JDS", 500)
+    if len(jds) > max_jds:
+        return JsonResponse({"ok": False, "error": f"At most {max_jds} job descriptions per request"}, status=400)
+    jds = [str(jd or "").strip() for jd in jds]
+
+    resume_text = data.get("resume_text")
+    if not isinstance(resume_text, str) or not resume_text.strip():
+        resume_text = getattr(request.user.userprofile, "resume_text", "") or ""
+    if not resume_text:
+        return JsonResponse({"ok": False, "error": "No resume text found in your profile"}, status=400)
+
+    return JsonResponse({"ok": True, "results": batch_ats_analysis(resume_text, jds)})
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+@require_POST
+def recruiter_search(request):
+    """Rank stored resumes against a job description (staff only).
+
+    Expected JSON body:
+    { "job_description": str, "k": Optional[int] }
+    """
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"ok": False, "error": "Expected a JSON object"}, status=400)
+
+    jd = str(data.get("job_description") or "").strip()
+    if not jd:
+        return JsonResponse({"ok": False, "error": "Missing job_description"}, status=400)
+    try:
+        k = max(1, min(int(data.get("k") or 20), 200))
+    except (TypeError, ValueError):
+        return JsonResponse({"ok": False, "error": "k must be an integer"}, status=400)
+
+    return JsonResponse({"ok": True, "results": top_resumes(jd, k=k)})
+
+@login_required
+@require_POST
+def what_if(request):
+    """Re-score the profile resume with small edits applied, without re-running the full analysis.
+
+    Expected JSON body:
+    {
+      "job_description": str,
+      "add_keywords": Optional[[str, ...]],
+      "remove_keywords": Optional[[str, ...]],
+      "keyword_section": Optional[str],    # section the added keywords go to (default "skills")
+      "sections": Optional[{name: str}],   # new body text per section, "" drops the section
+      "save": Optional[bool]               # persist the re-scored result to history
+    }
+    Edits are relative to the saved resume: send all of them on every call.
+    """
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"ok": False, "error": "Expected a JSON object"}, status=400)
+
+    jd = str(data.get("job_description") or "").strip()
+    if not jd:
+        return JsonResponse({"ok": False, "error": "Missing job_description"}, status=400)
+    resume_text = getattr(request.user.userprofile, "resume_text", "") or ""
+    if not resume_text:
+        return JsonResponse({"ok": False, "error": "No resume text found in your profile"}, status=400)
+
+    add_keywords = data.get("add_keywords") or []
+    remove_keywords = data.get("remove_keywords") or []
+    sections = data.get("sections") or {}
+    if not all(isinstance(k, list) and all(isinstance(w, str) for w in k) for k in (add_keywords, remove_keywords)):
+        return JsonResponse({"ok": False, "error": "Keywords must be lists of strings"}, status=400)
+    if not isinstance(sections, dict) or not all(isinstance(v, str) for v in sections.values()):
+        return JsonResponse({"ok": False, "error": "sections must map section names to text"}, status=400)
+    try:
+        analysis = what_if_analysis(
+            resume_text, jd,
+            add_keywords=add_keywords,
+            remove_keywords=remove_keywords,
+            sections=sections,
+            keyword_section=data.get("keyword_section") or "skills",
+        )
+    except ValueError as exc:
+        return JsonResponse({"ok": False, "error": str(exc)}, status=400)
+
+    response = {"ok": True, "analysis": analysis}
+    if data.get("save"):
+        result = ATSResult.objects.create(
+            user=request.user,
+            job_description=jd,
+            baseline_score=analysis['keyword_score'],
+            final_score=analysis['final_score'],
+            missing_keywords=", ".join(analysis['missing_keywords']),
+            suggestion_records=build_suggestions(analysis),
+            optimized_resume="",
+        )
+        try:
+            mem, _ = AgentMemory.objects.get_or_create(user=request.user)
+            mem.last_ats_score = analysis['final_score']
+            mem.save()
+        except Exception:
+            pass
+        response["result_id"] = result.id
+    return JsonResponse(response)
+
 def generate_detailed_suggestions(real_analysis, ai_result):
     """Generate detailed suggestions combining real analysis with AI insights"""
     suggestions = []
@@ -125,55 +278,8 @@ def generate_detailed_suggestions(real_analysis, ai_result):
     return " | ".join(suggestions) if suggestions else "🎉 EXCELLENT ATS COMPATIBILITY: Your resume shows strong ATS compatibility with a score of {real_analysis['final_score']}%! Continue to refine by adding more quantified achievements and staying current with industry keywords."
 
 def generate_comprehensive_suggestions(real_analysis):
-    """Generate comprehensive suggestions based on real analysis"""
-    suggestions = []
-    
-    # 1. CRITICAL KEYWORD OPTIMIZATION
-    if real_analysis['keyword_score'] < 70:
-        missing_keywords = real_analysis['missing_keywords'][:5]
-        suggestions.append(f"🔑 CRITICAL KEYWORD OPTIMIZATION: Your keyword matching score is {real_analysis['keyword_score']}%, which is below the 70% threshold that most ATS systems require. To increase your chances of passing ATS screening, strategically incorporate these missing keywords: {', '.join(missing_keywords)}. Place them naturally in your experience descriptions, skills section, and summary. For example, if 'Python' is missing, add it to your technical skills and mention specific Python projects in your experience.")
-    
-    # 2. ESSENTIAL SECTIONS MISSING
-    if real_analysis['section_score'] < 80:
-        missing_sections = [section for section, present in real_analysis['sections_analysis'].items() if not present]
-        if missing_sections:
-            suggestions.append(f"📋 ESSENTIAL SECTIONS MISSING: Your resume is missing {', '.join(missing_sections)} section(s), which reduces your ATS compatibility score to {real_analysis['section_score']}%. ATS systems expect standard resume sections. Add a {missing_sections[0]} section with relevant content. For example, if 'projects' is missing, create a 'Projects' section highlighting 2-3 relevant projects with technologies used and results achieved.")
-    
-    # 3. FORMAT OPTIMIZATION NEEDED
-    if real_analysis['format_score'] < 70:
-        suggestions.append(f"📄 FORMAT OPTIMIZATION NEEDED: Your format score is {real_analysis['format_score']}%. To improve ATS compatibility: 1) Add quantified achievements with numbers and percentages (e.g., 'Increased performance by 40%'), 2) Use strong action verbs (Developed, Implemented, Led, Optimized), 3) Ensure proper formatting with clear section headers, 4) Include a professional email address. These elements help ATS systems better parse and rank your resume.")
-    
-    # 4. EXPERIENCE RELEVANCE
-    if real_analysis['experience_score'] < 70:
-        suggestions.append(f"💼 EXPERIENCE RELEVANCE: Your experience relevance score is {real_analysis['experience_score']}%. To improve: 1) Tailor your experience descriptions to match the job requirements, 2) Include industry-specific terminology from the job description, 3) Highlight relevant technologies and methodologies, 4) Quantify your achievements with specific metrics and results.")
-    
-    # 5. DETAILED KEYWORD STRATEGY
-    if real_analysis['keyword_score'] < 80:
-        suggestions.append(f"🎯 ADVANCED KEYWORD STRATEGY: Your keyword score is {real_analysis['keyword_score']}%. To maximize ATS compatibility: 1) Use exact keyword variations from the job description, 2) Include both technical skills (Python, React, SQL) and soft skills (Leadership, Communication), 3) Place keywords in multiple sections (summary, experience, skills), 4) Use industry-standard terminology and acronyms, 5) Include both full terms and abbreviations (e.g., 'Machine Learning' and 'ML')")
-    
-    # 6. QUANTIFIED ACHIEVEMENTS STRATEGY
-    suggestions.append(f"📊 QUANTIFIED ACHIEVEMENTS STRATEGY: To boost your ATS score, add specific metrics throughout your resume: 1) Use numbers and percentages (e.g., 'Increased sales by 25%', 'Managed team of 8 developers'), 2) Include time-based achievements (e.g., 'Reduced processing time by 50% in 6 months'), 3) Add financial impact (e.g., 'Saved company $50K annually'), 4) Mention scale and scope (e.g., 'Led project serving 10,000+ users'), 5) Include specific technologies and tools used")
-    
-    # 7. ATS-FRIENDLY FORMATTING
-    suggestions.append(f"📝 ATS-FRIENDLY FORMATTING: Ensure your resume passes ATS parsing: 1) Use standard section headers (EXPERIENCE, EDUCATION, SKILLS, PROJECTS), 2) Avoid graphics, tables, or complex formatting, 3) Use simple bullet points and clear fonts, 4) Include contact information at the top, 5) Save as .docx or .pdf format, 6) Use consistent date formats (MM/YYYY), 7) Avoid headers and footers")
-    
-    # 8. INDUSTRY-SPECIFIC OPTIMIZATION
-    suggestions.append(f"🏭 INDUSTRY-SPECIFIC OPTIMIZATION: Tailor your resume for your target industry: 1) Research common keywords in your field, 2) Include relevant certifications and licenses, 3) Highlight industry-specific tools and technologies, 4) Use terminology that recruiters in your field expect, 5) Include relevant projects and achievements, 6) Mention industry standards and best practices you follow")
-    
-    # 9. EXPERIENCE SECTION ENHANCEMENT
-    suggestions.append(f"💼 EXPERIENCE SECTION ENHANCEMENT: Make your experience stand out: 1) Start each bullet point with a strong action verb, 2) Focus on achievements rather than duties, 3) Use the STAR method (Situation, Task, Action, Result), 4) Include specific technologies and tools used, 5) Show progression and growth in your roles, 6) Quantify your impact with numbers and metrics")
-    
-    # 10. SKILLS SECTION OPTIMIZATION
-    suggestions.append(f"🛠️ SKILLS SECTION OPTIMIZATION: Optimize your skills section for ATS: 1) Include both technical and soft skills, 2) Use exact keywords from the job description, 3) Organize skills by category (Technical Skills, Soft Skills, Tools), 4) Include proficiency levels when relevant, 5) Add industry-specific certifications, 6) Keep the list current and relevant")
-    
-    # 11. PROJECTS SECTION STRATEGY
-    suggestions.append(f"🚀 PROJECTS SECTION STRATEGY: Showcase your work effectively: 1) Include 2-3 most relevant projects, 2) Describe the problem you solved and your solution, 3) Mention technologies, tools, and methodologies used, 4) Include quantifiable results and impact, 5) Add links to live demos or GitHub repositories, 6) Highlight projects that match the job requirements")
-    
-    # 12. OVERALL STRATEGY
-    if real_analysis['final_score'] < 80:
-        suggestions.append(f"🎯 OVERALL STRATEGY: Your current ATS score is {real_analysis['final_score']}%. To increase your chances of getting past ATS screening: 1) Prioritize adding missing keywords naturally throughout your resume, 2) Ensure all standard sections are present and well-formatted, 3) Include quantified achievements in your experience, 4) Use industry-standard terminology and action verbs, 5) Consider adding a projects section if you have relevant work to showcase, 6) Tailor your resume for each specific job application, 7) Get feedback from industry professionals")
-    
-    return " | ".join(suggestions) if suggestions else f"🎉 EXCELLENT ATS COMPATIBILITY: Your resume shows strong ATS compatibility with a score of {real_analysis['final_score']}%! Continue to refine by adding more quantified achievements and staying current with industry keywords."
+    """Generate comprehensive suggestions based on real analysis (rendered prose, " | "-separated)"""
+    return LEGACY_SEPARATOR.join(render_suggestions(build_suggestions(real_analysis)))
 
 def generate_fallback_suggestions(real_analysis):
     """Generate suggestions based on real analysis when AI fails"""
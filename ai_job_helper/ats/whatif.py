@@ -0,0 +1,217 @@
+"""
+What-if re-scoring for the ATS page.
+
+The resume is split once into parts, one per section span, each holding the
+span text, its taxonomy term counts and its token count (cached by content
+hash, like the resume features they are derived from). An edit only touches
+the parts it names: added or removed keywords change term counts, and a
+replaced section rescans the new section text alone. Each score component is
+then recomputed only if its inputs changed; the others are carried over from
+the cached base analysis of the unedited resume.
+
+Edits are always relative to the saved resume, so the client resends the full
+set of edits on every call and no per-user state is kept on the server.
+"""
+import threading
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from cachetools import LRUCache, TTLCache
+from django.conf import settings
+
+from .idf import bm25_score, get_idf_table
+from .keywords import get_keywords, tokenize, TECHNICAL, SOFT, EXPERIENCE
+from .sections import SECTIONS, SECTION_WEIGHTS, segment_resume, sections_present, split_heading
+from .services import (
+    analyze_job_description, get_resume_features, real_ats_analysis, text_fingerprint,
+    calculate_keyword_score, calculate_section_score, calculate_format_score,
+    calculate_experience_relevance, find_missing_critical_keywords, find_matching_keywords,
+    format_signals, weighted_final_score,
+)
+
+
+class Part(NamedTuple):
+    section: str
+    text: str
+    counts: Dict[str, int]  # canonical term -> hits inside this part
+    token_count: int
+
+
+_parts_cache = LRUCache(maxsize=getattr(settings, 'ATS_WHATIF_CACHE_SIZE', 256))
+# Base analyses of unedited resumes; short-lived, a what-if session lasts minutes
+_base_cache = TTLCache(maxsize=getattr(settings, 'ATS_WHATIF_CACHE_SIZE', 256), ttl=15 * 60)
+_lock = threading.Lock()
+
+
+def _build_parts(text: str, spans: List[Tuple[str, int, int]], postings: Dict[str, List[int]]) -> List[Part]:
+    starts = [start for _, start, _ in spans]
+    counts: List[Counter] = [Counter() for _ in spans]
+    for term, offsets in postings.items():
+        for offset in offsets:
+            counts[bisect_right(starts, offset) - 1][term] += 1
+    return [
+        Part(section, text[start:end], dict(counts[i]), len(tokenize(text[start:end])))
+        for i, (section, start, end) in enumerate(spans)
+    ]
+
+
+def resume_parts(resume_text: str) -> List[Part]:
+    """Per-section parts of a resume, cached next to its features."""
+    features = get_resume_features(resume_text)
+    key = (features['fingerprint'], features['taxonomy'])
+    with _lock:
+        parts = _parts_cache.get(key)
+    if parts is None:
+        parts = _build_parts(resume_text, features['section_spans'], features['postings'])
+        with _lock:
+            _parts_cache[key] = parts
+    return parts
+
+
+def _scan_parts(text: str) -> List[Part]:
+    """Parts of freshly edited section text; only this text is scanned."""
+    return _build_parts(text, segment_resume(text), get_keywords().postings(text))
+
+
+def _base_analysis(resume_text: str, jd_text: str) -> Dict:
+    table = get_idf_table()
+    key = (
+        text_fingerprint(resume_text),
+        analyze_job_description(jd_text)['fingerprint'],
+        get_keywords().signature,
+        table.documents if table is not None else 0,
+    )
+    with _lock:
+        analysis = _base_cache.get(key)
+    if analysis is None:
+        analysis = real_ats_analysis(resume_text, jd_text)
+        with _lock:
+            _base_cache[key] = analysis
+    return analysis
+
+
+def _canonical_terms(phrases: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Map user phrases to taxonomy terms; returns (terms, unrecognized phrases)."""
+    keywords = get_keywords()
+    terms, unrecognized = [], []
+    for phrase in phrases:
+        found = [hit.term for hit in sorted(keywords.scan(phrase))]
+        if found:
+            terms.extend(t for t in found if t not in terms)
+        else:
+            unrecognized.append(phrase)
+    return terms, unrecognized
+
+
+def _replace_section(parts: List[Part], section: str, body: str) -> List[Part]:
+    """Swap the body of `section` (all of its spans) for `body`; an empty body drops the section."""
+    matching = [i for i, part in enumerate(parts) if part.section == section]
+    if matching:
+        heading, _ = split_heading(section, parts[matching[0]].text)
+    else:
+        heading = '' if section == 'header' else f"{section.title()}\n"
+    body = body.strip('\n')
+    new_parts = _scan_parts(f"{heading}{body}\n") if body.strip() else []
+
+    kept = [part for i, part in enumerate(parts) if i not in matching]
+    if matching:
+        insert_at = matching[0]
+    else:
+        insert_at = 0 if section == 'header' else len(kept)
+    if insert_at and not kept[insert_at - 1].text.endswith('\n'):
+        previous = kept[insert_at - 1]
+        kept[insert_at - 1] = previous._replace(text=previous.text + '\n')
+    return kept[:insert_at] + new_parts + kept[insert_at:]
+
+
+def what_if_analysis(resume_text: str, jd_text: str,
+                     add_keywords: Iterable[str] = (), remove_keywords: Iterable[str] = (),
+                     sections: Optional[Dict[str, str]] = None,
+                     keyword_section: str = 'skills') -> Dict:
+    """
+    real_ats_analysis of resume_text with edits applied, without rescanning the resume.
+
+    add_keywords count as one hit each in `keyword_section`; remove_keywords drop
+    every hit of those terms; sections maps a section name to its new body text.
+    The result has the shape of real_ats_analysis plus 'recomputed' (components
+    that changed inputs) and 'unrecognized_keywords'.
+    """
+    sections = sections or {}
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown section: {', '.join(sorted(unknown))}")
+    if keyword_section not in SECTION_WEIGHTS:
+        raise ValueError(f"Unknown section: {keyword_section}")
+
+    base = _base_analysis(resume_text, jd_text)
+    added, unrecognized = _canonical_terms(add_keywords)
+    removed, unrecognized_removed = _canonical_terms(remove_keywords)
+    unrecognized += unrecognized_removed
+    added = [t for t in added if t not in removed]
+
+    parts = resume_parts(resume_text)
+    for section, body in sections.items():
+        parts = _replace_section(parts, section, body or '')
+
+    # Aggregate term statistics over the edited parts
+    term_lengths = {t: len(tokenize(t)) for t in added + removed}
+    counts: Counter = Counter()
+    weights: Dict[str, float] = {}
+    unstructured = all(part.section == 'header' for part in parts)
+    for part in parts:
+        counts.update(part.counts)
+        weight = 1.0 if unstructured else SECTION_WEIGHTS.get(part.section, 0.7)
+        for term in part.counts:
+            weights[term] = max(weights.get(term, 0.0), weight)
+    token_count = sum(part.token_count for part in parts)
+    for term in removed:
+        token_count -= counts.pop(term, 0) * term_lengths[term]
+        weights.pop(term, None)
+    added_weight = 1.0 if unstructured else SECTION_WEIGHTS[keyword_section]
+    for term in added:
+        counts[term] += 1
+        weights[term] = max(weights.get(term, 0.0), added_weight)
+        token_count += term_lengths[term]
+
+    analysis = dict(base)
+    recomputed = []
+    jd_analysis = analyze_job_description(jd_text)
+    jd_keywords = jd_analysis['keywords']
+    technical_keywords, soft_skills = jd_keywords[TECHNICAL], jd_keywords[SOFT]
+
+    if added or removed or sections:
+        terms = set(counts)
+        analysis.update({
+            'keyword_score': calculate_keyword_score(weights, technical_keywords, soft_skills),
+            'experience_score': calculate_experience_relevance(terms, jd_keywords[EXPERIENCE]),
+            'relevance_score': bm25_score(technical_keywords + soft_skills, counts, token_count),
+            'missing_keywords': find_missing_critical_keywords(terms, technical_keywords, soft_skills),
+            'technical_keywords_found': find_matching_keywords(terms, technical_keywords),
+            'soft_skills_found': find_matching_keywords(terms, soft_skills),
+        })
+        recomputed += ['keyword_score', 'experience_score', 'relevance_score']
+
+    if sections:
+        text = ''.join(part.text for part in parts)
+        spans, offset = [], 0
+        for part in parts:
+            spans.append((part.section, offset, offset + len(part.text)))
+            offset += len(part.text)
+        flags = sections_present(text, spans)
+        analysis.update({
+            'sections_analysis': flags,
+            'section_score': calculate_section_score(flags),
+            'format_score': calculate_format_score(format_signals(text)),
+        })
+        recomputed += ['section_score', 'format_score']
+
+    if recomputed:
+        analysis['final_score'] = int(round(weighted_final_score(
+            analysis['keyword_score'], analysis['section_score'], analysis['format_score'],
+            analysis['experience_score'], analysis['relevance_score'],
+        )))
+        recomputed.append('final_score')
+    analysis['recomputed'] = recomputed
+    analysis['unrecognized_keywords'] = unrecognized
+    return analysis
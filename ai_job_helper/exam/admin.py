@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ExamResult, Exam, Question, Answer
+from .models import ExamResult, Exam, Question, Answer, QuestionBank, ReadyExam
 
 @admin.register(ExamResult)
 class ExamResultAdmin(admin.ModelAdmin):
@@ -28,3 +28,15 @@ class AnswerAdmin(admin.ModelAdmin):
     list_display = ("question", "user", "selected_option", "is_correct")
     list_filter = ("is_correct",)
     search_fields = ("user__username",)
+
+@admin.register(QuestionBank)
+class QuestionBankAdmin(admin.ModelAdmin):
+    list_display = ("job_role", "topic", "difficulty", "text", "created_at")
+    list_filter = ("difficulty", "role_key")
+    search_fields = ("text", "job_role", "topic")
+
+@admin.register(ReadyExam)
+class ReadyExamAdmin(admin.ModelAdmin):
+    list_display = ("job_role", "created_at", "claimed_by", "claimed_at")
+    list_filter = ("role_key",)
+    exclude = ("questions",)
@@ -0,0 +1,189 @@
+"""
+Question bank: generated questions kept across exams and users.
+
+Every question produced by the LLM (server side or the client-side import)
+is stored once, keyed by a SHA-1 of its normalized text. exam_loading draws
+an exam for a role from the bank first, skipping questions the user has
+already seen, and asks the LLM only for the shortfall.
+"""
+import hashlib
+import random
+import re
+from collections import defaultdict
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.db import IntegrityError
+
+from .models import QuestionBank
+
+_LEADING_LABEL = re.compile(r'^\s*(?:q(?:uestion)?\s*)?\d+\s*[.):-]\s*', re.IGNORECASE)
+_NON_WORD = re.compile(r'[^\w]+')
+
+# Unseen candidates read per draw; sampling happens in Python over this window
+_CANDIDATE_LIMIT = 600
+
+
+def normalize_question(text: str) -> str:
+    """Lowercased words only, without numbering, punctuation or extra spaces."""
+    text = _LEADING_LABEL.sub('', text or '')
+    return ' '.join(_NON_WORD.sub(' ', text.lower()).split())
+
+
+def question_hash(text: str) -> str:
+    return hashlib.sha1(normalize_question(text).encode('utf-8')).hexdigest()
+
+
+def normalize_role(job_role: str) -> str:
+    return ' '.join((job_role or '').lower().split())
+
+
+def add_to_bank(job_role: str, questions: Iterable[Dict], difficulty: str = 'medium') -> int:
+    """
+    Store questions in the AIService shape ({question, options, correct_answer,
+    explanation, topic}); ones already banked are skipped. Returns how many were added.
+    """
+    rows: Dict[str, QuestionBank] = {}
+    for q in questions:
+        text = str(q.get('question') or '').strip()
+        options = [str(o or '') for o in (q.get('options') or [])][:4]
+        if not text or len(options) < 4:
+            continue
+        key = question_hash(text)
+        if key in rows:
+            continue
+        correct = str(q.get('correct_answer') or 'A').strip()[:1].upper()
+        rows[key] = QuestionBank(
+            text_hash=key,
+            role_key=normalize_role(job_role),
+            job_role=job_role,
+            difficulty=difficulty,
+            text=text,
+            option_a=options[0][:255],
+            option_b=options[1][:255],
+            option_c=options[2][:255],
+            option_d=options[3][:255],
+            correct_option=correct if correct in ('A', 'B', 'C', 'D') else 'A',
+            explanation=q.get('explanation') or '',
+            topic=(q.get('topic') or None),
+        )
+    if not rows:
+        return 0
+
+    existing = set(QuestionBank.objects.filter(text_hash__in=list(rows)).values_list('text_hash', flat=True))
+    new_rows = [row for key, row in rows.items() if key not in existing]
+    try:
+        QuestionBank.objects.bulk_create(new_rows)
+        return len(new_rows)
+    except IntegrityError:
+        # A concurrent exam banked some of the same questions; keep the rest
+        added = 0
+        for row in new_rows:
+            try:
+                row.save(force_insert=True)
+                added += 1
+            except IntegrityError:
+                pass
+        return added
+
+
+def draw_from_bank(job_role: str, count: int, exclude_hashes: Set[str] = frozenset(),
+                   difficulty: str = 'medium') -> List[QuestionBank]:
+    """
+    Up to `count` random banked questions for the role, none of `exclude_hashes`,
+    spread across topics round-robin so one topic does not dominate the exam.
+    """
+    rows = QuestionBank.objects.filter(role_key=normalize_role(job_role), difficulty=difficulty)
+    if exclude_hashes:
+        rows = rows.exclude(text_hash__in=list(exclude_hashes))
+    # A window at a random offset, so large banks are sampled beyond their oldest rows
+    total = rows.count()
+    offset = random.randint(0, total - _CANDIDATE_LIMIT) if total > _CANDIDATE_LIMIT else 0
+    candidates = list(rows.values_list('_id', 'topic')[offset:offset + _CANDIDATE_LIMIT])
+    if not candidates:
+        return []
+
+    by_topic = defaultdict(list)
+    for pk, topic in candidates:
+        by_topic[(topic or '').strip().lower()].append(pk)
+    pools = list(by_topic.values())
+    for pool in pools:
+        random.shuffle(pool)
+    random.shuffle(pools)
+    picked = []
+    while pools and len(picked) < count:
+        for pool in list(pools):
+            picked.append(pool.pop())
+            if not pool:
+                pools.remove(pool)
+            if len(picked) >= count:
+                break
+
+    rows = {row._id: row for row in QuestionBank.objects.filter(_id__in=picked)}
+    return [rows[pk] for pk in picked if pk in rows]
+
+
+def as_question(row: QuestionBank) -> Dict:
+    """A banked row in the AIService question shape."""
+    return {
+        'question': row.text,
+        'options': [row.option_a, row.option_b, row.option_c, row.option_d],
+        'correct_answer': row.correct_option,
+        'explanation': row.explanation or '',
+        'topic': row.topic,
+    }
+
+
+def assemble_questions(job_role: str, count: int = 30, seen_questions: Optional[List[str]] = None,
+                       difficulty: str = 'medium', sharded: Optional[bool] = None,
+                       scope: str = 'exam') -> List[Dict]:
+    """
+    Up to `count` questions for the role in the AIService shape: banked ones
+    first, then the LLM for the shortfall, whose output is banked too. The
+    shortfall is one request, or concurrent per-topic shards when `sharded`
+    (default: EXAM_GENERATION_MODE == 'sharded'). Concurrent callers for the
+    same role and `scope` share a single generation (see exam.coalesce).
+    Questions in `seen_questions` are never included.
+    """
+    from ai_agents.ai_service import AIService
+    from .coalesce import flight_key, share, single_flight
+
+    seen_questions = seen_questions or []
+    seen_hashes = {question_hash(text) for text in seen_questions}
+    questions = [as_question(row) for row in draw_from_bank(job_role, count, seen_hashes, difficulty)]
+    if len(questions) >= count:
+        return questions
+
+    if sharded is None:
+        sharded = getattr(settings, 'EXAM_GENERATION_MODE', 'stream') == 'sharded'
+    generate = (AIService().generate_exam_questions_sharded if sharded
+                else partial(AIService().generate_exam_questions_for_user, user_context={}))
+
+    def generate_shortfall() -> List[Dict]:
+        data = generate(
+            avoidance_list=seen_questions[:50] + [q['question'] for q in questions],
+            job_role=job_role,
+            num_questions=count - len(questions),
+            difficulty=difficulty,
+        )
+        generated = data.get('questions', [])
+        shortfall = count - len(questions) - len(generated)
+        if shortfall > 0 and not data.get('complete', True) and not data.get('degraded'):
+            # The response was cut off: ask once more, for the missing questions only
+            more = generate(
+                avoidance_list=seen_questions[:50] + [q['question'] for q in questions + generated],
+                job_role=job_role,
+                num_questions=shortfall,
+                difficulty=difficulty,
+            )
+            generated += more.get('questions', [])
+        try:
+            add_to_bank(job_role, generated, difficulty)
+        except Exception as e:
+            print('Question bank error:', e)
+        return generated
+
+    generated = single_flight(flight_key(job_role, difficulty, scope), generate_shortfall)
+    served = {question_hash(q['question']) for q in questions}
+    return questions + share(generated, served | seen_hashes, count - len(questions))
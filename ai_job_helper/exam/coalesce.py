@@ -0,0 +1,234 @@
+"""
+Single-flight coalescing of LLM question generation.
+
+When many users ask for the same role at once (a cohort session), only one
+request per (normalized role, difficulty) calls Gemini. It is the leader; the
+others follow and receive the leader's validated questions, each as its own
+shuffled subset without the questions that user has already seen.
+
+Within a process, followers wait on the leader's Future. Across workers the
+leader holds a GenerationLease document: taking it is a conditional update
+(or the insert of a unique key), so exactly one worker wins. Followers in
+other workers poll the document until the leader publishes or the lease
+expires. A crashed leader therefore blocks nobody for longer than LEASE_TTL.
+
+A streaming leader also publishes each question as it is saved (publish),
+which extends the lease. follow_flight() hands those to a follower as they
+arrive, so followers start their exam on the first questions instead of
+waiting for the whole generation, and stop following a leader that goes
+quiet. Keys carry a scope, so background pool refills never hold up an
+interactive request for the same role.
+"""
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .bank import normalize_role, question_hash
+from .models import GenerationLease
+
+LEASE_TTL = getattr(settings, 'EXAM_GENERATION_LEASE_TTL', 90)
+FOLLOW_TIMEOUT = getattr(settings, 'EXAM_GENERATION_FOLLOW_TIMEOUT', 60)
+_POLL_SECONDS = 0.5
+
+_inflight: Dict[str, 'Flight'] = {}
+_inflight_lock = threading.Lock()
+
+
+class Flight(NamedTuple):
+    key: str
+    owner: str
+    future: Future
+    published: List[Dict]           # questions saved so far, for followers in this process
+    progress: threading.Condition   # notified on every publish and on finish
+
+
+def flight_key(job_role: str, difficulty: str = 'medium', scope: str = 'exam') -> str:
+    key = f"{normalize_role(job_role)}|{difficulty}"
+    return key if scope == 'exam' else f"{key}|{scope}"
+
+
+def _acquire_lease(key: str, owner: str) -> bool:
+    now = timezone.now()
+    fields = dict(owner=owner, started_at=now, expires_at=now + timedelta(seconds=LEASE_TTL),
+                  completed_at=None, questions=[])
+    # Take over a released or expired lease; only one conditional update can match
+    if GenerationLease.objects.filter(key=key, expires_at__lte=now).update(**fields):
+        return True
+    try:
+        GenerationLease.objects.create(key=key, **fields)
+        return True
+    except IntegrityError:
+        return False
+
+
+def lead_or_follow(key: str) -> Optional[Flight]:
+    """A Flight if the caller should generate for `key`, None if a generation is already in flight."""
+    with _inflight_lock:
+        if key in _inflight:
+            return None
+        owner = uuid.uuid4().hex
+        try:
+            leader = _acquire_lease(key, owner)
+        except Exception as e:
+            # Without the lease collection, coalesce within this process only
+            print('Generation lease error:', e)
+            leader = True
+        if not leader:
+            return None
+        flight = Flight(key, owner, Future(), [], threading.Condition())
+        _inflight[key] = flight
+        return flight
+
+
+def publish(flight: Flight, question: Dict) -> None:
+    """Hand one saved question to the followers; also keeps the lease alive."""
+    with flight.progress:
+        flight.published.append(question)
+        questions = list(flight.published)
+        flight.progress.notify_all()
+    try:
+        now = timezone.now()
+        GenerationLease.objects.filter(key=flight.key, owner=flight.owner).update(
+            questions=questions, expires_at=now + timedelta(seconds=LEASE_TTL))
+    except Exception as e:
+        print('Generation lease error:', e)
+
+
+def renew(flight: Flight) -> None:
+    """Extend the lease of a long-running leader that has nothing to publish yet."""
+    try:
+        GenerationLease.objects.filter(key=flight.key, owner=flight.owner).update(
+            expires_at=timezone.now() + timedelta(seconds=LEASE_TTL))
+    except Exception as e:
+        print('Generation lease error:', e)
+
+
+def finish(flight: Flight, questions: Optional[List[Dict]]) -> None:
+    """Publish the leader's questions (None or [] on failure) and release the lease."""
+    questions = list(questions or [])
+    with _inflight_lock:
+        _inflight.pop(flight.key, None)
+    with flight.progress:
+        flight.future.set_result(questions)
+        flight.progress.notify_all()
+    try:
+        now = timezone.now()
+        GenerationLease.objects.filter(key=flight.key, owner=flight.owner).update(
+            completed_at=now, expires_at=now, questions=questions)
+    except Exception as e:
+        print('Generation lease error:', e)
+
+
+def wait_for_flight(key: str, timeout: float = FOLLOW_TIMEOUT) -> Optional[List[Dict]]:
+    """The questions of the generation in flight for `key`; None if it failed, expired or timed out."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+    if flight is not None:
+        try:
+            return flight.future.result(timeout) or None
+        except FutureTimeout:
+            return None
+
+    deadline = time.monotonic() + timeout
+    lease = GenerationLease.objects.filter(key=key).values('owner', 'completed_at').first()
+    if lease is None or lease['completed_at'] is not None:
+        return None
+    owner = lease['owner']
+    while time.monotonic() < deadline:
+        time.sleep(_POLL_SECONDS)
+        lease = GenerationLease.objects.filter(key=key).values(
+            'owner', 'completed_at', 'expires_at', 'questions').first()
+        if lease is None or lease['owner'] != owner:
+            return None
+        if lease['completed_at'] is not None:
+            return lease['questions'] or None
+        if lease['expires_at'] <= timezone.now():
+            return None
+    return None
+
+
+def follow_flight(key: str, first_timeout: float, idle_timeout: float = FOLLOW_TIMEOUT) -> Iterator[Dict]:
+    """
+    The questions of the generation in flight for `key`, each as soon as the
+    leader publishes it. Ends when the leader finishes, fails or loses its
+    lease, or publishes nothing for `first_timeout` seconds (before the first
+    question) or `idle_timeout` seconds (after it): the follower then
+    generates the rest itself.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+    if flight is not None:
+        sent = 0
+        deadline = time.monotonic() + first_timeout
+        while True:
+            with flight.progress:
+                while len(flight.published) == sent and not flight.future.done():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    flight.progress.wait(remaining)
+                batch = flight.published[sent:]
+                done = flight.future.done()
+            sent += len(batch)
+            yield from batch
+            if done:
+                return
+            deadline = time.monotonic() + idle_timeout
+
+    lease = GenerationLease.objects.filter(key=key).values('owner', 'completed_at').first()
+    if lease is None or lease['completed_at'] is not None:
+        return
+    owner, sent = lease['owner'], 0
+    deadline = time.monotonic() + first_timeout
+    while time.monotonic() < deadline:
+        time.sleep(_POLL_SECONDS)
+        lease = GenerationLease.objects.filter(key=key).values(
+            'owner', 'completed_at', 'expires_at', 'questions').first()
+        if lease is None or lease['owner'] != owner:
+            return
+        questions = lease['questions'] or []
+        if len(questions) > sent:
+            yield from questions[sent:]
+            sent = len(questions)
+            deadline = time.monotonic() + idle_timeout
+        if lease['completed_at'] is not None or lease['expires_at'] <= timezone.now():
+            return
+
+
+def single_flight(key: str, generate: Callable[[], List[Dict]], timeout: float = FOLLOW_TIMEOUT) -> List[Dict]:
+    """
+    generate() once across concurrent callers of `key`. Followers whose leader
+    fails or times out generate for themselves rather than return nothing.
+    """
+    flight = lead_or_follow(key)
+    if flight is None:
+        questions = wait_for_flight(key, timeout)
+        if questions:
+            return questions
+        return generate()
+    questions = None
+    try:
+        questions = generate()
+        return questions
+    finally:
+        finish(flight, questions)
+
+
+def share(questions: Iterable[Dict], exclude_hashes: Set[str], count: int) -> List[Dict]:
+    """A random subset of `questions` in random order, without excluded or duplicate questions."""
+    fresh, keys = [], set(exclude_hashes)
+    for q in questions:
+        key = question_hash(q.get('question', ''))
+        if key not in keys:
+            keys.add(key)
+            fresh.append(q)
+    random.shuffle(fresh)
+    return fresh[:count]
@@ -0,0 +1,71 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from ai_agents.ai_service import AIService, get_gemini
+from ai_agents.router import get_router
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure exam generation throughput and tail latency with concurrent AIService calls. "
+        "Point it at the local stand-in (GEMINI_BASE_URL, see ai_agents.fake_gemini) to run offline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', default='Software Engineer', help='Job role to generate for')
+        parser.add_argument('--requests', type=int, default=50, help='Total generations')
+        parser.add_argument('--concurrency', type=int, default=10, help='Generations in flight at once')
+        parser.add_argument('--questions', type=int, default=30, help='Questions per exam')
+        parser.add_argument('--mode', choices=['single', 'stream', 'sharded'], default='single',
+                            help='AIService path to exercise')
+        parser.add_argument('--cached', action='store_true',
+                            help='Allow response-cache hits (by default every call goes to the endpoint)')
+
+    def _run_one(self, options):
+        service = AIService()
+        kwargs = dict(avoidance_list=[], job_role=options['role'], num_questions=options['questions'],
+                      fresh=not options['cached'])
+        start = time.monotonic()
+        first = None
+        if options['mode'] == 'stream':
+            count = 0
+            for _ in service.stream_exam_questions(**kwargs):
+                if first is None:
+                    first = time.monotonic() - start
+                count += 1
+        elif options['mode'] == 'sharded':
+            count = len(service.generate_exam_questions_sharded(**kwargs)["questions"])
+        else:
+            count = len(service.generate_exam_questions_for_user(user_context={}, **kwargs)["questions"])
+        return time.monotonic() - start, first, count
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(lambda _: self._run_one(options), range(options['requests'])))
+        elapsed = time.monotonic() - started
+
+        latencies = [latency for latency, _, _ in results]
+        firsts = [first for _, first, _ in results if first is not None]
+        short = sum(1 for _, _, count in results if count < options['questions'])
+        self.stdout.write(f"{len(results)} generations ({options['mode']}) in {elapsed:.2f}s: "
+                          f"{len(results) / elapsed:.2f}/s at concurrency {options['concurrency']}")
+        self.stdout.write(f"latency  p50 {_percentile(latencies, 50):.3f}s  p95 {_percentile(latencies, 95):.3f}s  "
+                          f"p99 {_percentile(latencies, 99):.3f}s  max {max(latencies):.3f}s")
+        if firsts:
+            self.stdout.write(f"first question  p50 {_percentile(firsts, 50):.3f}s  "
+                              f"p95 {_percentile(firsts, 95):.3f}s  mean {statistics.mean(firsts):.3f}s")
+        for model, stats in get_router(get_gemini().model_name).snapshot()['models'].items():
+            self.stdout.write(f"{model}: {stats}")
+        style = self.style.WARNING if short else self.style.SUCCESS
+        self.stdout.write(style(f"{short} exam(s) with fewer than {options['questions']} questions"))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exam.pool import DEMAND_DAYS, POOL_ROLES, POOL_TARGET, refill_popular, refill_role
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep a pool of ready-made exams for the most requested job roles, so exam_loading "
+        "can start them without waiting on the LLM. Run from cron, or with --loop as a worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', action='append', metavar='JOB_ROLE',
+                            help='Refill this role instead of the popular ones (repeatable)')
+        parser.add_argument('--target', type=int, default=POOL_TARGET, help='Ready exams to keep per role')
+        parser.add_argument('--roles', type=int, default=POOL_ROLES, help='How many popular roles to serve')
+        parser.add_argument('--days', type=int, default=DEMAND_DAYS, help='Demand window in days')
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS',
+                            help='Keep running, refilling every SECONDS')
+
+    def handle(self, *args, **options):
+        while True:
+            if options['role']:
+                built = {role: refill_role(role, options['target']) for role in options['role']}
+            else:
+                built = refill_popular(options['target'], options['roles'], options['days'])
+            for role, count in built.items():
+                self.stdout.write(f"{role}: {count} ready exam(s) built")
+            self.stdout.write(self.style.SUCCESS(f"Pool refilled for {len(built)} role(s)."))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
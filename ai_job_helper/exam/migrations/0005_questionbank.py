@@ -0,0 +1,38 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:49
+
+import bson.objectid
+from django.db import migrations, models
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0004_question_topic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBank',
+            fields=[
+                ('_id', djongo.models.fields.ObjectIdField(auto_created=True, default=bson.objectid.ObjectId, primary_key=True, serialize=False)),
+                ('text_hash', models.CharField(max_length=40, unique=True)),
+                ('role_key', models.CharField(max_length=255)),
+                ('job_role', models.CharField(max_length=255)),
+                ('difficulty', models.CharField(default='medium', max_length=16)),
+                ('text', models.TextField()),
+                ('option_a', models.CharField(max_length=255)),
+                ('option_b', models.CharField(max_length=255)),
+                ('option_c', models.CharField(max_length=255)),
+                ('option_d', models.CharField(max_length=255)),
+                ('correct_option', models.CharField(default='A', max_length=1)),
+                ('explanation', models.TextField(blank=True, null=True)),
+                ('topic', models.CharField(blank=True, max_length=128, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='questionbank',
+            index=models.Index(fields=['role_key', 'difficulty', 'topic'], name='question_bank_role_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:51
+
+import bson.objectid
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exam', '0005_questionbank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadyExam',
+            fields=[
+                ('_id', djongo.models.fields.ObjectIdField(auto_created=True, default=bson.objectid.ObjectId, primary_key=True, serialize=False)),
+                ('role_key', models.CharField(max_length=255)),
+                ('job_role', models.CharField(max_length=255)),
+                ('questions', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('claimed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='readyexam',
+            index=models.Index(fields=['role_key', 'claimed_at', 'created_at'], name='ready_exam_pool_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0006_readyexam'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='generating',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='target_questions',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.1.12 on 2026-10-17 17:57
+
+import bson.objectid
+from django.db import migrations, models
+import djongo.models.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0007_exam_generating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationLease',
+            fields=[
+                ('_id', djongo.models.fields.ObjectIdField(auto_created=True, default=bson.objectid.ObjectId, primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=300, unique=True)),
+                ('owner', models.CharField(max_length=32)),
+                ('started_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('questions', models.JSONField(default=list)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.12 on 2026-10-17 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0008_generationlease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='generation_heartbeat',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -22,6 +22,11 @@ class Exam(models.Model):
     job_role = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     score = models.IntegerField(default=0)
+    # While questions are still streaming in: how many the exam will have
+    generating = models.BooleanField(default=False)
+    target_questions = models.IntegerField(default=0)
+    # Touched by the streaming worker on every saved question; a stale one means the worker died
+    generation_heartbeat = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.job_role} - {self.created_at}"
@@ -69,4 +74,75 @@ class Answer(models.Model):
         # Auto-calculate if answer is correct
         if self.selected_option:
             self.is_correct = (self.selected_option == self.question.correct_option)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class QuestionBank(models.Model):
+    """
+    Global pool of generated questions, shared by every user's exams.
+
+    Rows are keyed by a hash of the normalized question text, so the same
+    question generated twice (for any user) is stored once; exams for a role
+    are assembled from here first and the LLM only tops up what is missing.
+    """
+    _id = djongo_models.ObjectIdField(primary_key=True, default=ObjectId)
+    text_hash = models.CharField(max_length=40, unique=True)
+    role_key = models.CharField(max_length=255)  # normalized job role
+    job_role = models.CharField(max_length=255)
+    difficulty = models.CharField(max_length=16, default='medium')
+    text = models.TextField()
+    option_a = models.CharField(max_length=255)
+    option_b = models.CharField(max_length=255)
+    option_c = models.CharField(max_length=255)
+    option_d = models.CharField(max_length=255)
+    correct_option = models.CharField(max_length=1, default='A')
+    explanation = models.TextField(blank=True, null=True)
+    topic = models.CharField(max_length=128, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['role_key', 'difficulty', 'topic'], name='question_bank_role_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_role}: {self.text[:60]}"
+
+
+class ReadyExam(models.Model):
+    """
+    A pre-generated, validated exam waiting in the pool for its role (see exam.pool).
+    claimed_at is set when a user takes it; unclaimed rows are the pool.
+    """
+    _id = djongo_models.ObjectIdField(primary_key=True, default=ObjectId)
+    role_key = models.CharField(max_length=255)  # normalized job role
+    job_role = models.CharField(max_length=255)
+    questions = models.JSONField(default=list)   # AIService question dicts
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['role_key', 'claimed_at', 'created_at'], name='ready_exam_pool_idx'),
+        ]
+
+    def __str__(self):
+        return f"Ready {self.job_role} exam ({'claimed' if self.claimed_at else 'available'})"
+
+
+class GenerationLease(models.Model):
+    """
+    Single-flight lease for LLM question generation, one per role and difficulty
+    (see exam.coalesce). The owner generates; concurrent requests in any worker
+    wait for it and share the questions it publishes here.
+    """
+    _id = djongo_models.ObjectIdField(primary_key=True, default=ObjectId)
+    key = models.CharField(max_length=300, unique=True)  # normalized role|difficulty
+    owner = models.CharField(max_length=32)
+    started_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    completed_at = models.DateTimeField(blank=True, null=True)
+    questions = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"{self.key} ({'done' if self.completed_at else 'in flight'})"
@@ -0,0 +1,166 @@
+"""
+Pool of ready-made exams for the most requested job roles.
+
+A refill (the refill_exam_pool command, or a background thread started by
+exam_loading) keeps `EXAM_POOL_TARGET` validated, unassigned exams per
+popular role. exam_loading claims one with a conditional update, which is
+atomic per document, so two users never get the same ready exam, and the
+Gemini call leaves the request path for those roles. A refill holds the
+role's generation lease (exam.coalesce), so workers never refill the same
+role at once.
+
+Demand is read from Exam.job_role over the last `EXAM_POOL_DEMAND_DAYS` days.
+"""
+import threading
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .bank import assemble_questions, normalize_role, question_hash
+from .coalesce import finish, lead_or_follow, renew
+from .models import Exam, ReadyExam
+
+EXAM_SIZE = 30
+POOL_TARGET = getattr(settings, 'EXAM_POOL_TARGET', 3)
+POOL_ROLES = getattr(settings, 'EXAM_POOL_ROLES', 10)
+DEMAND_DAYS = getattr(settings, 'EXAM_POOL_DEMAND_DAYS', 30)
+
+# Ready exams looked at per claim before falling back to on-demand generation
+_CLAIM_CANDIDATES = 5
+
+_popular_cache = TTLCache(maxsize=1, ttl=10 * 60)
+_popular_lock = threading.Lock()
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def is_valid_question(q: Dict) -> bool:
+    """Complete enough to serve without review: real text, four distinct options, a known answer."""
+    text = str(q.get('question') or '').strip()
+    options = [str(o or '').strip() for o in (q.get('options') or [])]
+    return (
+        len(text) >= 10
+        and len(options) == 4
+        and all(options)
+        and len({o.lower() for o in options}) == 4
+        and str(q.get('correct_answer') or '')[:1].upper() in ('A', 'B', 'C', 'D')
+    )
+
+
+def popular_roles(limit: int = POOL_ROLES, days: int = DEMAND_DAYS) -> List[Tuple[str, int]]:
+    """(job_role, exams taken) of the most requested roles, busiest first."""
+    since = timezone.now() - timedelta(days=days)
+    counts, names = Counter(), {}
+    for job_role in Exam.objects.filter(created_at__gte=since).values_list('job_role', flat=True):
+        key = normalize_role(job_role)
+        if key:
+            counts[key] += 1
+            names.setdefault(key, job_role.strip())
+    return [(names[key], n) for key, n in counts.most_common(limit)]
+
+
+def _popular_keys() -> set:
+    with _popular_lock:
+        keys = _popular_cache.get('keys')
+    if keys is None:
+        keys = {normalize_role(role) for role, _ in popular_roles()}
+        with _popular_lock:
+            _popular_cache['keys'] = keys
+    return keys
+
+
+def claim_ready_exam(user, job_role: str, seen_questions: Optional[List[str]] = None) -> Optional[List[Dict]]:
+    """
+    Questions of a ready exam for the role, now assigned to `user`, or None.
+    Ready exams that repeat a question the user has already seen are left for others.
+    """
+    seen_hashes = {question_hash(text) for text in seen_questions or []}
+    candidates = (ReadyExam.objects
+                  .filter(role_key=normalize_role(job_role), claimed_at__isnull=True)
+                  .order_by('created_at')[:_CLAIM_CANDIDATES])
+    for ready in candidates:
+        if any(question_hash(q['question']) in seen_hashes for q in ready.questions):
+            continue
+        # Only one conditional update can match: the first claimer wins
+        won = ReadyExam.objects.filter(_id=ready._id, claimed_at__isnull=True).update(
+            claimed_by=user, claimed_at=timezone.now())
+        if won:
+            return ready.questions
+    return None
+
+
+def build_ready_exam(job_role: str) -> Optional[ReadyExam]:
+    """Assemble and store one validated exam for the role; None if too few valid questions."""
+    questions = [q for q in assemble_questions(job_role, EXAM_SIZE, scope='refill') if is_valid_question(q)]
+    if len(questions) < EXAM_SIZE:
+        return None
+    return ReadyExam.objects.create(
+        role_key=normalize_role(job_role),
+        job_role=job_role,
+        questions=questions,
+    )
+
+
+def refill_role(job_role: str, target: int = POOL_TARGET) -> int:
+    """
+    Top the role's pool up to `target` ready exams. Returns how many were built;
+    0 when another worker is refilling the role already.
+    """
+    key = normalize_role(job_role)
+    # One refill per role across workers: the generation lease of exam.coalesce
+    flight = lead_or_follow(f"pool|{key}")
+    if flight is None:
+        return 0
+    built = 0
+    try:
+        # Counted again before every build: exams claimed meanwhile are replaced too,
+        # and a refill that outlived its lease never overshoots the target
+        while ReadyExam.objects.filter(role_key=key, claimed_at__isnull=True).count() < target:
+            if build_ready_exam(job_role) is None:
+                break
+            built += 1
+            renew(flight)
+    finally:
+        finish(flight, [])
+    return built
+
+
+def refill_popular(target: int = POOL_TARGET, limit: int = POOL_ROLES, days: int = DEMAND_DAYS) -> Dict[str, int]:
+    """Refill the pool of every popular role. Returns ready exams built per role."""
+    return {role: refill_role(role, target) for role, _ in popular_roles(limit, days)}
+
+
+def _refill_in_background(job_role: str, key: str) -> None:
+    try:
+        refill_role(job_role)
+    except Exception as e:
+        print('Exam pool refill error:', e)
+    finally:
+        with _refilling_lock:
+            _refilling.discard(key)
+        connections.close_all()
+
+
+def refill_async(job_role: str, force: bool = False) -> bool:
+    """
+    Refill the role's pool in a daemon thread, if the role is popular (or `force`)
+    and no refill for it is already running in this process (refill_role
+    also skips roles being refilled by another worker).
+    """
+    key = normalize_role(job_role)
+    if not getattr(settings, 'EXAM_POOL_ASYNC_REFILL', True) or not key:
+        return False
+    if not force and key not in _popular_keys():
+        return False
+    with _refilling_lock:
+        if key in _refilling:
+            return False
+        _refilling.add(key)
+    threading.Thread(target=_refill_in_background, args=(job_role, key),
+                     name=f"exam-pool-refill:{key}", daemon=True).start()
+    return True
@@ -0,0 +1,183 @@
+"""
+Streaming exam generation.
+
+When neither the ready-exam pool nor the bank can supply a full exam, the
+exam is created right away with the banked questions and a background thread
+streams the rest from Gemini, saving each question as soon as its JSON object
+is complete. exam_loading redirects once the first few are saved; exam_test
+waits briefly for a question that has not arrived yet.
+
+The worker touches Exam.generation_heartbeat on every saved question. If it
+dies (crash, restart, killed thread) the flag would never clear, so readers
+treat a heartbeat older than GENERATION_STALE seconds as a dead worker and
+finish the exam with the questions already saved.
+"""
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .bank import add_to_bank, question_hash
+from .coalesce import Flight, finish, follow_flight, publish
+from .models import Exam, Question
+
+FIRST_QUESTIONS = getattr(settings, 'EXAM_STREAM_FIRST_QUESTIONS', 3)
+START_TIMEOUT = getattr(settings, 'EXAM_STREAM_START_TIMEOUT', 45)
+QUESTION_WAIT = getattr(settings, 'EXAM_QUESTION_WAIT', 20)
+GENERATION_STALE = getattr(settings, 'EXAM_GENERATION_STALE', 2 * max(START_TIMEOUT, QUESTION_WAIT))
+
+
+def create_question(exam: Exam, q: Dict) -> Question:
+    """Save one AIService-shaped question under the exam."""
+    opts = list(q.get("options") or ["", "", "", ""])
+    while len(opts) < 4:
+        opts.append("")
+
+    correct = q.get("correct_answer", "A")
+    if isinstance(correct, int):
+        correct = ['A', 'B', 'C', 'D'][correct] if 0 <= correct < 4 else 'A'
+    else:
+        correct = str(correct)[0].upper() if correct else 'A'
+
+    return Question.objects.create(
+        exam=exam,
+        text=q.get("question", ""),
+        option_a=str(opts[0]),
+        option_b=str(opts[1]),
+        option_c=str(opts[2]),
+        option_d=str(opts[3]),
+        correct_option=correct,
+        explanation=q.get("explanation", ""),
+        topic=q.get("topic", exam.job_role)
+    )
+
+
+def _stream_rest(exam: Exam, seen_questions: List[str], banked: List[Dict], count: int,
+                 ready: threading.Event, flight: Optional[Flight], follow: Optional[str] = None) -> None:
+    from ai_agents.ai_service import AIService
+
+    saved = len(banked)
+    served = {question_hash(q["question"]) for q in banked} | {question_hash(t) for t in seen_questions}
+    generated, followed = [], []
+
+    def keep(q: Dict) -> bool:
+        nonlocal saved
+        key = question_hash(q["question"])
+        if key in served or saved >= count:
+            return False
+        create_question(exam, q)
+        Exam.objects.filter(_id=exam._id).update(generation_heartbeat=timezone.now())
+        served.add(key)
+        saved += 1
+        if saved >= FIRST_QUESTIONS:
+            ready.set()
+        return True
+
+    try:
+        if follow is not None:
+            # Another request is generating for this role: take its questions as it saves them
+            for q in follow_flight(follow, first_timeout=START_TIMEOUT):
+                if keep(q):
+                    followed.append(q)
+                if saved >= count:
+                    break
+        if saved < count:
+            # Leading, or the leader fell short (seen questions, failure, went quiet): stream the rest
+            stream = AIService().stream_exam_questions(
+                avoidance_list=seen_questions[:50] + [q["question"] for q in banked + followed],
+                job_role=exam.job_role,
+                num_questions=count - saved,
+            )
+            # Read the stream to its end rather than break off at `count`: the service caches
+            # the response and records the model's stats once the stream is finished
+            for q in stream:
+                if keep(q):
+                    generated.append(q)
+                    if flight is not None:
+                        publish(flight, q)
+    except Exception as e:
+        print('Exam streaming error:', e)
+    finally:
+        Exam.objects.filter(_id=exam._id).update(generating=False, target_questions=saved)
+        ready.set()
+        if flight is not None:
+            # Hand the questions to requests for the same role that waited on this generation
+            finish(flight, generated)
+        try:
+            add_to_bank(exam.job_role, generated)
+        except Exception as e:
+            print('Question bank error:', e)
+        connections.close_all()
+
+
+def llm_available() -> bool:
+    """False while the LLM provider's circuit breaker is open (or no client can be built)."""
+    from ai_agents.ai_service import AIService
+    try:
+        return AIService().provider_available()
+    except Exception as e:
+        print('LLM client error:', e)
+        return False
+
+
+def start_streaming_exam(user, job_role: str, banked: List[Dict], seen_questions: List[str],
+                         count: int = 30, flight: Optional[Flight] = None, follow: Optional[str] = None) -> Exam:
+    """
+    Create the exam with the banked questions and stream the rest in the
+    background. Returns once FIRST_QUESTIONS are saved or the stream ended.
+    A single-flight `flight` held by the caller publishes each streamed
+    question and is finished with all of them; with `follow`, the key of a
+    flight led elsewhere, the exam takes that leader's questions first.
+    """
+    try:
+        exam = Exam.objects.create(user=user, job_role=job_role, generating=True, target_questions=count,
+                                   generation_heartbeat=timezone.now())
+        for q in banked:
+            create_question(exam, q)
+
+        ready = threading.Event()
+        if len(banked) >= FIRST_QUESTIONS:
+            ready.set()
+        threading.Thread(target=_stream_rest, args=(exam, seen_questions, banked, count, ready, flight, follow),
+                         name=f"exam-stream:{exam._id}", daemon=True).start()
+    except Exception:
+        if flight is not None:
+            finish(flight, None)
+        raise
+    ready.wait(START_TIMEOUT)
+    exam.refresh_from_db(fields=['generating', 'target_questions'])
+    return exam
+
+
+def expire_stale_generation(exam: Exam) -> bool:
+    """
+    Finish the exam with its saved questions if its streaming worker stopped
+    beating; True if it was stale. Safe to race: only one conditional update wins.
+    """
+    if not exam.generating:
+        return False
+    cutoff = timezone.now() - timedelta(seconds=GENERATION_STALE)
+    last_beat = exam.generation_heartbeat or exam.created_at
+    if last_beat is None or last_beat > cutoff:
+        return False
+    saved = Question.objects.filter(exam=exam).count()
+    Exam.objects.filter(_id=exam._id, generating=True).update(generating=False, target_questions=saved)
+    print('Exam streaming stalled, finished with saved questions:', exam._id, saved)
+    exam.refresh_from_db(fields=['generating', 'target_questions'])
+    return True
+
+
+def wait_for_question(exam: Exam, question_num: int, timeout: float = QUESTION_WAIT) -> Tuple[List[Question], Exam]:
+    """The exam's questions once question_num has arrived, generation ended, or timeout passed."""
+    deadline = time.monotonic() + timeout
+    while True:
+        questions = list(Question.objects.filter(exam=exam).order_by('_id'))
+        if len(questions) >= question_num or not exam.generating or time.monotonic() >= deadline:
+            return questions, exam
+        time.sleep(0.5)
+        exam.refresh_from_db(fields=['generating', 'target_questions', 'generation_heartbeat'])
+        expire_stale_generation(exam)
@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .bank import add_to_bank, draw_from_bank, normalize_question, question_hash
+from .coalesce import (_inflight, finish, flight_key, follow_flight, lead_or_follow, publish, share, single_flight,
+                       wait_for_flight)
+from .models import Exam, GenerationLease, QuestionBank, ReadyExam
+from .pool import claim_ready_exam, popular_roles, refill_role
+from .streaming import create_question, expire_stale_generation
+
+
+def _question(text, topic='python'):
+    return {'question': text, 'options': ['alpha', 'beta', 'gamma', 'delta'], 'correct_answer': 'B',
+            'explanation': 'because', 'topic': topic}
+
+
+class QuestionHashTests(SimpleTestCase):
+    def test_normalization_ignores_numbering_case_and_punctuation(self):
+        self.assertEqual(normalize_question('  Q3. What is a  Python GENERATOR? '), 'what is a python generator')
+        self.assertEqual(question_hash('1) What is a python generator'), question_hash('what is a Python generator?'))
+        self.assertNotEqual(question_hash('What is a list?'), question_hash('What is a tuple?'))
+
+
+class QuestionBankTests(TestCase):
+    def test_add_skips_duplicates(self):
+        added = add_to_bank('Backend Developer', [_question('What is a generator?'),
+                                                   _question('what is a generator')])
+        self.assertEqual(added, 1)
+        self.assertEqual(add_to_bank('backend developer', [_question('What is a generator?')]), 0)
+        self.assertEqual(QuestionBank.objects.count(), 1)
+
+    def test_draw_excludes_seen_and_spreads_topics(self):
+        add_to_bank('Backend Developer', [_question(f'Python question {i}?', 'python') for i in range(10)]
+                    + [_question(f'SQL question {i}?', 'sql') for i in range(10)])
+        seen = {question_hash('Python question 0?')}
+        drawn = draw_from_bank('  backend   DEVELOPER', 6, seen)
+        self.assertEqual(len(drawn), 6)
+        self.assertNotIn('Python question 0?', [row.text for row in drawn])
+        self.assertEqual(sum(row.topic == 'sql' for row in drawn), 3)
+        self.assertEqual(draw_from_bank('Data Scientist', 6), [])
+
+    def test_seen_questions_do_not_use_up_the_candidate_window(self):
+        add_to_bank('Backend Developer', [_question(f'Backend question {i}?') for i in range(40)])
+        seen = {question_hash(f'Backend question {i}?') for i in range(30)}
+        with mock.patch('exam.bank._CANDIDATE_LIMIT', 30):
+            drawn = draw_from_bank('Backend Developer', 10, seen)
+        self.assertEqual(sorted(row.text for row in drawn), sorted(f'Backend question {i}?' for i in range(30, 40)))
+
+
+class ReadyExamPoolTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pw')
+        self.bob = User.objects.create_user(username='bob', password='pw')
+        add_to_bank('Backend Developer', [_question(f'Backend question number {i}?') for i in range(30)])
+
+    def test_refill_builds_from_bank_up_to_target(self):
+        self.assertEqual(refill_role('Backend Developer', target=2), 2)
+        self.assertEqual(refill_role('backend developer', target=2), 0)
+        self.assertEqual(len(ReadyExam.objects.first().questions), 30)
+
+    def test_ready_exam_is_claimed_once(self):
+        refill_role('Backend Developer', target=1)
+        self.assertEqual(len(claim_ready_exam(self.alice, 'Backend Developer')), 30)
+        self.assertIsNone(claim_ready_exam(self.bob, 'Backend Developer'))
+        self.assertEqual(ReadyExam.objects.get().claimed_by, self.alice)
+
+    def test_claim_skips_exams_with_seen_questions(self):
+        refill_role('Backend Developer', target=1)
+        self.assertIsNone(claim_ready_exam(self.alice, 'Backend Developer', ['Backend question number 7?']))
+        self.assertIsNotNone(claim_ready_exam(self.bob, 'Backend Developer', ['Unrelated question?']))
+
+    def test_popular_roles_counts_normalized_history(self):
+        for role in ('Backend Developer', 'backend developer', 'Data Analyst'):
+            Exam.objects.create(user=self.alice, job_role=role)
+        self.assertEqual(popular_roles(), [('Backend Developer', 2), ('Data Analyst', 1)])
+
+
+class PoolRefillLeaseTests(TransactionTestCase):
+    def test_refill_skips_role_refilled_by_another_worker(self):
+        add_to_bank('Backend Developer', [_question(f'Backend question number {i}?') for i in range(30)])
+        flight = lead_or_follow('pool|backend developer')
+        # As seen from another worker, which only has the lease document
+        _inflight.pop(flight.key)
+        self.assertEqual(refill_role('Backend Developer', target=2), 0)
+        finish(flight, [])
+        self.assertEqual(refill_role('Backend Developer', target=2), 2)
+
+
+class SingleFlightTests(TransactionTestCase):
+    def test_concurrent_callers_share_one_generation(self):
+        calls, results = [], []
+
+        def generate():
+            calls.append(1)
+            time.sleep(0.3)
+            return [_question(f'Cohort question {i}?') for i in range(30)]
+
+        key = flight_key('Backend Developer')
+        threads = [threading.Thread(target=lambda: results.append(single_flight(key, generate, timeout=5)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([len(r) for r in results], [30] * 8)
+        self.assertIsNotNone(GenerationLease.objects.get(key=key).completed_at)
+
+    def test_follower_in_another_worker_reads_the_lease(self):
+        key = flight_key('Data Analyst')
+        flight = lead_or_follow(key)
+        # Forget the in-process future, as a different worker would not have it
+        _inflight.pop(key)
+        self.assertIsNone(lead_or_follow(key))
+        threading.Timer(0.3, finish, args=(flight, [_question('Shared question?')])).start()
+        self.assertEqual(wait_for_flight(key, timeout=5)[0]['question'], 'Shared question?')
+
+    def test_expired_lease_is_taken_over(self):
+        key = flight_key('Designer')
+        lead_or_follow(key)
+        _inflight.pop(key)
+        GenerationLease.objects.filter(key=key).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(wait_for_flight(key, timeout=1))
+        self.assertIsNotNone(lead_or_follow(key))
+
+    def test_follower_starts_on_published_questions(self):
+        key = flight_key('Frontend Developer')
+        flight = lead_or_follow(key)
+        publish(flight, _question('First streamed question?'))
+        # The first question arrives while the leader is still streaming
+        followed = follow_flight(key, first_timeout=5)
+        self.assertEqual(next(followed)['question'], 'First streamed question?')
+        threading.Timer(0.2, publish, args=(flight, _question('Second streamed question?'))).start()
+        self.assertEqual(next(followed)['question'], 'Second streamed question?')
+        finish(flight, [])
+        self.assertEqual(list(followed), [])
+
+    def test_follower_in_another_worker_reads_published_questions(self):
+        key = flight_key('Mobile Developer')
+        flight = lead_or_follow(key)
+        _inflight.pop(key)
+        publish(flight, _question('Leased question?'))
+        followed = follow_flight(key, first_timeout=5)
+        self.assertEqual(next(followed)['question'], 'Leased question?')
+        finish(flight, [])
+        self.assertEqual(list(followed), [])
+
+    def test_quiet_leader_is_abandoned(self):
+        key = flight_key('QA Engineer')
+        flight = lead_or_follow(key)
+        self.assertEqual(list(follow_flight(key, first_timeout=0.2)), [])
+        finish(flight, [])
+
+    def test_refills_do_not_share_the_exam_key(self):
+        self.assertNotEqual(flight_key('QA Engineer', scope='refill'), flight_key('QA Engineer'))
+        exam_flight = lead_or_follow(flight_key('QA Engineer'))
+        refill_flight = lead_or_follow(flight_key('QA Engineer', scope='refill'))
+        self.assertIsNotNone(refill_flight)
+        finish(exam_flight, [])
+        finish(refill_flight, [])
+
+
+class ShareTests(SimpleTestCase):
+    def test_subset_skips_seen_and_duplicates(self):
+        questions = [_question(f'Question {i}?') for i in range(10)] + [_question('question 0')]
+        picked = share(questions, {question_hash('Question 1?')}, 5)
+        texts = [q['question'] for q in picked]
+        self.assertEqual(len(texts), 5)
+        self.assertNotIn('Question 1?', texts)
+        self.assertEqual(len({question_hash(t) for t in texts}), 5)
+
+
+@mock.patch.dict(os.environ, {'GEMINI_API_KEY': 'test', 'GEMINI_MODEL': 'stats-model', 'GEMINI_MODELS': ''})
+class LLMStatsViewTests(TestCase):
+    def setUp(self):
+        from ai_agents.ai_service import reset_gemini
+        reset_gemini()
+        self.addCleanup(reset_gemini)
+        self.user = User.objects.create_user(username='ops', password='pw')
+
+    def test_staff_only(self):
+        self.client.login(username='ops', password='pw')
+        self.assertEqual(self.client.get(reverse('exam_llm_stats')).status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        data = self.client.get(reverse('exam_llm_stats')).json()
+        self.assertTrue(data['ok'])
+        self.assertEqual(list(data['models']), ['stats-model'])
+        self.assertEqual(data['models']['stats-model']['breaker'], 'closed')
+
+
+class StaleGenerationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='streamer', password='pw')
+        self.exam = Exam.objects.create(user=self.user, job_role='Backend Developer', generating=True,
+                                        target_questions=30, generation_heartbeat=timezone.now())
+        for i in range(2):
+            create_question(self.exam, _question(f'What does step {i} do?'))
+
+    def test_live_generation_is_left_alone(self):
+        self.assertFalse(expire_stale_generation(self.exam))
+        self.assertTrue(self.exam.generating)
+
+    def test_dead_worker_finishes_exam_with_saved_questions(self):
+        Exam.objects.filter(_id=self.exam._id).update(generation_heartbeat=timezone.now() - timedelta(hours=1))
+        self.exam.refresh_from_db()
+        self.client.login(username='streamer', password='pw')
+        response = self.client.get(reverse('exam_test', args=[str(self.exam._id), 3]))
+        self.assertRedirects(response, reverse('exam_result'), fetch_redirect_response=False)
+        self.exam.refresh_from_db()
+        self.assertEqual((self.exam.generating, self.exam.target_questions), (False, 2))
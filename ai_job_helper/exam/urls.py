@@ -6,4 +6,5 @@ urlpatterns = [
     path("import/", views.import_exam, name="exam_import"),
     path("<str:exam_id>/<int:question_num>/", views.exam_test, name="exam_test"),
     path("result/", views.exam_result, name="exam_result"),
+    path("llm-stats/", views.llm_stats, name="exam_llm_stats"),
 ]
@@ -1,11 +1,14 @@
 import json
 from bson import ObjectId
 from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
 from .models import Exam, Question, Answer
+from .bank import add_to_bank, as_question, assemble_questions, draw_from_bank, question_hash
+from .coalesce import flight_key, lead_or_follow
+from .pool import claim_ready_exam, refill_async
+from .streaming import create_question, expire_stale_generation, llm_available, start_streaming_exam, wait_for_question
 from django.conf import settings
-from ai_agents.ai_service import AIService
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.http import JsonResponse
 
 @login_required
@@ -23,32 +26,53 @@ def home(request):
 
 @login_required
 def exam_loading(request):
-    """Generate exam with ONE API call - 30 unique, non-repetitive questions."""
+    """
+    Start a 30-question exam: a ready exam from the pool when one is available,
+    else banked questions, with the shortfall streamed from the LLM while the
+    user already works on the first questions (or, with EXAM_GENERATION_MODE
+    'sharded', generated by concurrent per-topic requests before the exam starts).
+    """
     try:
         job_role = request.session.get("job_role")
         if not job_role:
             return redirect("exam_home")
 
-        # Get recent questions to avoid repetition
-        recent_questions = list(
+        # Questions this user already had for the role are never served again
+        seen_questions = list(
             Question.objects.filter(
                 exam__user=request.user,
                 exam__job_role=job_role
-            ).order_by('-_id').values_list('text', flat=True)[:50]
+            ).order_by('-_id').values_list('text', flat=True)[:500]
         )
 
-        # ONE API call to generate 30 unique questions
-        ai_service = AIService()
-        data = ai_service.generate_exam_questions_for_user(
-            user_context={},
-            avoidance_list=recent_questions,
-            job_role=job_role,
-            num_questions=30,
-            difficulty="medium",
-        )
-        
-        questions = data.get('questions', [])
+        questions = claim_ready_exam(request.user, job_role, seen_questions)
+        # Replace the claimed exam (or build the first ones) off the request path
+        refill_async(job_role)
+
+        if questions is None and getattr(settings, 'EXAM_GENERATION_MODE', 'stream') == 'sharded':
+            # Bank first, then concurrent per-topic LLM shards for the shortfall
+            questions = assemble_questions(job_role, 30, seen_questions, sharded=True)
+        elif questions is None:
+            flight = None
+            seen_hashes = {question_hash(text) for text in seen_questions}
+            questions = [as_question(row) for row in draw_from_bank(job_role, 30, seen_hashes)]
+            # While the provider is failing, start right away with banked questions rather than wait on it
+            if len(questions) < 30 and llm_available():
+                # Requests for the same role in flight elsewhere share one generation: a follower
+                # starts on the leader's questions as they are saved
+                key = flight_key(job_role)
+                flight = lead_or_follow(key)
+                exam = start_streaming_exam(request.user, job_role, questions, seen_questions, 30, flight,
+                                            follow=key if flight is None else None)
+                if not exam.generating and Question.objects.filter(exam=exam).count() < 20:
+                    exam.delete()
+                    return render(request, "exam/error.html", {"message": "Failed to generate enough exam questions. Please try again."})
+                request.session['current_exam_id'] = str(exam._id)
+                return redirect("exam_test", exam_id=str(exam._id), question_num=1)
+
         if len(questions) < 20:
+            if not llm_available():
+                return render(request, "exam/error.html", {"message": "The question generator is temporarily unavailable. Please try again in a minute."})
             return render(request, "exam/error.html", {"message": "Failed to generate enough exam questions. Please try again."})
 
         # Create exam
@@ -57,27 +81,7 @@ def exam_loading(request):
 
         # Save questions to database (up to 30)
         for q in questions[:30]:
-            opts = q.get("options", ["","","",""])
-            while len(opts) < 4:
-                opts.append("")
-            
-            correct = q.get("correct_answer", "A")
-            if isinstance(correct, int):
-                correct = ['A','B','C','D'][correct] if 0 <= correct < 4 else 'A'
-            else:
-                correct = str(correct)[0].upper() if correct else 'A'
-
-            Question.objects.create(
-                exam=exam,
-                text=q.get("question", ""),
-                option_a=str(opts[0]),
-                option_b=str(opts[1]),
-                option_c=str(opts[2]),
-                option_d=str(opts[3]),
-                correct_option=correct,
-                explanation=q.get("explanation", ""),
-                topic=q.get("topic", job_role)
-            )
+            create_question(exam, q)
 
         return redirect("exam_test", exam_id=str(exam._id), question_num=1)
 
@@ -144,6 +148,12 @@ def import_exam(request):
     if target == 0:
         return JsonResponse({"ok": False, "error": "Insufficient unique questions"}, status=400)
 
+    # Bank the client-generated questions so later exams for the role can reuse them
+    try:
+        add_to_bank(job_role, [dict(q, correct_answer=q["correct"]) for q in valid])
+    except Exception as e:
+        print('Question bank error:', e)
+
     # Create exam and persist
     exam = Exam.objects.create(user=request.user, job_role=job_role)
     for q in valid[:target]:
@@ -175,6 +185,16 @@ def exam_test(request, exam_id, question_num):
     try:
         exam = get_object_or_404(Exam, _id=ObjectId(exam_id), user=request.user)
         questions = list(Question.objects.filter(exam=exam).order_by('_id'))
+        # Later questions may still be streaming in: wait a little for this one
+        if question_num > len(questions) and exam.generating and not expire_stale_generation(exam):
+            questions, exam = wait_for_question(exam, question_num)
+            if question_num > len(questions) and exam.generating:
+                return render(request, "exam/waiting.html", {"exam": exam, "question_num": question_num})
+        if question_num > len(questions) and questions and not exam.generating:
+            # Generation ended short of this question: the exam is over
+            request.session['current_exam_id'] = str(exam._id)
+            return redirect("exam_result")
+        total_questions = exam.target_questions if exam.generating else len(questions)
         
         if not questions:
             return render(request, "exam/error.html", {"message": "No questions found for this exam"})
@@ -214,18 +234,18 @@ def exam_test(request, exam_id, question_num):
             
             elif action == "next":
                 # Move to next question or finish exam
-                if question_num < len(questions):
+                if question_num < total_questions:
                     return redirect("exam_test", exam_id=exam_id, question_num=question_num + 1)
                 else:
                     return redirect("exam_result")
         
         # Calculate progress
-        progress = (question_num / len(questions)) * 100
+        progress = (question_num / total_questions) * 100
         
         context = {
             'question': current_question,
             'question_num': question_num,
-            'total_questions': len(questions),
+            'total_questions': total_questions,
             'progress': progress,
             'exam': exam,
             'exam_id': exam_id,
@@ -313,4 +333,20 @@ def start_exam(request, exam_id):
         request.session['current_exam_id'] = str(exam._id)
         return redirect("exam_test", question_num=1)
     except Exception as e:
-        return render(request, "exam/error.html", {"message": f"Error starting exam: {str(e)}"})
\ No newline at end of file
+        return render(request, "exam/error.html", {"message": f"Error starting exam: {str(e)}"})
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+@require_GET
+def llm_stats(request):
+    """Per-model latency, failure rate, throughput and breaker state, and recent routing decisions (staff only).
+
+    Stats are kept per worker process; this reports the process that served the request.
+    """
+    from ai_agents.router import get_router
+    try:
+        from ai_agents.ai_service import get_gemini
+        default_model = get_gemini().model_name
+    except Exception as e:
+        return JsonResponse({"ok": False, "error": f"No LLM client: {e}"}, status=503)
+    return JsonResponse({"ok": True, **get_router(default_model).snapshot()})
@@ -140,7 +140,9 @@ def exam_loading(request):
                 num_questions=needed - len(accumulated),
                 difficulty="medium",
             )
-            if not more or 'questions' not in more:
+            # An empty batch means the call already used its retry budget (or the provider's
+            # circuit is open): asking again would only stack more timeouts
+            if not more or not more.get('questions'):
                 break
             accumulated.extend(extract_good_questions(more))
             # Deduplicate by question text
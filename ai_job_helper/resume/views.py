@@ -46,6 +46,11 @@ def save_resume_to_profile(request):
         profile.extracted_text = payload_text
         profile.resume_text = payload_text
         profile.save()
+        try:
+            from ats.recruiter import index_resume
+            index_resume(request.user, payload_text)
+        except Exception:
+            pass
         return JsonResponse({'success': True, 'message': 'Resume text saved to profile.'})
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -27,9 +27,16 @@ def training_home(request):
             "Where would you like to begin?"
         )
         TrainingMessage.objects.create(session=session, role="bot", content=initial_message)
+        # Warm the shared JD analysis cache; the same posting usually goes through ATS next
+        try:
+            from ats.services import analyze_job_description
+            analyze_job_description(jd or "")
+        except Exception:
+            pass
         return redirect("training_chat", session_id=str(session._id))
 
-    return render(request, "training/home.html", {"resume": resume_text})
+    # The preview loads the text itself from the cached resume_text endpoint
+    return render(request, "training/home.html", {"has_resume": bool(resume_text)})
 
 
 @login_required
@@ -46,9 +53,9 @@ def training_chat(request, session_id):
     recent_exam_scores = []
     try:
         from ats.models import ATSResult
-        latest = ATSResult.objects.filter(user=request.user).order_by('-created_at').first()
-        if latest:
-            latest_ats_score = int(latest.final_score)
+        latest = ATSResult.objects.filter(user=request.user).order_by('-created_at').values_list('final_score', flat=True).first()
+        if latest is not None:
+            latest_ats_score = int(latest)
     except Exception:
         latest_ats_score = None
     try: